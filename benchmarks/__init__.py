@@ -0,0 +1,11 @@
+"""
+Performance benchmarks for the zenopy package (requires pytest-benchmark).
+
+The endpoint benchmarks run against the bundled fake Zenodo server and need
+no network access. The baselines are stored in ``benchmarks/baselines``:
+
+* ``pytest benchmarks/ --benchmark-save=<name>`` records a new baseline
+* ``pytest benchmarks/ --benchmark-compare --benchmark-compare-fail=mean:20%``
+  compares the current revision against the latest baseline of the machine
+  and fails on regressions
+"""
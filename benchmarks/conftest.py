@@ -0,0 +1,42 @@
+"""
+Shared fixtures of the zenopy benchmarks.
+"""
+
+from pathlib import Path
+import pytest
+
+# Number of published records served by the fake Zenodo server
+n_records = 10_000
+
+_baselines = Path(__file__).parent / "baselines"
+
+
+def pytest_configure(config):
+    # Save (and compare against) the baselines kept next to the benchmarks
+    # unless another storage is requested on the command line.
+    if getattr(config.option, "benchmark_storage", None) == "file://./.benchmarks":
+        config.option.benchmark_storage = f"file://{_baselines}"
+
+
+@pytest.fixture(scope="session")
+def fake_server():
+    from zenopy.testing import FakeZenodo
+
+    with FakeZenodo(seed=0) as server:
+        server.add_records(n_records)
+        yield server
+
+
+@pytest.fixture(scope="session")
+def bench_client(fake_server):
+    cli = fake_server.client(rate_limit=None)
+    yield cli
+    cli.close()
+
+
+@pytest.fixture(scope="session")
+def record_ids(fake_server, bench_client):
+    records = bench_client.init_records().list_records(
+        content_type="json", status="published", sort="bestmatch", size=100
+    )
+    return [record["id"] for record in records]
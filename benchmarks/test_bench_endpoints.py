@@ -0,0 +1,242 @@
+"""
+Endpoint benchmarks of the zenopy client against the bundled fake Zenodo
+server (``zenopy.testing.FakeZenodo``).
+
+The server runs in the benchmarking process, hence the numbers include its
+own (Python) request handling and are meant for comparing zenopy revisions
+on the same machine rather than predicting the performance against
+zenodo.org. Throughputs (MB/s) and memory footprints are reported in the
+``extra_info`` of the benchmarks (see ``--benchmark-json``).
+
+Run with ``pytest benchmarks/test_bench_endpoints.py``.
+"""
+
+import os
+import tracemalloc
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from zenopy.record import Record  # noqa: E402
+
+from benchmarks.conftest import n_records  # noqa: E402
+
+# Sizes (in bytes) of the files uploaded and downloaded
+file_sizes = [64 * 1024, 1024 * 1024, 16 * 1024 * 1024]
+
+_metadata = {
+    "upload_type": "dataset",
+    "title": "Benchmark dataset",
+    "creators": [{"name": "Doe, Jane", "affiliation": "Zenopy"}],
+    "description": "A dataset created by the zenopy benchmarks.",
+    "access_right": "open",
+    "license": "cc-by-4.0",
+}
+
+
+def _search(client, page: int = 1, size: int = 10) -> list[Record]:
+    return client.init_records().list_records(
+        content_type="json", status="published", sort="bestmatch", page=page, size=size
+    )
+
+
+def _throughput(benchmark, size: int = None) -> None:
+    if benchmark.stats:
+        benchmark.extra_info["MB/s"] = size / benchmark.stats.stats.mean / 1e6
+
+
+# Local processing
+
+
+def test_bench_record_construction(benchmark, fake_server, bench_client):
+    data = fake_server.add_record()
+    record = benchmark(Record, bench_client, record=data)
+    assert record["id"] == data["id"]
+
+
+@pytest.mark.parametrize("size", [10, 100, 1000])
+def test_bench_parse_search_page(benchmark, bench_client, size):
+    """JSON decoding and Record construction of a search result page"""
+    import requests
+
+    response = bench_client._request(
+        "GET",
+        bench_client._base_url + "/records",
+        params=dict(bench_client._params, size=size, sort="bestmatch"),
+    )
+    content = response.content
+
+    def parse():
+        page = requests.Response()
+        page.status_code = 200
+        page._content = content
+        return bench_client.init_records()._handle_search_result(page)
+
+    records = benchmark(parse)
+    assert len(records) == size
+    if benchmark.stats:
+        benchmark.extra_info["records/s"] = size / benchmark.stats.stats.mean
+
+
+# Metadata calls (requests per second: see the OPS column)
+
+
+def test_bench_retrieve_record(benchmark, bench_client, record_ids):
+    record = benchmark(bench_client.init_records().retrieve_record, record_ids[0])
+    assert record["id"] == record_ids[0]
+
+
+@pytest.mark.parametrize("size", [10, 100])
+def test_bench_list_records(benchmark, bench_client, size):
+    records = benchmark(_search, bench_client, size=size)
+    assert len(records) == size
+
+
+def test_bench_retrieve_resource(benchmark, bench_client):
+    licenses = bench_client.init_resources("licenses")
+    assert benchmark(licenses.retrieve_resource, "cc-by-4.0")["id"] == "cc-by-4.0"
+
+
+def test_bench_list_depositions(benchmark, bench_client):
+    depositions = bench_client.init_deposition()
+    result = benchmark(
+        depositions.list_depositions, status="published", sort="bestmatch", page=1, size=10
+    )
+    assert len(result) == 10
+
+
+def test_bench_create_deposition(benchmark, bench_client):
+    deposition = benchmark(bench_client.init_deposition().create_deposition)
+    assert deposition["state"] == "unsubmitted"
+
+
+# File transfers
+
+
+@pytest.fixture(scope="module")
+def data_files(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("files")
+    paths = {}
+    for size in file_sizes:
+        paths[size] = directory / f"data-{size}.bin"
+        paths[size].write_bytes(os.urandom(size))
+    return paths
+
+
+@pytest.mark.parametrize("size", file_sizes)
+def test_bench_upload(benchmark, bench_client, data_files, size):
+    deposition = bench_client.init_deposition().create_deposition()
+    files = bench_client.init_deposition_file()
+    result = benchmark.pedantic(
+        files.create_deposition_file,
+        kwargs={"file_path": data_files[size], "record": deposition},
+        rounds=5,
+        warmup_rounds=1,
+    )
+    assert result["size"] == size
+    _throughput(benchmark, size)
+
+
+@pytest.mark.parametrize("size", file_sizes)
+def test_bench_download(benchmark, bench_client, data_files, tmp_path, size):
+    deposition = bench_client.init_deposition().create_deposition()
+    files = bench_client.init_deposition_file()
+    files.create_deposition_file(file_path=data_files[size], record=deposition)
+    file_id = files.list_deposition_files(id_=deposition["id"])[0]["id"]
+    outfile = tmp_path / "download.bin"
+    benchmark.pedantic(
+        files.retrieve_deposition_file,
+        kwargs={"id_": deposition["id"], "file_id": file_id, "outfile_path": outfile},
+        rounds=5,
+        warmup_rounds=1,
+    )
+    assert outfile.stat().st_size == size
+    _throughput(benchmark, size)
+
+
+# Harvesting
+
+
+def _harvest(client, size: int = 500) -> list[Record]:
+    records = []
+    for page in range(1, n_records // size + 1):
+        records.extend(_search(client, page=page, size=size))
+    return records
+
+
+def test_bench_harvest_10k_records(benchmark, bench_client):
+    """Listing (and keeping in memory) 10k records"""
+    tracemalloc.start()
+    records = _harvest(bench_client)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(records) == n_records
+    del records
+    benchmark.extra_info["bytes/record"] = retained / n_records
+    records = benchmark.pedantic(_harvest, args=(bench_client,), rounds=3)
+    assert len(records) == n_records
+
+
+# Deposition workflow: create -> upload -> update -> publish
+
+
+def _upload(client, path):
+    deposition = client.init_deposition().create_deposition()
+    client.init_deposition_file().create_deposition_file(file_path=path, record=deposition)
+    return deposition
+
+
+def _update(client, deposition):
+    return client.init_deposition().update_deposition(id_=deposition["id"], **_metadata)
+
+
+def _publish(client, deposition):
+    return client.init_deposition_actions().deposition_action(id_=deposition["id"], action="publish")
+
+
+@pytest.mark.parametrize("phase", ["create", "upload", "update", "publish", "end_to_end"])
+def test_bench_deposition_workflow(benchmark, bench_client, data_files, phase):
+    """Latency of each phase of publishing a deposition with a 1 MiB file"""
+    path = data_files[1024 * 1024]
+    deposition_api = bench_client.init_deposition()
+    if phase == "create":
+        target, setup = deposition_api.create_deposition, None
+    elif phase == "upload":
+
+        def setup():
+            return (deposition_api.create_deposition(),), {}
+
+        def target(deposition):
+            return bench_client.init_deposition_file().create_deposition_file(
+                file_path=path, record=deposition
+            )
+
+    elif phase == "update":
+
+        def setup():
+            return (_upload(bench_client, path),), {}
+
+        def target(deposition):
+            return _update(bench_client, deposition)
+
+    elif phase == "publish":
+
+        def setup():
+            deposition = _upload(bench_client, path)
+            _update(bench_client, deposition)
+            return (deposition,), {}
+
+        def target(deposition):
+            return _publish(bench_client, deposition)
+
+    else:
+
+        def target():
+            deposition = _upload(bench_client, path)
+            _update(bench_client, deposition)
+            return _publish(bench_client, deposition)
+
+        setup = None
+    result = benchmark.pedantic(target, setup=setup, rounds=20, warmup_rounds=1)
+    if phase in ["publish", "end_to_end"]:
+        assert result["state"] == "done"
@@ -0,0 +1,41 @@
+"""
+Harvesting time of a search with and without the prefetching of the
+following result pages, against a fake Zenodo server with a per-request
+latency.
+
+Run with ``pytest benchmarks/test_bench_harvest.py``.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+# Number of harvested records, page size and per-request latency (s)
+n_harvested = 2_000
+page_size = 100
+latency = 0.02
+
+
+@pytest.fixture(scope="module")
+def latency_client():
+    from zenopy.testing import FakeZenodo
+
+    with FakeZenodo(seed=0, latency=latency) as server:
+        server.add_records(n_harvested)
+        cli = server.client(rate_limit=None)
+        yield cli
+        cli.close()
+
+
+@pytest.mark.parametrize("prefetch", [0, 2, 4, 8])
+def test_bench_harvest_prefetch(benchmark, latency_client, prefetch):
+    """Harvesting of 2k records (20 pages) with ``prefetch`` pages in flight"""
+    records_api = latency_client.init_records()
+
+    def harvest():
+        return sum(1 for _ in records_api.iter_records(size=page_size, prefetch=prefetch))
+
+    count = benchmark.pedantic(harvest, rounds=3, iterations=1)
+    assert count == n_harvested
+    if benchmark.stats:
+        benchmark.extra_info["records_per_second"] = round(n_harvested / benchmark.stats.stats.mean)
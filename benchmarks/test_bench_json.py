@@ -0,0 +1,64 @@
+"""
+Decoding throughput (records/s) of the JSON backends of zenopy on search
+result pages served by the fake Zenodo server.
+
+Run with ``pytest benchmarks/test_bench_json.py``; the backends which are
+not installed are skipped.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from zenopy import codec  # noqa: E402
+
+
+@pytest.fixture(params=codec.json_backends)
+def json_backend(request):
+    name = codec.get_json_backend()
+    try:
+        codec.set_json_backend(request.param)
+    except ImportError:
+        pytest.skip(f"{request.param} is not installed")
+    yield request.param
+    codec.set_json_backend(name)
+
+
+def _search_page(client, size: int = None) -> bytes:
+    response = client._request(
+        "GET",
+        client._base_url + "/records",
+        params=dict(client._params, size=size, sort="bestmatch"),
+    )
+    return response.content
+
+
+@pytest.mark.parametrize("size", [100, 1000])
+def test_bench_json_decode(benchmark, bench_client, json_backend, size):
+    """Decoding of a search result page"""
+    content = _search_page(bench_client, size)
+    result = benchmark(codec.loads, content)
+    assert len(result["hits"]["hits"]) == size
+    if benchmark.stats:
+        benchmark.extra_info["records/s"] = size / benchmark.stats.stats.mean
+        benchmark.extra_info["MB/s"] = len(content) / benchmark.stats.stats.mean / 1e6
+
+
+@pytest.mark.parametrize("size", [100, 1000])
+def test_bench_json_search_page(benchmark, bench_client, json_backend, size):
+    """Decoding of a search result page into Record objects"""
+    import requests
+
+    content = _search_page(bench_client, size)
+    records_api = bench_client.init_records()
+
+    def parse():
+        page = requests.Response()
+        page.status_code = 200
+        page._content = content
+        return records_api._handle_search_result(page)
+
+    records = benchmark(parse)
+    assert len(records) == size
+    if benchmark.stats:
+        benchmark.extra_info["records/s"] = size / benchmark.stats.stats.mean
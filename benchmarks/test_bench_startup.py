@@ -0,0 +1,46 @@
+"""
+Import-time and construction-time benchmarks for the zenopy package.
+
+Run with ``pytest benchmarks/test_bench_startup.py``.
+"""
+
+import subprocess
+import sys
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import zenopy  # noqa: E402
+
+
+def _run(code: str) -> None:
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_bench_interpreter_baseline(benchmark):
+    """Reference point: start-up time of a bare interpreter"""
+    benchmark.pedantic(_run, args=("pass",), rounds=10, warmup_rounds=1)
+
+
+def test_bench_import_zenopy(benchmark):
+    benchmark.pedantic(_run, args=("import zenopy",), rounds=10, warmup_rounds=1)
+
+
+def test_bench_import_and_construct_client(benchmark):
+    benchmark.pedantic(
+        _run,
+        args=("import zenopy; zenopy.Zenodo(token='benchmark-token')",),
+        rounds=10,
+        warmup_rounds=1,
+    )
+
+
+def test_bench_construct_client(benchmark):
+    client = benchmark(zenopy.Zenodo, token="benchmark-token")
+    assert client.token == "benchmark-token"
+
+
+def test_bench_construct_async_client(benchmark):
+    pytest.importorskip("httpx")
+    client = benchmark(zenopy.AsyncZenodo, token="benchmark-token")
+    assert client.token == "benchmark-token"
@@ -0,0 +1,49 @@
+"""
+Memory footprint (bytes/record) and harvesting time of the Record objects
+and the compact record views returned by the listings.
+
+Run with ``pytest benchmarks/test_bench_views.py``.
+"""
+
+import gc
+import tracemalloc
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks.conftest import n_records  # noqa: E402
+
+_views = {
+    "record": False,
+    "view": True,
+    "projection": ["id", "doi", "title"],
+}
+
+
+def _harvest(client, view=False, size: int = 500) -> list:
+    records_api = client.init_records()
+    records = []
+    for page in range(1, n_records // size + 1):
+        records.extend(
+            records_api.list_records(
+                content_type="json", status="published", sort="bestmatch",
+                page=page, size=size, view=view,
+            )
+        )
+    return records
+
+
+@pytest.mark.parametrize("kind", list(_views))
+def test_bench_harvest_memory(benchmark, bench_client, kind):
+    """Memory retained by 10k harvested records"""
+    gc.collect()
+    tracemalloc.start()
+    records = _harvest(bench_client, view=_views[kind])
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(records) == n_records
+    del records
+    benchmark.extra_info["bytes/record"] = retained / n_records
+    records = benchmark.pedantic(_harvest, args=(bench_client, _views[kind]), rounds=3)
+    assert len(records) == n_records
@@ -40,7 +40,10 @@ if __name__ == "__main__":
                 "sphinx-copybutton",
                 "numpydoc",
             ],
+            "async": ["httpx"],
+            "columnar": ["numpy", "pandas", "pyarrow"],
             "tests": ["pytest", "pytest-cov"],
+            "benchmarks": ["pytest", "pytest-benchmark"],
             "lint": ["black"],
         },
         test_suite='tests',
@@ -7,21 +7,75 @@ A Python wrapper package for Zenodo API
 
 import textwrap
 
-# Bring up the classes so that they appear to be directly in
-# the zenopy package.
-
-from zenopy.client import Zenodo    # noqa: E402
-from zenopy import metadata # noqa: E402
-
 wrap_text = textwrap.TextWrapper(width=120)
 wrap_stdout = textwrap.TextWrapper(width=120)
 
-# Handle versioneer
-from ._version import get_versions  # noqa: E402
-
 __author__ = """Mohammad Mostafanejad"""
 __email__ = "smostafanejad@vt.edu"
-versions = get_versions()
-__version__ = versions["version"]
-__git_revision__ = versions["full-revisionid"]
-del get_versions, versions
+
+# Bring up the classes so that they appear to be directly in
+# the zenopy package. The submodules (and their dependencies such as
+# requests) are only imported upon the first access to keep
+# "import zenopy" fast and free of side effects.
+_lazy_attributes = {
+    "Zenodo": "zenopy.client",
+    "AsyncZenodo": "zenopy.client",
+    "RecordView": "zenopy.views",
+    "MirrorStore": "zenopy.sync",
+    "set_json_backend": "zenopy.codec",
+    "get_json_backend": "zenopy.codec",
+    "metadata": None,
+}
+
+
+def _get_version() -> str:
+    """Look up the package version without shelling out to git"""
+    from importlib.metadata import version, PackageNotFoundError
+
+    try:
+        return version("zenopy")
+    except PackageNotFoundError:
+        pass
+    from zenopy import _version
+
+    try:
+        return _version.git_versions_from_keywords(
+            _version.get_keywords(), _version.get_config().tag_prefix, False
+        )["version"]
+    except _version.NotThisMethod:
+        return "0+unknown"
+
+
+def _get_git_revision() -> (str | None):
+    """Look up the git revision from the (expanded) versioneer keywords"""
+    from zenopy import _version
+
+    try:
+        return _version.git_versions_from_keywords(
+            _version.get_keywords(), _version.get_config().tag_prefix, False
+        )["full-revisionid"]
+    except _version.NotThisMethod:
+        return None
+
+
+def __getattr__(name: str):
+    import importlib
+
+    if name in _lazy_attributes:
+        module_name = _lazy_attributes[name]
+        if module_name is None:
+            value = importlib.import_module(f"{__name__}.{name}")
+        else:
+            value = getattr(importlib.import_module(module_name), name)
+    elif name == "__version__":
+        value = _get_version()
+    elif name == "__git_revision__":
+        value = _get_git_revision()
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attributes) | {"__version__", "__git_revision__"})
@@ -0,0 +1,481 @@
+# -*- coding: utf-8 -*-
+
+"""Zenodo client-side HTTP cache
+
+"""
+
+import collections
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class _ResponseCache(object):
+    """Bounded (LRU) in-memory cache of the JSON responses of single
+    depositions, records and resources, keyed by URL.
+
+    Only the responses carrying an ``ETag`` or a ``Last-Modified`` header are
+    stored. The following requests for the same URL send them back through
+    the ``If-None-Match``/``If-Modified-Since`` headers and a 304 (Not
+    Modified) response is served from the stored body. The cache never serves
+    a response without revalidating it with the server first."""
+
+    def __init__(self, max_entries: int = 256):
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise ValueError("The 'max_entries' argument must be a positive integer.")
+        self._max_entries = max_entries
+        # url -> (etag, last_modified, content)
+        self._entries = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def request_headers(self, url: str = None) -> dict:
+        """Conditional request headers for the cached response of the URL"""
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None:
+            return {}
+        etag, last_modified, _ = entry
+        headers = {}
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        if last_modified is not None:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def resolve(self, url: str = None, response=None) -> (bytes | None):
+        """Return the body of the response, served from the cache if it is a
+        304, and store the cacheable responses. Returns None if the cached
+        body has been evicted in the meantime (the request must be re-sent
+        unconditionally)."""
+        with self._lock:
+            if response.status_code == 304:
+                entry = self._entries.get(url)
+                if entry is None:
+                    return None
+                self._entries.move_to_end(url)
+                self._hits += 1
+                return entry[2]
+            self._misses += 1
+            if response.status_code != 200:
+                self._entries.pop(url, None)
+                return response.content
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag is None and last_modified is None:
+                self._entries.pop(url, None)
+                return response.content
+            self._entries[url] = (etag, last_modified, response.content)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+            return response.content
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+
+# Values of the search parameters which are implied when they are omitted
+_search_defaults = {"sort": "bestmatch", "page": "1", "size": "10", "all_versions": "0"}
+
+
+def _search_key(url: str = None, params: dict = None, headers: dict = None) -> tuple:
+    """Canonical key of a search request: the URL, the requested content
+    type and the sorted search parameters, with the defaults filled in, the
+    booleans as 0/1, the whitespace of the query collapsed and without the
+    access token."""
+    canonical = dict(_search_defaults)
+    for key, value in (params or {}).items():
+        if key == "access_token" or value is None:
+            continue
+        if isinstance(value, bool):
+            value = int(value)
+        value = " ".join(str(value).split())
+        if key == "q" and value == "":
+            continue
+        canonical[key] = value
+    content_type = (headers or {}).get("Content-Type")
+    return url.rstrip("/"), content_type, tuple(sorted(canonical.items()))
+
+
+class _SearchCache(object):
+    """Bounded (LRU) in-memory cache of the search results, keyed by their
+    canonical parameters (see ``_search_key``).
+
+    A result younger than ``ttl`` seconds is fresh and served without any
+    request. During the following ``stale_ttl`` seconds, it is still served
+    but a single background request refreshes it (stale-while-revalidate).
+    Older results are dropped."""
+
+    def __init__(self, max_entries: int = 128, ttl: float = 60.0, stale_ttl: float = 300.0):
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise ValueError("The 'max_entries' argument must be a positive integer.")
+        if ttl is None or ttl < 0 or stale_ttl is None or stale_ttl < 0:
+            raise ValueError("The 'ttl' and 'stale_ttl' arguments must be non-negative numbers.")
+        self._max_entries = max_entries
+        self._ttl = float(ttl)
+        self._stale_ttl = float(stale_ttl)
+        # key -> (content, stored_at)
+        self._entries = collections.OrderedDict()
+        self._refreshing = set()
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, key: tuple = None) -> tuple:
+        """Return the (content, state) pair of the key, the state being
+        "fresh", "stale" or None (the content is then None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                content, stored_at = entry
+                age = time.monotonic() - stored_at
+                if age < self._ttl:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return content, "fresh"
+                if age < self._ttl + self._stale_ttl:
+                    self._entries.move_to_end(key)
+                    self._stale_hits += 1
+                    return content, "stale"
+                del self._entries[key]
+            self._misses += 1
+            return None, None
+
+    def store(self, key: tuple = None, content: bytes = None) -> None:
+        with self._lock:
+            self._entries[key] = (content, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def begin_refresh(self, key: tuple = None) -> bool:
+        """Claim the refresh of a stale entry (False if it is in progress)"""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key: tuple = None) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._stale_hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+
+# Default time-to-live (in seconds) of the persistent cache entries per kind
+# of resource. The (private and mutable) depositions are not persisted
+persistent_cache_ttl = {"deposition": 0, "record": 3600, "resource": 86400}
+
+# Version of the database schema (stored as its user_version). The caches
+# created with an older schema are emptied upon their first use
+_schema_version = 2
+
+# The total size of the entries is kept up to date by triggers so that the
+# eviction does not scan the whole table after each insertion
+_schema = """
+CREATE TABLE IF NOT EXISTS entries (
+    scope TEXT NOT NULL,
+    url TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    content BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (scope, url)
+);
+CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at);
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    size INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries
+BEGIN
+    UPDATE totals SET size = size + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries
+BEGIN
+    UPDATE totals SET size = size - OLD.size;
+END;
+"""
+
+
+def _token_scope(token: str = None) -> str:
+    """Fingerprint of an access token scoping the persistent cache entries"""
+    return hashlib.sha256((token or "").encode()).hexdigest()[:16]
+
+
+def _url_kind(url: str = None, base_url: str = None) -> (str | None):
+    """Kind of resource (see ``persistent_cache_ttl``) served at the URL"""
+    path = url[len(base_url):] if url.startswith(base_url) else url
+    if path.startswith("/deposit/"):
+        return "deposition"
+    if path.startswith("/records/"):
+        return "record"
+    if path.startswith(("/licenses/", "/communities/", "/grants/", "/funders/")):
+        return "resource"
+    return None
+
+
+class _PersistentCache(object):
+    """On-disk (SQLite) cache of the JSON responses of single records and
+    resources, shared by all the clients and processes of a node.
+
+    The entries are scoped by the fingerprint of the access token they have
+    been fetched with (see ``_token_scope``): a response fetched with one
+    token, e.g., a restricted record, is never served to another token.
+
+    An entry younger than the time-to-live of its kind is served without any
+    request. Older entries keep their ``ETag``/``Last-Modified`` validators and
+    are revalidated with a conditional request. Once the database grows over
+    ``max_size`` bytes, the oldest entries are evicted. The database is used in
+    WAL mode so that the readers of all the processes proceed concurrently
+    with a single writer."""
+
+    def __init__(
+        self,
+        path: (str | Path) = None,
+        ttl: dict = None,
+        max_size: int = 256 * 1024**2,
+        scope: str = None,
+    ):
+        if not isinstance(max_size, int) or max_size < 1:
+            raise ValueError("The 'max_size' argument must be a positive integer.")
+        self._ttl = dict(persistent_cache_ttl)
+        for kind, value in (ttl or {}).items():
+            if kind not in self._ttl:
+                raise ValueError(
+                    f"Invalid cache entry kind ({kind}).\n"
+                    f"Possible values are: {list(self._ttl.keys())}\n"
+                )
+            self._ttl[kind] = float(value or 0)
+        self._path = Path(path).expanduser().absolute()
+        self._max_size = max_size
+        self._scope = scope if scope is not None else _token_scope(None)
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        with self._lock:
+            self._connect()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def scope(self) -> str:
+        return self._scope
+
+    def _connect(self) -> "sqlite3.Connection":
+        """The connection of the current process (re-opened after a fork)"""
+        if self._connection is None or self._pid != os.getpid():
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            # Create the database file only readable by its owner
+            os.close(os.open(self._path, os.O_CREAT | os.O_RDWR, 0o600))
+            connection = sqlite3.connect(
+                self._path, timeout=30.0, check_same_thread=False, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            # The replaced rows fire the delete trigger
+            connection.execute("PRAGMA recursive_triggers=ON")
+            _migrate(connection)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def ttl(self, kind: str = None) -> float:
+        return self._ttl.get(kind, 0.0)
+
+    def lookup(self, url: str = None, kind: str = None) -> (tuple | None):
+        """Return the (content, etag, last_modified, fresh) tuple of the entry
+        of the URL, if any"""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT content, etag, last_modified, stored_at FROM entries WHERE scope = ? AND url = ?",
+                    (self._scope, url),
+                )
+                .fetchone()
+            )
+            if row is None:
+                self._misses += 1
+                return None
+            content, etag, last_modified, stored_at = row
+            fresh = time.time() - stored_at < self.ttl(kind)
+            if fresh:
+                self._hits += 1
+            else:
+                self._misses += 1
+            return content, etag, last_modified, fresh
+
+    def store(
+        self,
+        url: str = None,
+        kind: str = None,
+        content: bytes = None,
+        etag: str = None,
+        last_modified: str = None,
+    ) -> None:
+        """Store (or refresh) the entry of the URL if its kind is persisted"""
+        if self.ttl(kind) <= 0:
+            return
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._scope, url, kind, content, etag, last_modified, time.time(), len(content)),
+            )
+            self._evict(connection)
+
+    def _evict(self, connection) -> None:
+        (size,) = connection.execute("SELECT size FROM totals").fetchone()
+        if size <= self._max_size:
+            return
+        excess = size - self._max_size
+        rows = connection.execute("SELECT scope, url, size FROM entries ORDER BY stored_at")
+        evicted = []
+        for scope, url, entry_size in rows:
+            evicted.append((scope, url))
+            excess -= entry_size
+            if excess <= 0:
+                break
+        connection.executemany("DELETE FROM entries WHERE scope = ? AND url = ?", evicted)
+
+    def info(self) -> dict:
+        with self._lock:
+            connection = self._connect()
+            (entries,) = connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+            (size,) = connection.execute("SELECT size FROM totals").fetchone()
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "entries": entries,
+                "size": size,
+                "max_size": self._max_size,
+                "path": str(self._path),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM entries")
+            self._hits = 0
+            self._misses = 0
+
+    def save_snapshot(self, file_path: (str | Path) = None) -> None:
+        """Write a consistent copy of the cache to a (SQLite) snapshot file"""
+        file_path = Path(file_path).expanduser()
+        tmp_path = file_path.with_name(f".{file_path.name}.tmp")
+        tmp_path.unlink(missing_ok=True)
+        with self._lock:
+            snapshot = sqlite3.connect(tmp_path)
+            try:
+                self._connect().backup(snapshot)
+            finally:
+                snapshot.close()
+        os.replace(tmp_path, file_path)
+
+    def load_snapshot(self, file_path: (str | Path) = None) -> int:
+        """Warm the cache up with the entries of a snapshot file which are
+        newer than the cached ones and return the number of loaded entries"""
+        file_path = Path(file_path).expanduser()
+        if not file_path.is_file():
+            raise FileNotFoundError(f"The cache snapshot ({file_path}) does not exist.")
+        with self._lock:
+            connection = self._connect()
+            connection.execute("ATTACH DATABASE ? AS snapshot", (str(file_path),))
+            try:
+                (version,) = connection.execute("PRAGMA snapshot.user_version").fetchone()
+                if version != _schema_version:
+                    raise ValueError(f"The cache snapshot ({file_path}) has an incompatible schema.")
+                connection.execute("BEGIN IMMEDIATE")
+                count = connection.execute(
+                    "INSERT OR REPLACE INTO main.entries SELECT s.* FROM snapshot.entries AS s "
+                    "LEFT JOIN main.entries AS m ON m.scope = s.scope AND m.url = s.url "
+                    "WHERE m.url IS NULL OR m.stored_at < s.stored_at"
+                ).rowcount
+                self._evict(connection)
+                connection.execute("COMMIT")
+            except BaseException:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+            finally:
+                connection.execute("DETACH DATABASE snapshot")
+            return count
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+
+def _migrate(connection=None) -> None:
+    """Create the schema of the persistent cache, emptying the caches created
+    with an older schema"""
+    (version,) = connection.execute("PRAGMA user_version").fetchone()
+    if version == _schema_version:
+        return
+    try:
+        connection.executescript(
+            "BEGIN IMMEDIATE;\n"
+            "DROP TABLE IF EXISTS entries;\n"
+            "DROP TABLE IF EXISTS totals;\n"
+            f"{_schema}"
+            f"PRAGMA user_version = {_schema_version};\n"
+            "COMMIT;"
+        )
+    except BaseException:
+        if connection.in_transaction:
+            connection.execute("ROLLBACK")
+        raise
@@ -4,17 +4,35 @@
 
 """
 
+import asyncio
 import configparser
 import logging
+import os
+import tempfile
+import threading
 from pathlib import Path
-from zenopy.deposition_actions import _DepositionActions
-from zenopy.deposition_files import _DepositionFiles
-from zenopy.depositions import _Depositions
-from zenopy.records import _Records
-from zenopy.resources import _Resources
+from types import MappingProxyType
+from zenopy.deposition_actions import _DepositionActions, _AsyncDepositionActions
+from zenopy.deposition_files import _DepositionFiles, _AsyncDepositionFiles
+from zenopy.depositions import _Depositions, _AsyncDepositions
+from zenopy.cache import _PersistentCache, _ResponseCache, _SearchCache, _search_key, _token_scope, _url_kind
+from zenopy.codec import loads
+from zenopy.config import _config_cache, _copy_config
+from zenopy.errors import zenodo_error
+from zenopy.metrics import _Instrumentation, _Metrics
+from zenopy.ratelimit import _RateLimiter
+from zenopy.record import Record, prefetch_records
+from zenopy.records import _Records, _AsyncRecords
+from zenopy.resources import _Resources, _AsyncResources
+from zenopy.retry import _RetryPolicy
+from zenopy.token_pool import _TokenPool
+from zenopy.transport import _Transport, _AsyncTransport
 
 logger = logging.getLogger(__name__)
 
+# Token value written to a new config file until the user fills it in
+_placeholder_token = "<FIXME>"
+
 
 class Zenodo(object):
     """zenopy client class
@@ -34,59 +52,561 @@ class Zenodo(object):
         token: str = None,
         config_file_path: (str | Path) = None,
         use_sandbox: bool = False,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        files_pool_maxsize: int = None,
+        keep_alive: bool = True,
+        rate_limit: int = None,
+        rate_limit_period: float = 60.0,
+        rate_limit_burst: int = 10,
+        max_retries: int = 3,
+        retry_backoff_factor: float = 0.5,
+        retry_backoff_max: float = 30.0,
+        retry_jitter: bool = True,
+        token_pool: str = None,
+        collect_metrics: bool = True,
+        base_url: str = None,
+        cache_size: int = 256,
+        persistent_cache: (str | Path) = None,
+        persistent_cache_ttl: dict = None,
+        persistent_cache_max_size: int = 256 * 1024**2,
+        search_cache_size: int = 0,
+        search_cache_ttl: float = 60.0,
+        search_cache_stale_ttl: float = 300.0,
     ):
         """zenopy client class constructor
 
         Parameters
         ----------
         token : str, optional
-            Token created through a personal Zenodo account, by default empty
+            Token created through a personal Zenodo account. If empty, the
+            token is read from the ``ZENODO_TOKEN`` (or ``ZENODO_SANDBOX_TOKEN``
+            if ``use_sandbox == True``) environment variable and, failing
+            that, from the configuration file, by default empty
         config_file_path : str  |  Path, optional
             Path to the configuration file listing Zenodo (and Sandbox) account(s)'
-            tokens. This file is usually located at ~/.zenodorc, by default None
+            tokens. This file is usually located at ~/.zenodorc. If no path is
+            provided and the token is passed directly or through the environment,
+            the configuration file is not accessed until it is needed, by default None
         use_sandbox : bool, optional
             If True, the tokens will be read from the [SANDBOX] section of the
             configuration file, by default False
-
+        pool_connections : int, optional
+            Number of host connection pools cached by the client, by default 10
+        pool_maxsize : int, optional
+            Maximum number of connections kept alive per host for the REST API
+            calls, by default 10
+        files_pool_maxsize : int, optional
+            Maximum number of connections kept alive for the ``/files`` bucket
+            uploads and downloads, by default the same as ``pool_maxsize``
+        keep_alive : bool, optional
+            If False, connections are closed after each request instead of
+            being returned to the pool, by default True
+        rate_limit : int, optional
+            Maximum number of requests sent per ``rate_limit_period`` seconds,
+            e.g., 100 to stay within the Zenodo guidelines. The limit is shared
+            by all subsystems created from the client and is adjusted with the
+            rate limit headers returned by Zenodo. The ``Retry-After`` delays
+            of the rejected (429) requests are honored by the retry policy
+            regardless, by default None (no client-side rate limiting)
+        rate_limit_period : float, optional
+            Length of the rate limiting window in seconds, by default 60.0
+        rate_limit_burst : int, optional
+            Maximum number of requests sent back-to-back before the requests
+            are paced at the sustained rate, by default 10
+        max_retries : int, optional
+            Maximum number of times a request failing with a transient error
+            (429/500/502/503/504 responses or connection errors) is re-sent.
+            Non-idempotent requests (POST) are only re-sent if they have not
+            reached the server. Set it to 0 to disable retries, by default 3
+        retry_backoff_factor : float, optional
+            The n-th retry waits up to ``retry_backoff_factor * 2**n`` seconds
+            unless the server provides a ``Retry-After`` header, by default 0.5
+        retry_backoff_max : float, optional
+            Upper bound of the backoff delay in seconds, including the delays
+            requested by the ``Retry-After`` headers, by default 30.0
+        retry_jitter : bool, optional
+            If True, the backoff delay is drawn uniformly from zero to its
+            upper bound ("full jitter"), by default True
+        token_pool : str, optional
+            If set, the read requests (records and resources searches and
+            retrievals) are spread over all the tokens listed in the [ZENODO]
+            (or [SANDBOX]) section of the configuration file, each with its own
+            rate limit budget. Either ``"round_robin"`` or ``"least_loaded"``.
+            Deposition requests always use the client's ``token``, by default None
+        collect_metrics : bool, optional
+            If True, the latency, transferred bytes and status codes of all
+            requests are collected in memory per endpoint (see ``stats()``),
+            by default True
+        base_url : str, optional
+            URL of the Zenodo REST API. It overrides the production (or
+            Sandbox) URL, e.g., to connect the client to a local stand-in
+            such as ``zenopy.testing.FakeZenodo``, by default None
+        cache_size : int, optional
+            Maximum number of deposition/record/resource responses kept in
+            memory for conditional requests: a record which has not changed
+            since it was last fetched (same ``ETag``/``Last-Modified``) is
+            served from memory after a 304 (Not Modified) response. Set it to
+            0 or None to disable the cache, by default 256
+        persistent_cache : str | Path, optional
+            Path of an SQLite database caching the records and resources on
+            disk. The database can be shared by the clients of several
+            processes; a worker then serves the records fetched by the
+            others without any request while they are fresh (see
+            ``persistent_cache_ttl``). The entries are scoped by a
+            fingerprint of the access token, so that a token is never served
+            the responses fetched with another one, by default None (disabled)
+        persistent_cache_ttl : dict, optional
+            Time (in seconds) during which the cached ``"deposition"``,
+            ``"record"`` and ``"resource"`` entries are served without being
+            revalidated with Zenodo. A time of 0 disables the persistence of a
+            kind, by default ``{"deposition": 0, "record": 3600, "resource": 86400}``
+        persistent_cache_max_size : int, optional
+            Maximum size (in bytes) of the cached responses. The oldest entries
+            are evicted first, by default 256 MiB
+        search_cache_size : int, optional
+            Maximum number of ``list_records`` search results kept in memory.
+            The searches are keyed by their parameters regardless of their
+            order and with the omitted defaults filled in, so that repeated
+            searches are served locally, by default 0 (disabled)
+        search_cache_ttl : float, optional
+            Time (in seconds) during which a cached search result is served
+            without any request, by default 60
+        search_cache_stale_ttl : float, optional
+            Time (in seconds) after ``search_cache_ttl`` during which an
+            expired search result is still served while a background request
+            refreshes it, by default 300
 
         See Also
         --------
         create_config_file
         """
         self._use_sandbox = use_sandbox
-        if self._use_sandbox:
+        if base_url is not None and base_url != "":
+            self._base_url = base_url.strip().rstrip("/")
+        elif self._use_sandbox:
             self._base_url = "https://sandbox.zenodo.org/api"
         else:
             self._base_url = "https://zenodo.org/api"
-        if token is not None:
-            self._token = token
-        else:
-            self._token = ""
+        if token is None or token == "":
+            token = os.environ.get(
+                "ZENODO_SANDBOX_TOKEN" if self._use_sandbox else "ZENODO_TOKEN", ""
+            )
+        self._token = token
+        # The config objects read from disk are shared with the other clients
+        # through the process-wide config cache and are copied before the first
+        # modification (see write_token)
+        self._config_obj = None
+        self._config_owned = False
         self._config_file_path = config_file_path
         if self._config_file_path is None or self._config_file_path == "":
             self._config_file_path = "~/.zenodorc"
-            if not Path(self._config_file_path).expanduser().exists():
-                self.create_config_file(self._config_file_path)
+            # If the token is known, the config file is read lazily (see
+            # config_obj) so that the construction performs no file system I/O.
+            if self._token == "":
+                if not Path(self._config_file_path).expanduser().exists():
+                    self.create_config_file(self._config_file_path)
+                    self._config_obj = self.read_config_file(self._config_file_path)
+                    sec = "SANDBOX" if self._use_sandbox else "ZENODO"
+                    self.write_token(section=sec, key="token", token=self._token, force_rewrite=True)
+                    self.update_config_file()
+                    logger.warning(
+                        f"WARNING: A new config file is automatically created in ({self._config_file_path})."
+                    )
+                else:
+                    logger.warning(
+                        f"WARNING: The config file ({self._config_file_path}) is found."
+                    )
                 self._config_obj = self.read_config_file(self._config_file_path)
-                sec = "SANDBOX" if self._use_sandbox else "ZENODO"
-                self.write_token(section=sec, key="token", token=self._token, force_rewrite=True)
-                self.update_config_file()
-                logger.warning(
-                    f"WARNING: A new config file is automatically created in ({self._config_file_path})."
+        else:
+            self._config_obj = self.read_config_file(self._config_file_path)
+        # The default headers and parameters are shared (read-only) by all
+        # the subsystems and records of the client. Requests which need extra
+        # values build their own copies so that concurrent calls from multiple
+        # threads never see each other's headers or parameters.
+        self._headers = MappingProxyType(
+            {
+                "Authorization": f"Bearer {self.token}",
+                "Content-Type": "application/json",
+            }
+        )
+        self._params = MappingProxyType({"access_token": self.token})
+        if rate_limit is not None:
+            rate_limiter = _RateLimiter(
+                rate=rate_limit, period=rate_limit_period, burst=rate_limit_burst
+            )
+        else:
+            rate_limiter = None
+        if token_pool is not None:
+            token_pool = self._create_token_pool(
+                strategy=token_pool,
+                rate_limiter=rate_limiter,
+                rate_limit=rate_limit,
+                rate_limit_period=rate_limit_period,
+                rate_limit_burst=rate_limit_burst,
+            )
+        self._transport = self._create_transport(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            files_pool_maxsize=files_pool_maxsize,
+            keep_alive=keep_alive,
+            rate_limiter=rate_limiter,
+            retry_policy=_RetryPolicy(
+                max_retries=max_retries,
+                backoff_factor=retry_backoff_factor,
+                backoff_max=retry_backoff_max,
+                jitter=retry_jitter,
+            ),
+            token_pool=token_pool,
+            instrumentation=_Instrumentation(metrics=_Metrics() if collect_metrics else None),
+        )
+        self._response_cache = _ResponseCache(max_entries=cache_size) if cache_size else None
+        if persistent_cache is not None and persistent_cache != "":
+            self._persistent_cache = _PersistentCache(
+                path=persistent_cache,
+                ttl=persistent_cache_ttl,
+                max_size=persistent_cache_max_size,
+                scope=_token_scope(self.token),
+            )
+        else:
+            self._persistent_cache = None
+        if search_cache_size:
+            self._search_cache = _SearchCache(
+                max_entries=search_cache_size,
+                ttl=search_cache_ttl,
+                stale_ttl=search_cache_stale_ttl,
+            )
+        else:
+            self._search_cache = None
+
+    def _create_token_pool(
+        self,
+        strategy: str = None,
+        rate_limiter: _RateLimiter = None,
+        rate_limit: int = None,
+        rate_limit_period: float = None,
+        rate_limit_burst: int = None,
+    ) -> _TokenPool:
+        """Create a pool of all the tokens of the active config file section
+
+        The client's own token comes first and shares the rate limiter of the
+        client while each of the other tokens gets its own rate limit budget.
+        The empty and placeholder (``<FIXME>``) tokens are skipped.
+        """
+        section = "SANDBOX" if self._use_sandbox else "ZENODO"
+        tokens = [self.token]
+        for _, token in self.list_tokens(section):
+            token = token.strip()
+            if token and token != _placeholder_token and token not in tokens:
+                tokens.append(token)
+        rate_limiters = [rate_limiter]
+        for _ in tokens[1:]:
+            if rate_limiter is not None:
+                rate_limiters.append(
+                    _RateLimiter(rate=rate_limit, period=rate_limit_period, burst=rate_limit_burst)
                 )
             else:
-                logger.warning(
-                    f"WARNING: The config file ({self._config_file_path}) is found."
-                )
-            self._config_obj = self.read_config_file(self._config_file_path)
+                rate_limiters.append(None)
+        if len(tokens) == 1:
+            logger.warning(
+                f"WARNING: The [{section}] section of the config file lists a single token."
+            )
+        return _TokenPool(tokens=tokens, rate_limiters=rate_limiters, strategy=strategy)
+
+    def _create_transport(self, **kwargs):
+        """Create the HTTP transport owned by the client"""
+        return _Transport(base_url=self._base_url, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _request(self, method: str = None, url: str = None, **kwargs):
+        """Send an HTTP request through the client's pooled transport"""
+        return self._transport.request(method, url, **kwargs)
+
+    def _stream(self, method: str = None, url: str = None, **kwargs):
+        """Stream an HTTP response through the client's pooled transport"""
+        return self._transport.stream(method, url, **kwargs)
+
+    def _cache_lookup(self, url: str = None, revalidate: bool = False) -> tuple:
+        """Look the URL up in the caches
+
+        Returns the body of a fresh entry of the persistent cache (which is
+        served without any request) or None, the request headers revalidating
+        the cached copies of the resource and the stale persistent entry."""
+        stale = None
+        if self._persistent_cache is not None:
+            entry = self._persistent_cache.lookup(url, _url_kind(url, self._base_url))
+            if entry is not None:
+                if entry[3] and not revalidate:
+                    return entry[0], None, None
+                stale = entry
+        validators = {}
+        if self._response_cache is not None:
+            validators = self._response_cache.request_headers(url)
+        if not validators and stale is not None:
+            for key, value in zip(["If-None-Match", "If-Modified-Since"], stale[1:3]):
+                if value is not None:
+                    validators[key] = value
+        headers = dict(self._headers, **validators) if validators else self._headers
+        return None, headers, stale
+
+    def _cache_resolve(self, url: str = None, response=None, stale: tuple = None) -> (bytes | None):
+        """Body of a (conditional) GET response, served from the caches if
+        the resource is not modified. Returns None if the cached copy is gone
+        (the request must be re-sent unconditionally)."""
+        if self._response_cache is not None:
+            content = self._response_cache.resolve(url, response)
         else:
-            self._config_obj = self.read_config_file(self._config_file_path)
-        self._headers = {
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/json",
-        }
-        self._params = {}
-        self._params["access_token"] = self.token
+            content = None if response.status_code == 304 else response.content
+        if content is None and response.status_code == 304 and stale is not None:
+            content = stale[0]
+        if content is not None and self._persistent_cache is not None and response.status_code in [200, 304]:
+            self._persistent_cache.store(
+                url,
+                kind=_url_kind(url, self._base_url),
+                content=content,
+                etag=response.headers.get("ETag") or (stale[1] if stale else None),
+                last_modified=response.headers.get("Last-Modified") or (stale[2] if stale else None),
+            )
+        return content
+
+    def _get_json(self, url: str = None, revalidate: bool = False, check_status: bool = False):
+        """Fetch the JSON data of a single deposition/record/resource"""
+        content, headers, stale = self._cache_lookup(url, revalidate=revalidate)
+        if content is not None:
+            return loads(content)
+        response = self._request("GET", url, params=self._params, headers=headers)
+        content = self._cache_resolve(url, response, stale)
+        if content is None:
+            response = self._request("GET", url, params=self._params, headers=self._headers)
+            content = self._cache_resolve(url, response)
+        if check_status and response.status_code not in [200, 304]:
+            zenodo_error(response.status_code)
+        return loads(content)
+
+    def _get_search(self, url: str = None, params: dict = None, headers: dict = None) -> bytes:
+        """Body of a search result, served from the search cache if it is
+        fresh or stale (a stale result is refreshed in the background)"""
+        key = _search_key(url, params, headers)
+        content, state = self._search_cache.lookup(key)
+        if state == "stale" and self._search_cache.begin_refresh(key):
+            threading.Thread(
+                target=self._refresh_search, args=(key, url, params, headers), daemon=True
+            ).start()
+        if content is not None:
+            return content
+        response = self._request("GET", url, params=params, headers=headers)
+        if response.status_code != 200:
+            zenodo_error(response.status_code)
+        self._search_cache.store(key, response.content)
+        return response.content
+
+    def _refresh_search(self, key: tuple = None, url: str = None, params: dict = None, headers: dict = None) -> None:
+        try:
+            response = self._request("GET", url, params=params, headers=headers)
+            if response.status_code == 200:
+                self._search_cache.store(key, response.content)
+        except Exception as error:
+            logger.warning(f"WARNING: The refresh of a cached search result failed: {error}")
+        finally:
+            self._search_cache.end_refresh(key)
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections owned by the client
+
+        Examples
+        --------
+        >>> import zenopy
+        >>> with zenopy.Zenodo() as cli:
+        ...     records = cli.init_records().list_records(query="zenopy")
+        """
+        self._transport.close()
+        if self._persistent_cache is not None:
+            self._persistent_cache.close()
+
+    def cache_info(self) -> dict:
+        """Statistics of the conditional request cache
+
+        Returns
+        -------
+        dict
+            The number of ``hits`` (304 responses served from memory),
+            ``misses`` (full responses), ``evictions``, ``entries`` and
+            ``max_entries`` of the cache
+
+        Raises
+        ------
+        RuntimeError
+            If the cache is disabled (``cache_size=0``)
+        """
+        if self._response_cache is None:
+            raise RuntimeError("The response cache is disabled for this client.")
+        return self._response_cache.info()
+
+    def search_cache_info(self) -> dict:
+        """Statistics of the search result cache
+
+        Returns
+        -------
+        dict
+            The number of ``hits`` (fresh results), ``stale_hits`` (results
+            served while being refreshed), ``misses``, ``evictions``,
+            ``entries`` and ``max_entries`` of the cache
+
+        Raises
+        ------
+        RuntimeError
+            If the cache is disabled (``search_cache_size=0``)
+        """
+        if self._search_cache is None:
+            raise RuntimeError("The search cache is disabled for this client.")
+        return self._search_cache.info()
+
+    def clear_cache(self) -> None:
+        """Drop all the responses (and statistics) of the conditional request
+        and search caches. The persistent cache is left untouched (see
+        ``persistent_cache``)."""
+        if self._response_cache is not None:
+            self._response_cache.clear()
+        if self._search_cache is not None:
+            self._search_cache.clear()
+
+    @property
+    def persistent_cache(self) -> (_PersistentCache | None):
+        """The on-disk cache of the client (None if disabled). Besides
+        ``info()`` and ``clear()``, it provides ``save_snapshot(file_path)``
+        and ``load_snapshot(file_path)`` for warm-starting the cache of new
+        nodes from the one of a running worker."""
+        return self._persistent_cache
+
+    def prefetch_records(self, records: list[Record] = None, max_workers: int = 8) -> list[Record]:
+        """Fetch the data of lazy records concurrently
+
+        Parameters
+        ----------
+        records : list[Record]
+            Records, e.g., returned by ``retrieve_record(id_, lazy=True)``.
+            The records which are already fetched are skipped
+        max_workers : int, optional
+            Maximum number of concurrent requests, by default 8
+
+        Returns
+        -------
+        list[Record]
+            The (now fetched) records, in the same order
+
+        Examples
+        --------
+        >>> import zenopy
+        >>> cli = zenopy.Zenodo()
+        >>> records = [cli.init_records().retrieve_record(id_, lazy=True) for id_ in ids]
+        >>> cli.prefetch_records(records[:100])
+        """
+        return prefetch_records(records, max_workers=max_workers)
+
+    def register_hook(self, event: str = None, hook=None) -> None:
+        """Register a function called before or after every request
+
+        Parameters
+        ----------
+        event : str
+            Either ``"pre_request"`` or ``"post_request"``
+        hook : Callable[[dict], None]
+            Function called with a dictionary describing the request: its
+            ``method``, ``url`` and ``endpoint`` and, for the ``"post_request"``
+            event, its ``status_code``, ``error``, ``elapsed`` and ``wait``
+            times (in seconds), number of ``retries``, ``bytes_sent`` and
+            ``bytes_received``
+
+        Raises
+        ------
+        ValueError
+            If the event is not supported
+        TypeError
+            If the hook is not callable
+
+        Examples
+        --------
+        >>> import zenopy
+        >>> cli = zenopy.Zenodo()
+        >>> cli.register_hook("post_request", lambda info: print(info["endpoint"], info["elapsed"]))
+        """
+        self._transport.instrumentation.register_hook(event, hook)
+
+    def unregister_hook(self, event: str = None, hook=None) -> None:
+        """Remove a hook registered with ``register_hook()``"""
+        self._transport.instrumentation.unregister_hook(event, hook)
+
+    def stats(self, format: str = None) -> (dict | str):
+        """Return the request metrics collected by the client
+
+        Parameters
+        ----------
+        format : str, optional
+            ``"json"`` or ``"prometheus"`` to render the metrics in the JSON or
+            Prometheus text exposition format, by default None (dictionary)
+
+        Returns
+        -------
+        dict | str
+            The per-endpoint request counts, status code tallies, retries,
+            bytes sent/received, time spent waiting for the rate limiter and
+            the latency statistics (mean, min, max, percentiles and histogram
+            buckets) together with their totals
+
+        Raises
+        ------
+        RuntimeError
+            If the client was created with ``collect_metrics=False``
+        ValueError
+            If the format is not supported
+        """
+        metrics = self._transport.instrumentation.metrics
+        if metrics is None:
+            raise RuntimeError("The client was created with 'collect_metrics=False'.")
+        if format is None:
+            return metrics.snapshot()
+        elif format == "json":
+            return metrics.to_json(indent=2)
+        elif format == "prometheus":
+            return metrics.to_prometheus()
+        else:
+            raise ValueError(
+                f"Invalid format ({format}). "
+                "The format can either be None, 'json' or 'prometheus'."
+            )
+
+    def reset_stats(self) -> None:
+        """Discard the request metrics collected so far"""
+        metrics = self._transport.instrumentation.metrics
+        if metrics is not None:
+            metrics.reset()
+
+    def export_stats(self, file_path: (str | Path) = None, format: str = "prometheus") -> None:
+        """Write the request metrics to a file
+
+        The file is replaced atomically so that it can be scraped by e.g.,
+        the textfile collector of the Prometheus node exporter.
+
+        Parameters
+        ----------
+        file_path : str | Path
+            Path of the output file
+        format : str, optional
+            ``"json"`` or ``"prometheus"``, by default "prometheus"
+        """
+        if file_path is None or file_path == "" or format is None:
+            raise ValueError("The 'file_path' and 'format' arguments cannot be None or empty.")
+        path = Path(file_path).expanduser()
+        text = self.stats(format=format)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
 
     @property
     def config_obj(self) -> configparser.ConfigParser:
@@ -99,7 +619,7 @@ class Zenodo(object):
             all authentication tokens and credentials in memory.
         """
         if self._config_obj is None:
-            return self.read_config_file(self._config_file_path)
+            self._config_obj = self.read_config_file(self._config_file_path)
         return self._config_obj
 
     @config_obj.setter
@@ -113,6 +633,7 @@ class Zenodo(object):
             client class' corresponding attribute.
         """
         self._config_obj = cfg_obj
+        self._config_owned = True
 
     @property
     def token(self) -> str:
@@ -127,13 +648,14 @@ class Zenodo(object):
         """
         if self._token is None or self._token == "":
             section = "SANDBOX" if self._use_sandbox else "ZENODO"
-            if section not in self._config_obj.sections():
+            if section not in self.config_obj.sections():
                 raise configparser.NoSectionError(
                     f"Section [{section}] does not exist in {self._config_file_path}."
                 )
             # Check to see if the section is empty
-            if self.list_tokens(section):
-                self._token = self.list_tokens(section)[0][1]
+            tokens = self.list_tokens(section)
+            if tokens:
+                self._token = tokens[0][1]
             else:
                 raise configparser.Error(f"The [{section}] of the config parser is empty.")
         return self._token
@@ -202,9 +724,8 @@ class Zenodo(object):
             config_obj["ZENODO"] = {}
             config_obj["SANDBOX"] = {}
             section = "SANDBOX" if self._use_sandbox else "ZENODO"
-            config_obj[section]["token"] = "<FIXME>"
-            with open(path, "w") as f:
-                config_obj.write(f)
+            config_obj[section]["token"] = _placeholder_token
+            _config_cache.write(path, config_obj)
         else:
             raise configparser.Error(f"A config file already exists in '{path}'.")
 
@@ -345,7 +866,7 @@ class Zenodo(object):
         >>> cli.list_sections()
         ['ZENODO', 'SANDBOX']
         """
-        return self._config_obj.sections()
+        return self.config_obj.sections()
 
     def list_tokens(self, section: str = None) -> list[tuple[str, str]]:
         """List all tokens in a specific section
@@ -371,11 +892,11 @@ class Zenodo(object):
                 f"A section name is needed as an argument."
             )
         section = section.upper()
-        if section not in self._config_obj.sections():
+        if section not in self.config_obj.sections():
             raise configparser.NoSectionError(
                 f"Section [{section}] does not exist in {self._config_file_path}."
             )
-        return list(self._config_obj[section].items())
+        return list(self.config_obj[section].items())
 
     def read_config_file(
         self, config_file_path: str = None
@@ -385,7 +906,8 @@ class Zenodo(object):
         Reads the config file from a path pointed to by
         the ``config_file_path`` argument and returns a
         ``configparser.ConfigParser`` object constructed from
-        it.
+        it. The parsed config files are cached process-wide and
+        are only re-read when they change on disk.
 
         Returns
         -------
@@ -410,9 +932,7 @@ class Zenodo(object):
                 f"You need a config file to publish to Zenodo. "
                 "See the documentation for more details."
             )
-        config_obj = configparser.ConfigParser()
-        config_obj.read(path)
-        return config_obj
+        return _config_cache.read(path)
 
     def read_token(self, section: str = None, key: str = None) -> str:
         """Reading a specific token from a selected section
@@ -433,13 +953,15 @@ class Zenodo(object):
         upper case.
         """
         section = section.upper()
-        return self._config_obj.get(section, key)
+        return self.config_obj.get(section, key)
 
     def update_config_file(self) -> None:
         """Commit the current contents of the config object to config file on disk 
         
         Commits the current contents of the client instance's active ``_config_obj`` 
         attribute to the config file located at ``_config_file_path`` on disk.
+        The file is replaced atomically while holding a lock so that concurrent
+        clients (threads or processes) never leave a truncated config file behind.
 
         Raises
         ------
@@ -449,8 +971,8 @@ class Zenodo(object):
         """
         path = Path(self._config_file_path).expanduser()
         if path.exists():
-            with open(path, "w") as f:
-                self._config_obj.write(f)
+            _config_cache.write(path, self.config_obj)
+            self._config_owned = False
         else:
             raise configparser.Error(f"No config file exists in '{path}'.")
 
@@ -485,10 +1007,13 @@ class Zenodo(object):
         if key is None:
             raise configparser.NoOptionError(f"A token name is needed as an argument.")
         section = section.upper()
-        if not self._config_obj.has_section(section):
+        if not self.config_obj.has_section(section):
             raise configparser.NoSectionError(
                 f"Section [{section}] does not exist in {self._config_file_path}."
             )
+        if not self._config_owned:
+            self._config_obj = _copy_config(self._config_obj)
+            self._config_owned = True
         if self._config_obj.has_option(section, key):
             if force_rewrite:
                 logger.warning(
@@ -502,3 +1027,201 @@ class Zenodo(object):
                     "Set 'force_rewrite = True' if you want to overwrite the token."
                 )
         self._config_obj.set(section, key, token)
+
+
+class AsyncZenodo(Zenodo):
+    """zenopy asynchronous client class
+
+    The asynchronous counterpart of the ``Zenodo`` client class. It shares
+    the configuration file and token handling with ``Zenodo`` but its
+    subsystems expose coroutines for all Zenodo REST API endpoints which
+    allows running hundreds of in-flight requests from a single event loop.
+    This client requires the optional ``httpx`` package.
+
+    Examples
+    --------
+    >>> import asyncio
+    >>> import zenopy
+    >>> async def main():
+    ...     async with zenopy.AsyncZenodo() as cli:
+    ...         rec_obj = cli.init_records()
+    ...         return await asyncio.gather(
+    ...             *[rec_obj.retrieve_record(id_=idx) for idx in [7057402, 7057403]]
+    ...         )
+    >>> records = asyncio.run(main())
+    """
+    def __init__(
+        self,
+        token: str = None,
+        config_file_path: (str | Path) = None,
+        use_sandbox: bool = False,
+        pool_maxsize: int = 100,
+        **kwargs,
+    ):
+        """zenopy asynchronous client class constructor
+
+        The keyword arguments are the same as those of the ``Zenodo``
+        constructor, except for ``pool_connections`` which is ignored (the
+        ``httpx`` client keeps a single connection pool).
+
+        Parameters
+        ----------
+        token : str, optional
+            Token created through a personal Zenodo account (see ``Zenodo``),
+            by default empty
+        config_file_path : str  |  Path, optional
+            Path to the configuration file listing Zenodo (and Sandbox) account(s)'
+            tokens (see ``Zenodo``), by default None
+        use_sandbox : bool, optional
+            If True, the tokens will be read from the [SANDBOX] section of the
+            configuration file, by default False
+        pool_maxsize : int, optional
+            Maximum number of concurrent connections for the REST API calls,
+            by default 100
+        """
+        super().__init__(
+            token=token,
+            config_file_path=config_file_path,
+            use_sandbox=use_sandbox,
+            pool_maxsize=pool_maxsize,
+            **kwargs,
+        )
+        # Background refreshes of the stale search results
+        self._refresh_tasks = set()
+
+    def _create_transport(self, pool_connections: int = None, **kwargs):
+        """Create the asynchronous HTTP transport owned by the client"""
+        return _AsyncTransport(base_url=self._base_url, **kwargs)
+
+    def __enter__(self):
+        raise TypeError("Use 'async with' with the asynchronous zenopy client.")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def _request(self, method: str = None, url: str = None, **kwargs):
+        """Send an HTTP request through the client's pooled transport"""
+        return await self._transport.request(method, url, **kwargs)
+
+    def _stream(self, method: str = None, url: str = None, **kwargs):
+        """Stream an HTTP response through the client's pooled transport"""
+        return self._transport.stream(method, url, **kwargs)
+
+    async def _get_record(self, url: str = None) -> Record:
+        """Fetch a single deposition/record/resource and wrap it in a Record"""
+        content, headers, stale = self._cache_lookup(url)
+        if content is not None:
+            return Record(self, record=loads(content))
+        response = await self._request("GET", url, params=self._params, headers=headers)
+        content = self._cache_resolve(url, response, stale)
+        if content is None:
+            response = await self._request("GET", url, params=self._params, headers=self._headers)
+            content = self._cache_resolve(url, response)
+        if response.status_code not in [200, 304]:
+            zenodo_error(response.status_code)
+        return Record(self, record=loads(content))
+
+    async def _get_search(self, url: str = None, params: dict = None, headers: dict = None) -> bytes:
+        """Body of a search result served from the search cache (see
+        ``Zenodo._get_search``)"""
+        key = _search_key(url, params, headers)
+        content, state = self._search_cache.lookup(key)
+        if state == "stale" and self._search_cache.begin_refresh(key):
+            task = asyncio.ensure_future(self._refresh_search(key, url, params, headers))
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._refresh_tasks.discard)
+        if content is not None:
+            return content
+        response = await self._request("GET", url, params=params, headers=headers)
+        if response.status_code != 200:
+            zenodo_error(response.status_code)
+        self._search_cache.store(key, response.content)
+        return response.content
+
+    async def _refresh_search(
+        self, key: tuple = None, url: str = None, params: dict = None, headers: dict = None
+    ) -> None:
+        try:
+            response = await self._request("GET", url, params=params, headers=headers)
+            if response.status_code == 200:
+                self._search_cache.store(key, response.content)
+        except Exception as error:
+            logger.warning(f"WARNING: The refresh of a cached search result failed: {error}")
+        finally:
+            self._search_cache.end_refresh(key)
+
+    async def prefetch_records(self, records: list[Record] = None, max_workers: int = 8) -> list[Record]:
+        """Fetch the data of lazy records concurrently (see
+        ``Zenodo.prefetch_records``)"""
+        semaphore = asyncio.Semaphore(max_workers)
+        pending = list({id(record): record for record in records if not record.hydrated}.values())
+
+        async def fetch(record: Record) -> None:
+            async with semaphore:
+                record.data = (await self._get_record(record._record_url)).data
+
+        await asyncio.gather(*[fetch(record) for record in pending])
+        return records
+
+    async def close(self) -> None:
+        """Close the pooled HTTP connections owned by the client"""
+        for task in list(self._refresh_tasks):
+            task.cancel()
+        await self._transport.close()
+        if self._persistent_cache is not None:
+            self._persistent_cache.close()
+
+    def init_deposition(self):
+        """Creates an instance of the _AsyncDepositions class
+
+        Returns
+        -------
+        : zenopy.depositions._AsyncDepositions
+            An instance of the ``zenopy.depositions._AsyncDepositions`` class
+        """
+        return _AsyncDepositions(self)
+
+    def init_deposition_actions(self):
+        """Creates an instance of the _AsyncDepositionActions class
+
+        Returns
+        -------
+        : zenopy.deposition_actions._AsyncDepositionActions
+            An instance of the ``zenopy.deposition_actions._AsyncDepositionActions``
+            class
+        """
+        return _AsyncDepositionActions(self)
+
+    def init_deposition_file(self):
+        """Creates an instance of the _AsyncDepositionFiles class
+
+        Returns
+        -------
+        : zenopy.deposition_files._AsyncDepositionFiles
+            An instance of the ``zenopy.deposition_files._AsyncDepositionFiles``
+            class
+        """
+        return _AsyncDepositionFiles(self)
+
+    def init_records(self):
+        """Creates an instance of the _AsyncRecords class
+
+        Returns
+        -------
+        : zenopy.records._AsyncRecords
+            An instance of the ``zenopy.records._AsyncRecords`` class
+        """
+        return _AsyncRecords(self)
+
+    def init_resources(self, resource: str = None):
+        """Creates an instance of the _AsyncResources class
+
+        Returns
+        -------
+        : zenopy.resources._AsyncResources
+            An instance of the ``zenopy.resources._AsyncResources`` class
+        """
+        return _AsyncResources(self, resource=resource)
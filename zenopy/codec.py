@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""Zenodo JSON encoding and decoding backends
+
+"""
+
+import json
+import os
+import threading
+import logging
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+# Supported JSON backends, in the order of preference of the "auto" selection
+json_backends = ("orjson", "msgspec", "json")
+
+# Request headers of the JSON request bodies encoded by ``dumps``
+json_headers = MappingProxyType({"Content-Type": "application/json"})
+
+_lock = threading.Lock()
+_backend = None
+
+
+class _JSONBackend(object):
+    """The ``loads`` (bytes | str -> object) and ``dumps`` (object -> bytes)
+    functions of a JSON library"""
+
+    __slots__ = ("name", "loads", "dumps")
+
+    def __init__(self, name: str = None, loads=None, dumps=None):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+
+def _stdlib_dumps(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _load_backend(name: str = None) -> _JSONBackend:
+    """Import the JSON library ``name`` (raises ImportError if missing)"""
+    if name == "orjson":
+        import orjson
+
+        return _JSONBackend(name, orjson.loads, orjson.dumps)
+    elif name == "msgspec":
+        import msgspec.json
+
+        decoder = msgspec.json.Decoder()
+        encoder = msgspec.json.Encoder()
+        return _JSONBackend(name, decoder.decode, encoder.encode)
+    elif name == "json":
+        return _JSONBackend(name, json.loads, _stdlib_dumps)
+    else:
+        raise ValueError(
+            f"Invalid JSON backend ({name}).\n"
+            f"Possible values are: {['auto', *json_backends]}\n"
+        )
+
+
+def set_json_backend(name: str = "auto") -> str:
+    """Select the JSON library used for decoding the responses and encoding
+    the request bodies of all the zenopy clients.
+
+    ``"auto"`` picks the fastest installed library among orjson, msgspec
+    and the standard library json module. The initial selection can also be
+    made with the ``ZENOPY_JSON_BACKEND`` environment variable. Returns the
+    name of the selected backend."""
+    global _backend
+    if name is None or name == "auto":
+        for candidate in json_backends:
+            try:
+                backend = _load_backend(candidate)
+                break
+            except ImportError:
+                continue
+    else:
+        backend = _load_backend(name)
+    with _lock:
+        _backend = backend
+    return backend.name
+
+
+def get_json_backend() -> str:
+    """Name of the JSON library in use"""
+    return _get_backend().name
+
+
+def _get_backend() -> _JSONBackend:
+    if _backend is None:
+        name = os.environ.get("ZENOPY_JSON_BACKEND", "auto")
+        try:
+            set_json_backend(name)
+        except (ImportError, ValueError):
+            logger.warning(
+                f"WARNING: The JSON backend ({name}) set by ZENOPY_JSON_BACKEND is "
+                "not available. The fastest installed backend is used instead."
+            )
+            set_json_backend("auto")
+    return _backend
+
+
+def loads(content: (bytes | str) = None):
+    """Decode a JSON document (e.g., the body of a response)"""
+    return _get_backend().loads(content)
+
+
+def dumps(obj=None) -> bytes:
+    """Encode an object as a (compact, UTF-8) JSON document"""
+    return _get_backend().dumps(obj)
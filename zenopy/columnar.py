@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+"""Zenodo columnar (NumPy/pandas/Arrow) export of record listings
+
+"""
+
+from datetime import date, datetime, timezone
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING
+from zenopy.views import RecordView, _lookup, _metadata
+
+if TYPE_CHECKING:
+    import numpy
+    import pandas
+    import pyarrow
+
+logger = logging.getLogger(__name__)
+
+
+def _int(value) -> (int | None):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _timestamp(value: str = None) -> (datetime | None):
+    """UTC timestamp of an ISO 8601 date and time"""
+    if not value:
+        return None
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+
+def _date(value: str = None) -> (date | None):
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        return None
+
+
+def _files(data: dict = None) -> list:
+    files = data.get("files")
+    return files if isinstance(files, list) else []
+
+
+def _file_size(file_: dict = None) -> int:
+    return _int(file_.get("size", file_.get("filesize"))) or 0
+
+
+def _stat(name: str = None):
+    def getter(data: dict = None) -> (int | None):
+        stats = data.get("stats")
+        return _int(stats.get(name)) if isinstance(stats, dict) else None
+
+    return getter
+
+
+# Extraction of the columns from the record JSON data and their types:
+# "int", "str", "date" (publication date) or "timestamp" (UTC)
+_columns = {
+    "id": (lambda data: _int(data.get("id", data.get("record_id"))), "int"),
+    "conceptrecid": (lambda data: _int(data.get("conceptrecid")), "int"),
+    "doi": (lambda data: data.get("doi") or _metadata(data).get("doi") or None, "str"),
+    "title": (lambda data: data.get("title") or _metadata(data).get("title"), "str"),
+    "upload_type": (
+        lambda data: (_metadata(data).get("resource_type") or {}).get("type")
+        or _metadata(data).get("upload_type"),
+        "str",
+    ),
+    "access_right": (lambda data: _metadata(data).get("access_right"), "str"),
+    "publication_date": (lambda data: _date(_metadata(data).get("publication_date")), "date"),
+    "created": (lambda data: _timestamp(data.get("created")), "timestamp"),
+    "modified": (lambda data: _timestamp(data.get("modified", data.get("updated"))), "timestamp"),
+    "creators": (
+        lambda data: "; ".join(
+            creator.get("name", "") for creator in _metadata(data).get("creators") or []
+        ),
+        "str",
+    ),
+    "n_creators": (lambda data: len(_metadata(data).get("creators") or []), "int"),
+    "n_files": (lambda data: len(_files(data)), "int"),
+    "total_size": (lambda data: sum(_file_size(file_) for file_ in _files(data)), "int"),
+    "downloads": (_stat("downloads"), "int"),
+    "views": (_stat("views"), "int"),
+}
+
+# Columns exported by default
+column_fields = tuple(_columns)
+
+
+def _record_data(record=None) -> dict:
+    """JSON data of a Record, a RecordView or a dictionary"""
+    if isinstance(record, dict):
+        return record
+    if isinstance(record, RecordView):
+        data = record.to_dict()
+        data["metadata"] = {
+            "creators": [{"name": name} for name in record.creators or ()],
+            "publication_date": record.publication_date,
+        }
+        for key, value in (record.extra or {}).items():
+            if key.startswith("metadata."):
+                data["metadata"][key[len("metadata."):]] = value
+        data["files"] = [{"key": key, "size": size} for key, size in record.files or ()]
+        return data
+    return record.data
+
+
+def _column_types(fields: tuple = None) -> dict:
+    return {field: _columns[field][1] if field in _columns else "object" for field in fields}
+
+
+def to_columns(records: list = None, fields: list[str] = None) -> dict[str, list]:
+    """Flatten the records (in a single pass) into a dictionary of columns
+
+    The ``fields`` are column names (see ``column_fields``) or dot-separated
+    paths in the record data (e.g., ``"metadata.keywords"``). The creators are
+    exported as "; "-separated names and the files as their number and total
+    size. The dates are ``datetime.date`` and the timestamps UTC
+    ``datetime.datetime`` objects. Missing values are None."""
+    fields = tuple(fields or column_fields)
+    getters = []
+    for field in fields:
+        if field in _columns:
+            getters.append(_columns[field][0])
+        else:
+            getters.append(lambda data, path=field: _lookup(data, path))
+    columns = {field: [] for field in fields}
+    appends = [columns[field].append for field in fields]
+    for record in records:
+        data = _record_data(record)
+        for getter, append in zip(getters, appends):
+            append(getter(data))
+    return columns
+
+
+def to_numpy(records: list = None, fields: list[str] = None) -> "numpy.ndarray":
+    """Export the records to a NumPy structured array (see ``to_columns``).
+    Missing integers are set to -1 and missing dates to NaT."""
+    import numpy as np
+
+    columns = to_columns(records, fields)
+    types = _column_types(tuple(columns))
+    arrays = {}
+    for field, values in columns.items():
+        if types[field] == "int":
+            arrays[field] = np.array([-1 if value is None else value for value in values], dtype="int64")
+        elif types[field] == "date":
+            arrays[field] = np.array(values, dtype="datetime64[D]")
+        elif types[field] == "timestamp":
+            arrays[field] = np.array(
+                [None if value is None else value.replace(tzinfo=None) for value in values],
+                dtype="datetime64[us]",
+            )
+        else:
+            # Filled item by item so that list values are never broadcast
+            arrays[field] = np.empty(len(values), dtype=object)
+            for index, value in enumerate(values):
+                arrays[field][index] = value
+    size = len(next(iter(arrays.values())))
+    table = np.empty(size, dtype=[(field, array.dtype) for field, array in arrays.items()])
+    for field, array in arrays.items():
+        table[field] = array
+    return table
+
+
+def to_pandas(records: list = None, fields: list[str] = None) -> "pandas.DataFrame":
+    """Export the records to a pandas DataFrame (see ``to_columns``) with
+    nullable integer and UTC datetime columns"""
+    import pandas as pd
+
+    columns = to_columns(records, fields)
+    types = _column_types(tuple(columns))
+    data = {}
+    for field, values in columns.items():
+        if types[field] == "int":
+            data[field] = pd.array(values, dtype="Int64")
+        elif types[field] in ["date", "timestamp"]:
+            data[field] = pd.to_datetime(values, utc=types[field] == "timestamp")
+        else:
+            data[field] = values
+    return pd.DataFrame(data)
+
+
+def to_arrow(records: list = None, fields: list[str] = None) -> "pyarrow.Table":
+    """Export the records to an Arrow table (see ``to_columns``)"""
+    import pyarrow as pa
+
+    columns = to_columns(records, fields)
+    types = _column_types(tuple(columns))
+    arrow_types = {
+        "int": pa.int64(),
+        "str": pa.string(),
+        "date": pa.date32(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.table(
+        {
+            field: pa.array(values, type=arrow_types.get(types[field]))
+            for field, values in columns.items()
+        }
+    )
+
+
+def to_parquet(records: list = None, file_path: (str | Path) = None, fields: list[str] = None) -> None:
+    """Write the records to a Parquet file (see ``to_arrow``)"""
+    import pyarrow.parquet as pq
+
+    pq.write_table(to_arrow(records, fields), Path(file_path).expanduser())
+
+
+class RecordList(list):
+    """List of the Records (or RecordViews) returned by the listings, which
+    can be exported to columnar formats. NumPy, pandas and pyarrow are
+    optional dependencies imported upon the first export."""
+
+    def to_columns(self, fields: list[str] = None) -> dict[str, list]:
+        return to_columns(self, fields)
+
+    def to_numpy(self, fields: list[str] = None) -> "numpy.ndarray":
+        return to_numpy(self, fields)
+
+    def to_pandas(self, fields: list[str] = None) -> "pandas.DataFrame":
+        return to_pandas(self, fields)
+
+    def to_arrow(self, fields: list[str] = None) -> "pyarrow.Table":
+        return to_arrow(self, fields)
+
+    def to_parquet(self, file_path: (str | Path) = None, fields: list[str] = None) -> None:
+        to_parquet(self, file_path, fields)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+"""Zenodo client configuration file cache
+
+"""
+
+import configparser
+import contextlib
+import io
+import os
+import stat
+import tempfile
+import threading
+from pathlib import Path
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover (Windows)
+    fcntl = None
+
+
+class _ConfigCache(object):
+    """Process-wide cache of the parsed configuration files
+
+    The parsed ``ConfigParser`` objects are keyed by the absolute path of
+    the configuration file and are only re-read from disk when the file's
+    modification time (or size, or inode) changes. The cached objects are
+    shared between clients, which take a private copy before modifying them
+    (see ``Zenodo.write_token()``).
+
+    Writes are atomic (a temporary file is renamed over the config file)
+    and protected by a thread lock as well as an advisory lock file so that
+    concurrently launched processes do not corrupt the configuration file.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(path: Path) -> tuple[int, int, int]:
+        path_stat = path.stat()
+        return (path_stat.st_mtime_ns, path_stat.st_size, path_stat.st_ino)
+
+    def read(self, config_file_path: (str | Path) = None) -> configparser.ConfigParser:
+        """Return the (cached) parsed contents of a configuration file."""
+        path = Path(config_file_path).expanduser().absolute()
+        signature = self._signature(path)
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                return entry[1]
+        config_obj = configparser.ConfigParser()
+        config_obj.read(path)
+        with self._lock:
+            self._entries[key] = (signature, config_obj)
+        return config_obj
+
+    def write(
+        self, config_file_path: (str | Path) = None, config_obj: configparser.ConfigParser = None
+    ) -> None:
+        """Atomically write a ``ConfigParser`` object to a configuration file."""
+        path = Path(config_file_path).expanduser().absolute()
+        with self._lock, _file_lock(path):
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=f".{path.name}.", suffix=".tmp", dir=path.parent
+            )
+            try:
+                with os.fdopen(fd, "w") as f:
+                    config_obj.write(f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                if path.exists():
+                    os.chmod(tmp_path, stat.S_IMODE(path.stat().st_mode))
+                os.replace(tmp_path, path)
+            except BaseException:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(tmp_path)
+                raise
+            self._entries[str(path)] = (self._signature(path), config_obj)
+
+    def clear(self) -> None:
+        """Drop all the cached configuration files."""
+        with self._lock:
+            self._entries.clear()
+
+
+@contextlib.contextmanager
+def _file_lock(path: Path = None):
+    """Inter-process advisory lock guarding the writes to a config file"""
+    if fcntl is None:
+        yield
+        return
+    lock_path = path.with_name(f".{path.name}.lock")
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _copy_config(config_obj: configparser.ConfigParser = None) -> configparser.ConfigParser:
+    """Create a private copy of a (shared) ConfigParser object"""
+    buffer = io.StringIO()
+    config_obj.write(buffer)
+    copy_obj = configparser.ConfigParser()
+    copy_obj.read_string(buffer.getvalue())
+    return copy_obj
+
+
+_config_cache = _ConfigCache()
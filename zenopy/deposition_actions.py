@@ -4,10 +4,10 @@
 
 """
 
-import requests
 import json
 import logging
 
+from zenopy.codec import loads
 from zenopy.errors import request_error
 from zenopy.metadata import deposition_actions
 from zenopy.record import Record
@@ -15,7 +15,7 @@ from zenopy.record import Record
 logger = logging.getLogger(__name__)
 
 class _DepositionActions(object):
-    """The Deposition actions class for publishing, editing, discarding 
+    """The Deposition actions class for publishing, editing, discarding
     and versioning of the Zenodo records/depositions."""
     def __init__(self, client):
         self._client = client
@@ -23,28 +23,27 @@ class _DepositionActions(object):
         self._deposit_action_url = client._base_url + "/deposit/depositions/@id/actions"
         self.data = {}
 
-    def deposition_action(self, id_: int = None, action: str = None, return_newversion: bool = True) -> "(None | Record)":
-        """Performing actions on Zenodo depositions/records"""
+    def deposition_action(
+        self, id_: int = None, action: str = None, return_newversion: bool = True, lazy: bool = False
+    ) -> "(None | Record)":
+        """Performing actions on Zenodo depositions/records. The new version
+        draft is fetched upon the first access of its data if ``lazy``."""
+        tmp_url = self._deposition_action_url(id_=id_, action=action)
+        response = self._client._request("POST", url=tmp_url, params=self._params)
+        record = self._handle_deposition_action(response)
+        if action == "newversion" and return_newversion:
+            return Record(self._client, url=self._latest_draft_url(record), lazy=lazy)
+        else:
+            return Record(self._client, record=record)
+
+    def _deposition_action_url(self, id_: int = None, action: str = None) -> str:
+        """Validate the action arguments and build the action URL."""
         if id_ is not None and isinstance(id_, int):
             if action is not None and action != "":
                 if action in deposition_actions.keys():
                     tmp_url = self._deposit_action_url.strip().replace("@id", str(id_))
                     tmp_url += f"/{action}"
-                    response = requests.post(url=tmp_url, params=self._params)
-                    status_code = response.status_code
-                    if status_code not in [200, 201, 202]:
-                        request_error(response=response)
-                    else:
-                        record = response.json()
-                        if action == "newversion" and return_newversion:
-                            if "latest_draft" in record["links"].keys():
-                                return Record(self._client, url=record["links"]["latest_draft"])
-                            else:
-                                raise KeyError(
-                                    "The 'latest_draft' key does not exist in the deposit/record."
-                                )
-                        else:
-                            return Record(self._client, record=record)
+                    return tmp_url
                 else:
                     raise ValueError(
                         "The 'action' argument can take one of the following values:\n"
@@ -58,3 +57,37 @@ class _DepositionActions(object):
             raise ValueError(
                 "The deposition ID cannot be None and must be an integer."
             )
+
+    def _handle_deposition_action(self, response) -> dict:
+        status_code = response.status_code
+        if status_code not in [200, 201, 202]:
+            request_error(response=response)
+        return loads(response.content)
+
+    def _latest_draft_url(self, record: dict = None) -> str:
+        if "latest_draft" in record["links"].keys():
+            return record["links"]["latest_draft"]
+        else:
+            raise KeyError(
+                "The 'latest_draft' key does not exist in the deposit/record."
+            )
+
+
+class _AsyncDepositionActions(_DepositionActions):
+    """Asynchronous counterpart of the ``_DepositionActions`` class created
+    by the ``zenopy.AsyncZenodo`` client."""
+
+    async def deposition_action(
+        self, id_: int = None, action: str = None, return_newversion: bool = True, lazy: bool = False
+    ) -> "(None | Record)":
+        """Performing actions on Zenodo depositions/records. A lazy new
+        version draft is fetched by the client's ``prefetch_records()``."""
+        tmp_url = self._deposition_action_url(id_=id_, action=action)
+        response = await self._client._request("POST", url=tmp_url, params=self._params)
+        record = self._handle_deposition_action(response)
+        if action == "newversion" and return_newversion:
+            if lazy:
+                return Record(self._client, url=self._latest_draft_url(record), lazy=True)
+            return await self._client._get_record(self._latest_draft_url(record))
+        else:
+            return Record(self._client, record=record)
@@ -4,13 +4,14 @@
 
 """
 
-import requests
-import validators
+import asyncio
 from pathlib import Path
 from typing import Type
 import logging
+from zenopy.codec import dumps, json_headers, loads
 from zenopy.record import Record
 from zenopy.errors import zenodo_error
+from zenopy.views import RecordView, _view_fields, file_view_fields
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,10 @@ class _DepositionFiles(object):
     """The Deposition file resource is used for uploading
     and editing files of a deposition on Zenodo."""
 
+    # Size of the chunks read from (written to) disk while streaming the
+    # file uploads (downloads)
+    _chunk_size = 1024 * 1024
+
     def __init__(self, client):
         self._client = client
         self._params = client._params
@@ -32,6 +37,26 @@ class _DepositionFiles(object):
         record: Type[Record] = None,
     ) -> Record:
         """Upload a new file (into an existing deposition record)."""
+        path, tmp_url = self._upload_target(
+            file_path=file_path, bucket_url=bucket_url, record=record
+        )
+        if tmp_url is not None:
+            with open(path, "rb") as fp:
+                response = self._client._request(
+                    "PUT",
+                    url=tmp_url,
+                    data=fp,
+                    params=self._params,
+                )
+                return self._handle_create_deposition_file(response)
+
+    def _upload_target(
+        self,
+        file_path: (str | Path) = None,
+        bucket_url: str = None,
+        record: Type[Record] = None,
+    ) -> tuple[Path, (str | None)]:
+        """Validate the upload arguments and build the bucket file URL."""
         if file_path is not None and file_path != "":
             if isinstance(file_path, str):
                 path = Path(file_path).expanduser()
@@ -48,27 +73,33 @@ class _DepositionFiles(object):
                     raise ValueError(
                         "Both 'bucket_url' and 'record' are of None or wrong type."
                     )
+                import validators
+
                 is_valid = validators.url(tmp_url)
                 is_valid = tmp_url.startswith(self._client._base_url + "/files")
                 if is_valid:
-                    with open(path, "rb") as fp:
-                        response = requests.put(
-                            url="%s/%s" % (tmp_url, path.name),
-                            data=fp,
-                            params=self._params,
-                        )
-                        status_code = response.status_code
-                        if status_code not in [200, 201]:
-                            zenodo_error(status_code)
-                        return Record(self._client, record=response)
+                    return path, "%s/%s" % (tmp_url, path.name)
                 else:
                     raise RuntimeError(f"The provided path ({path}) is not valid.")
+            return path, None
         else:
             raise ValueError("The 'file_path' argument cannot be None or empty.")
 
+    def _handle_create_deposition_file(self, response) -> Record:
+        status_code = response.status_code
+        if status_code not in [200, 201]:
+            zenodo_error(status_code)
+        return Record(self._client, record=loads(response.content))
+
     def delete_deposition_file(self, id_: int = None, file_id: str = None) -> None:
         """Delete an existing deposition file resource. Note, only
         deposition files for unpublished depositions may be deleted."""
+        tmp_url = self._deposition_file_url(id_=id_, file_id=file_id)
+        response = self._client._request("DELETE", url=tmp_url, params=self._params)
+        self._handle_delete_deposition_file(response, tmp_url)
+
+    def _deposition_file_url(self, id_: int = None, file_id: str = None) -> str:
+        """Build the URL of a single deposition file resource."""
         if id_ is not None and isinstance(id_, int):
             if file_id is not None and file_id != "":
                 tmp_url = self._deposits_url.strip().replace("@id", str(id_))
@@ -77,7 +108,16 @@ class _DepositionFiles(object):
                 raise ValueError("The deposition file ID cannot be None or empty.")
         else:
             raise ValueError("The deposition ID cannot be None and must be an integer.")
-        response = requests.delete(url=tmp_url, params=self._params)
+        return tmp_url
+
+    def _deposition_files_url(self, id_: int = None) -> str:
+        """Build the URL of the files collection of a deposition."""
+        if id_ is not None and isinstance(id_, int):
+            return self._deposits_url.strip().replace("@id", str(id_))
+        else:
+            raise ValueError("The deposition ID cannot be None and must be an integer.")
+
+    def _handle_delete_deposition_file(self, response, tmp_url: str = None) -> None:
         status_code = response.status_code
         if status_code in [200, 204]:
             logger.warning(
@@ -87,19 +127,25 @@ class _DepositionFiles(object):
         else:
             zenodo_error(status_code)
 
-    def list_deposition_files(self, id_: int = None) -> list[Record]:
-        """List all deposition files for a given deposition"""
-        if id_ is not None and isinstance(id_, int):
-            tmp_url = self._deposits_url.strip().replace("@id", str(id_))
-        else:
-            raise ValueError("The deposition ID cannot be None and must be an integer.")
-        response = requests.get(url=tmp_url, params=self._params)
+    def list_deposition_files(self, id_: int = None, view: (bool | list[str]) = False) -> list[Record]:
+        """List all deposition files for a given deposition (as compact
+        read-only ``RecordView`` objects if ``view``)"""
+        tmp_url = self._deposition_files_url(id_=id_)
+        response = self._client._request("GET", url=tmp_url, params=self._params)
+        return self._handle_record_list(response, status_codes=[200, 201], view=view)
+
+    def _handle_record_list(
+        self, response, status_codes: list[int] = None, view: (bool | list[str]) = False
+    ) -> list[Record]:
         status_code = response.status_code
-        if status_code not in [200, 201]:
+        if status_code not in status_codes:
             zenodo_error(status_code)
-        search_result = response.json()
+        fields = _view_fields(view, default=file_view_fields)
+        search_result = loads(response.content)
         records_list = []
         if isinstance(search_result, list):
+            if fields is not None:
+                return [RecordView(record, fields) for record in search_result]
             for record in search_result:
                 records_list.append(Record(self._client, record=record))
             return records_list
@@ -110,21 +156,14 @@ class _DepositionFiles(object):
         self, id_: int = None, file_id: str = None, outfile_path: (str | Path) = None
     ) -> (Record | None):
         """Retrieve a single deposition file"""
-        if id_ is not None and isinstance(id_, int):
-            if file_id is not None and file_id != "":
-                tmp_url = self._deposits_url.strip().replace("@id", str(id_))
-                tmp_url += f"/{file_id}"
-            else:
-                raise ValueError("The deposition file ID cannot be None or empty.")
-        else:
-            raise ValueError("The deposition ID cannot be None and must be an integer.")
+        tmp_url = self._deposition_file_url(id_=id_, file_id=file_id)
         record = Record(self._client, id_=None, url=tmp_url, record=None)
         download_url = record.data["links"]["download"]
         if outfile_path is not None and outfile_path != "":
-            response = requests.get(url=download_url, params=self._params, stream=True)
-            with open(outfile_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=128):
-                    f.write(chunk)
+            with self._client._stream("GET", url=download_url, params=self._params) as response:
+                with open(outfile_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=self._chunk_size):
+                        f.write(chunk)
         return record
 
     def sort_deposition_files(
@@ -132,10 +171,14 @@ class _DepositionFiles(object):
     ) -> list[Record]:
         """Sort the files for a deposition. By default, the first
         file is shown in the file preview."""
-        if id_ is not None and isinstance(id_, int):
-            tmp_url = self._deposits_url.strip().replace("@id", str(id_))
-        else:
-            raise ValueError("The deposition ID cannot be None and must be an integer.")
+        tmp_url = self._deposition_files_url(id_=id_)
+        tmp_data = self._sort_deposition_files_payload(id_list=id_list)
+        response = self._client._request(
+            "PUT", url=tmp_url, data=dumps(tmp_data), params=self._params, headers=json_headers
+        )
+        return self._handle_record_list(response, status_codes=[200])
+
+    def _sort_deposition_files_payload(self, id_list: list[str] = None) -> list[dict]:
         if id_list is not None and isinstance(id_list, list):
             tmp_data = []
             for fid in id_list:
@@ -149,21 +192,91 @@ class _DepositionFiles(object):
             raise ValueError(
                 "The 'id_list' cannot be None and must be a list of strings."
             )
-        response = requests.put(url=tmp_url, json=tmp_data, params=self._params)
-        status_code = response.status_code
-        if status_code != 200:
-            zenodo_error(status_code)
-        search_result = response.json()
-        records_list = []
-        if isinstance(search_result, list):
-            for record in search_result:
-                records_list.append(Record(self._client, record=record))
-            return records_list
-        else:
-            return search_result
+        return tmp_data
 
     def update_deposition_file(self) -> Record:
         """Update a deposition file resource. Currently the only use is
         renaming an already uploaded file. If you want to replace the
         actual file, please delete the file and upload a new file."""
         pass
+
+
+class _AsyncDepositionFiles(_DepositionFiles):
+    """Asynchronous counterpart of the ``_DepositionFiles`` class created
+    by the ``zenopy.AsyncZenodo`` client. All the endpoint methods are
+    coroutines which return the same ``Record`` objects."""
+
+    async def create_deposition_file(
+        self,
+        file_path: (str | Path) = None,
+        bucket_url: str = None,
+        record: Type[Record] = None,
+    ) -> Record:
+        """Upload a new file (into an existing deposition record)."""
+        path, tmp_url = self._upload_target(
+            file_path=file_path, bucket_url=bucket_url, record=record
+        )
+        if tmp_url is not None:
+            with open(path, "rb") as fp:
+                response = await self._client._request(
+                    "PUT",
+                    url=tmp_url,
+                    content=self._read_chunks(fp),
+                    headers={"Content-Length": str(path.stat().st_size)},
+                    params=self._params,
+                )
+                return self._handle_create_deposition_file(response)
+
+    async def _read_chunks(self, fp):
+        """Read the file in a worker thread so that the event loop is not
+        blocked by the disk I/O."""
+        while True:
+            chunk = await asyncio.to_thread(fp.read, self._chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    async def delete_deposition_file(self, id_: int = None, file_id: str = None) -> None:
+        """Delete an existing deposition file resource. Note, only
+        deposition files for unpublished depositions may be deleted."""
+        tmp_url = self._deposition_file_url(id_=id_, file_id=file_id)
+        response = await self._client._request("DELETE", url=tmp_url, params=self._params)
+        self._handle_delete_deposition_file(response, tmp_url)
+
+    async def list_deposition_files(self, id_: int = None, view: (bool | list[str]) = False) -> list[Record]:
+        """List all deposition files for a given deposition (as compact
+        read-only ``RecordView`` objects if ``view``)"""
+        tmp_url = self._deposition_files_url(id_=id_)
+        response = await self._client._request("GET", url=tmp_url, params=self._params)
+        return self._handle_record_list(response, status_codes=[200, 201], view=view)
+
+    async def retrieve_deposition_file(
+        self, id_: int = None, file_id: str = None, outfile_path: (str | Path) = None
+    ) -> (Record | None):
+        """Retrieve a single deposition file. The downloaded chunks are
+        written in a worker thread so that the event loop is not blocked by
+        the disk I/O."""
+        tmp_url = self._deposition_file_url(id_=id_, file_id=file_id)
+        record = await self._client._get_record(tmp_url)
+        download_url = record.data["links"]["download"]
+        if outfile_path is not None and outfile_path != "":
+            async with self._client._stream("GET", url=download_url, params=self._params) as response:
+                f = await asyncio.to_thread(open, outfile_path, "wb")
+                try:
+                    async for chunk in response.aiter_bytes(chunk_size=self._chunk_size):
+                        await asyncio.to_thread(f.write, chunk)
+                finally:
+                    await asyncio.to_thread(f.close)
+        return record
+
+    async def sort_deposition_files(
+        self, id_: int = None, id_list: list[str] = None
+    ) -> list[Record]:
+        """Sort the files for a deposition. By default, the first
+        file is shown in the file preview."""
+        tmp_url = self._deposition_files_url(id_=id_)
+        tmp_data = self._sort_deposition_files_payload(id_list=id_list)
+        response = await self._client._request(
+            "PUT", url=tmp_url, content=dumps(tmp_data), params=self._params, headers=json_headers
+        )
+        return self._handle_record_list(response, status_codes=[200])
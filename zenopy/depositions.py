@@ -4,8 +4,6 @@
 
 """
 
-import requests
-import validators
 import json
 from typing import Any
 from datetime import datetime, timezone
@@ -18,7 +16,17 @@ from zenopy.metadata import (
     access_rights,
 )
 from zenopy.record import Record
+from zenopy.codec import dumps, json_headers, loads
 from zenopy.errors import zenodo_error, request_error
+from zenopy.columnar import RecordList
+from zenopy.views import RecordView, _view_fields
+from zenopy.utils import (
+    _batch_ids,
+    _batch_results,
+    _check_page_size,
+    _gather_concurrently,
+    _map_concurrently,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -39,40 +47,44 @@ class _Depositions(object):
         # TODO: allow metadata to be passed for initialization instead of
         # only an empty deposition
         tmp_url = self._deposits_url.strip().rstrip("/")
-        response = requests.post(url=tmp_url, json={}, params=self._params)
+        response = self._client._request(
+            "POST", url=tmp_url, data=dumps({}), params=self._params, headers=json_headers
+        )
+        return self._handle_create_deposition(response)
+
+    def _handle_create_deposition(self, response) -> Record:
         status_code = response.status_code
         if status_code != 201:
             zenodo_error(status_code)
-        return Record(self._client, record=response)
+        return Record(self._client, record=loads(response.content))
 
     def delete_deposition(self, id_: int = None, url: str = None) -> None:
         """Delete an existing deposition resource.
         Note: only unpublished depositions may be deleted."""
+        tmp_url = self._deposition_url(id_=id_, url=url)
+        if tmp_url is None:
+            raise RuntimeError("Please provide a valid record URL or ID.")
+        response = self._client._request("DELETE", url=tmp_url, params=self._params)
+        self._handle_delete_deposition(response)
+
+    def _deposition_url(self, id_: int = None, url: str = None) -> (str | None):
+        """Build (or validate) the URL of a single deposition resource."""
         if id_ is not None and isinstance(id_, int):
             # TODO: Take care of the url parsing with urllib.parse module
-            tmp_url = self._deposits_url + str(id_)
-            response = requests.delete(url=tmp_url, params=self._params)
+            return self._deposits_url + str(id_)
         elif url is not None:
             url = url.strip().rstrip("/")
+            import validators
+
             is_valid = validators.url(url)
             is_valid = url.startswith(self._deposits_url)
             if is_valid:
-                response = requests.delete(url=url, params=self._params)
+                return url
             else:
                 raise ValueError(
                     f"The provided URL ({url}) is invalid.\n"
                     "Please enter a valid URL."
                 )
-        else:
-            raise RuntimeError("Please provide a valid record URL or ID.")
-        status_code = response.status_code
-        if status_code in [201, 204]:
-            logger.warning(
-                "An unpublished deposition has been deleted at the following address:\n"
-                f"\t{self._deposits_url}\n"
-            )
-        else:
-            zenodo_error(status_code)
         # elif record is not None or record == {}:
         #     if isinstance(record, Record):
         #         idd = record._id
@@ -96,6 +108,17 @@ class _Depositions(object):
         #     response = requests.delete(url=tmp_url, params=self._params)
         # else:
         #     raise RuntimeError("Please provide a valid record URL, ID or object.")
+        return None
+
+    def _handle_delete_deposition(self, response) -> None:
+        status_code = response.status_code
+        if status_code in [201, 204]:
+            logger.warning(
+                "An unpublished deposition has been deleted at the following address:\n"
+                f"\t{self._deposits_url}\n"
+            )
+        else:
+            zenodo_error(status_code)
 
     def list_depositions(
         self,
@@ -105,9 +128,63 @@ class _Depositions(object):
         page: int = 1,
         size: int = 20,
         all_versions: (int | bool) = False,
+        view: (bool | list[str]) = False,
     ) -> list[Record]:
         """List all depositions available to the current user identified
-        by the active authentication and match the query statement."""
+        by the active authentication and match the query statement. With
+        ``view`` set to True (or a list of field names), compact read-only
+        ``RecordView`` objects are returned instead of Records."""
+        tmp_params = self._list_depositions_params(
+            query=query,
+            status=status,
+            sort=sort,
+            page=page,
+            size=size,
+            all_versions=all_versions,
+        )
+        tmp_url = self._deposits_url.strip().rstrip("/")
+        response = self._client._request("GET", url=tmp_url, params=tmp_params)
+        return self._handle_list_depositions(response, view=view)
+
+    def iter_depositions(
+        self,
+        query: Any = None,
+        status: str = "published",
+        sort: str = "bestmatch",
+        size: int = 100,
+        all_versions: (int | bool) = False,
+        view: (bool | list[str]) = False,
+    ):
+        """Iterate over all the depositions of the current user matching the
+        query statement (see ``list_depositions``). The pages of ``size``
+        depositions are fetched one at a time as the iteration proceeds and
+        the iteration stops after the last (incomplete or empty) page."""
+        _check_page_size(size)
+        tmp_url = self._deposits_url.strip().rstrip("/")
+        page = 1
+        while True:
+            tmp_params = self._list_depositions_params(
+                query=query, status=status, sort=sort, page=page, size=size, all_versions=all_versions
+            )
+            response = self._client._request("GET", url=tmp_url, params=tmp_params)
+            depositions = self._handle_list_depositions(response, view=view)
+            if not isinstance(depositions, list):
+                return
+            yield from depositions
+            if len(depositions) < size:
+                return
+            page += 1
+
+    def _list_depositions_params(
+        self,
+        query: Any = None,
+        status: str = "published",
+        sort: str = "bestmatch",
+        page: int = 1,
+        size: int = 20,
+        all_versions: (int | bool) = False,
+    ) -> dict:
+        """Validate the search arguments and build the request parameters."""
         tmp_params = self._params.copy()
         # For how to search, see https://help.zenodo.org/guides/search/
         if query is not None and query != "":
@@ -145,14 +222,14 @@ class _Depositions(object):
             )
             sort = "bestmatch"
             tmp_params["sort"] = sort
-        if page is not None and isinstance(page, int):
+        if page is not None and isinstance(page, int) and page >= 1:
             tmp_params["page"] = page
         else:
             logger.warning(
-                "ZenoPy will use pagination of 20 for this search "
-                "because the 'page' argument used is either None or not an integer."
+                "ZenoPy will return the first page of this search "
+                "because the 'page' argument used is either None or not a positive integer."
             )
-            tmp_params["page"] = 20
+            tmp_params["page"] = 1
         if size is not None and isinstance(size, int):
             tmp_params["size"] = size
         else:
@@ -169,27 +246,45 @@ class _Depositions(object):
                 "non-(binary | boolean)."
             )
             tmp_params["all_versions"] = False
-        tmp_url = self._deposits_url.strip().rstrip("/")
-        response = requests.get(url=tmp_url, params=tmp_params)
+        return tmp_params
+
+    def _handle_list_depositions(self, response, view: (bool | list[str]) = False) -> list[Record]:
         status_code = response.status_code
         if status_code != 200:
             zenodo_error(status_code)
-        search_result = response.json()
+        fields = _view_fields(view)
+        search_result = loads(response.content)
         records_list = []
         if isinstance(search_result, list):
+            if fields is not None:
+                return RecordList(RecordView(record, fields) for record in search_result)
             for record in search_result:
                 records_list.append(Record(self._client, record=record))
-            return records_list
+            return RecordList(records_list)
         else:
             return search_result
 
-    def retrieve_deposition(self, id_: int = None) -> Record:
-        """Retrieve a single deposition resource."""
+    def retrieve_deposition(self, id_: int = None, lazy: bool = False) -> Record:
+        """Retrieve a single deposition resource (fetched upon the first
+        access of its data if ``lazy``)."""
         if id_ is not None and isinstance(id_, int):
-            return Record(self._client, id_=id_, url=None, record=None)
+            return Record(self._client, id_=id_, kind="deposition", lazy=lazy)
         else:
             raise ValueError("The deposition ID cannot be None and must be an integer.")
 
+    def retrieve_depositions(self, ids: list[int] = None, max_workers: int = 8) -> list:
+        """Retrieve several depositions concurrently (with up to ``max_workers``
+        requests in flight) in the order of ``ids``. A deposition which cannot
+        be retrieved is replaced by the raised exception in the returned list."""
+        ids = _batch_ids(ids, name="deposition")
+        unique_ids = list(dict.fromkeys(ids))
+        results = dict(zip(unique_ids, _map_concurrently(self._retrieve_checked, unique_ids, max_workers)))
+        return _batch_results(ids, results, name="deposition")
+
+    def _retrieve_checked(self, id_: int = None) -> Record:
+        url = self._deposition_url(id_=id_)
+        return Record(self._client, record=self._client._get_json(url, check_status=True))
+
     def update_deposition(
         self,
         id_: int = None,
@@ -208,28 +303,54 @@ class _Depositions(object):
     ) -> Record:
         """Update an existing deposition resource (deposition metadata)"""
         tmp_params = self._params.copy()
-        tmp_metadata = {}
         if id_ is not None and isinstance(id_, int):
             deposit = self.retrieve_deposition(id_=id_)
             if url is None or url == "":
                 tmp_url = deposit.record_url
         elif url is not None:
-            url = url.strip().rstrip("/")
-            is_valid = validators.url(url)
-            is_valid = url.startswith(self._deposits_url)
-            if is_valid:
-                tmp_url = url
-                # Check to see if a given URL does actually exist
-                deposit = Record(self._client, url=tmp_url)
-            else:
-                raise ValueError(
-                    f"The provided URL ({url}) is invalid.\n"
-                    "Please enter a valid URL."
-                )
+            tmp_url = self._deposition_url(url=url)
+            # Check to see if a given URL does actually exist
+            deposit = Record(self._client, url=tmp_url)
         else:
             raise ValueError("Please provide a valid record URL or ID.")
+        tmp_data = self._update_deposition_payload(
+            deposit.data,
+            upload_type=upload_type,
+            publication_type=publication_type,
+            image_type=image_type,
+            publication_date=publication_date,
+            title=title,
+            creators=creators,
+            description=description,
+            access_right=access_right,
+            license=license,
+            embargo_date=embargo_date,
+            access_conditions=access_conditions,
+        )
+        response = self._client._request(
+            "PUT", url=tmp_url, data=dumps(tmp_data), params=tmp_params, headers=json_headers
+        )
+        return self._handle_update_deposition(response)
+
+    def _update_deposition_payload(
+        self,
+        data: dict = None,
+        upload_type: str = None,
+        publication_type: str = None,
+        image_type: str = None,
+        publication_date: str = None,
+        title: str = None,
+        creators: list[dict] = None,
+        description: str = None,
+        access_right: str = None,
+        license: str = None,
+        embargo_date: str = None,
+        access_conditions: str = None,
+    ) -> dict:
+        """Merge the validated metadata arguments into the existing
+        deposition metadata and build the request body."""
+        tmp_metadata = {}
         # Retrieve the existing metadata to update
-        data = deposit.data
         if any(data["metadata"]):
             tmp_metadata = data["metadata"].copy()
 
@@ -359,10 +480,155 @@ class _Depositions(object):
                 )
                 tmp_metadata["license"] = "cc-by"
 
-        tmp_data = {"metadata": tmp_metadata}
-        response = requests.put(url=tmp_url, json=tmp_data, params=tmp_params)
+        return {"metadata": tmp_metadata}
+
+    def _handle_update_deposition(self, response) -> Record:
         status_code = response.status_code
         if status_code != 200:
             # zenodo_error(status_code)
             request_error(response)
-        return Record(self._client, record=response)
+        return Record(self._client, record=loads(response.content))
+
+
+class _AsyncDepositions(_Depositions):
+    """Asynchronous counterpart of the ``_Depositions`` class created by
+    the ``zenopy.AsyncZenodo`` client. All the endpoint methods are
+    coroutines which return the same ``Record`` objects."""
+
+    async def create_deposition(self):
+        """Create a new deposition/record object for uploading to Zenodo."""
+        tmp_url = self._deposits_url.strip().rstrip("/")
+        response = await self._client._request(
+            "POST", url=tmp_url, content=dumps({}), params=self._params, headers=json_headers
+        )
+        return self._handle_create_deposition(response)
+
+    async def delete_deposition(self, id_: int = None, url: str = None) -> None:
+        """Delete an existing deposition resource.
+        Note: only unpublished depositions may be deleted."""
+        tmp_url = self._deposition_url(id_=id_, url=url)
+        if tmp_url is None:
+            raise RuntimeError("Please provide a valid record URL or ID.")
+        response = await self._client._request("DELETE", url=tmp_url, params=self._params)
+        self._handle_delete_deposition(response)
+
+    async def list_depositions(
+        self,
+        query: Any = None,
+        status: str = "published",
+        sort: str = "bestmatch",
+        page: int = 1,
+        size: int = 20,
+        all_versions: (int | bool) = False,
+        view: (bool | list[str]) = False,
+    ) -> list[Record]:
+        """List all depositions available to the current user identified
+        by the active authentication and match the query statement. With
+        ``view`` set to True (or a list of field names), compact read-only
+        ``RecordView`` objects are returned instead of Records."""
+        tmp_params = self._list_depositions_params(
+            query=query,
+            status=status,
+            sort=sort,
+            page=page,
+            size=size,
+            all_versions=all_versions,
+        )
+        tmp_url = self._deposits_url.strip().rstrip("/")
+        response = await self._client._request("GET", url=tmp_url, params=tmp_params)
+        return self._handle_list_depositions(response, view=view)
+
+    async def iter_depositions(
+        self,
+        query: Any = None,
+        status: str = "published",
+        sort: str = "bestmatch",
+        size: int = 100,
+        all_versions: (int | bool) = False,
+        view: (bool | list[str]) = False,
+    ):
+        """Asynchronously iterate over all the depositions of the current
+        user matching the query statement (see ``_Depositions.iter_depositions``)"""
+        _check_page_size(size)
+        tmp_url = self._deposits_url.strip().rstrip("/")
+        page = 1
+        while True:
+            tmp_params = self._list_depositions_params(
+                query=query, status=status, sort=sort, page=page, size=size, all_versions=all_versions
+            )
+            response = await self._client._request("GET", url=tmp_url, params=tmp_params)
+            depositions = self._handle_list_depositions(response, view=view)
+            if not isinstance(depositions, list):
+                return
+            for deposition in depositions:
+                yield deposition
+            if len(depositions) < size:
+                return
+            page += 1
+
+    async def retrieve_deposition(self, id_: int = None, lazy: bool = False) -> Record:
+        """Retrieve a single deposition resource. A lazy deposition is
+        fetched by the client's ``prefetch_records()``."""
+        if id_ is not None and isinstance(id_, int):
+            if lazy:
+                return Record(self._client, id_=id_, kind="deposition", lazy=True)
+            return await self._client._get_record(self._deposition_url(id_=id_))
+        else:
+            raise ValueError("The deposition ID cannot be None and must be an integer.")
+
+    async def retrieve_depositions(self, ids: list[int] = None, max_workers: int = 8) -> list:
+        """Retrieve several depositions concurrently (see
+        ``_Depositions.retrieve_depositions``)"""
+        ids = _batch_ids(ids, name="deposition")
+        unique_ids = list(dict.fromkeys(ids))
+        results = dict(
+            zip(unique_ids, await _gather_concurrently(self.retrieve_deposition, unique_ids, max_workers))
+        )
+        return _batch_results(ids, results, name="deposition")
+
+    async def update_deposition(
+        self,
+        id_: int = None,
+        url: str = None,
+        upload_type: str = None,
+        publication_type: str = None,
+        image_type: str = None,
+        publication_date: str = None,
+        title: str = None,
+        creators: list[dict] = None,
+        description: str = None,
+        access_right: str = None,
+        license: str = None,
+        embargo_date: str = None,
+        access_conditions: str = None,
+    ) -> Record:
+        """Update an existing deposition resource (deposition metadata)"""
+        tmp_params = self._params.copy()
+        if id_ is not None and isinstance(id_, int):
+            deposit = await self.retrieve_deposition(id_=id_)
+            if url is None or url == "":
+                tmp_url = deposit.record_url
+        elif url is not None:
+            tmp_url = self._deposition_url(url=url)
+            # Check to see if a given URL does actually exist
+            deposit = await self._client._get_record(tmp_url)
+        else:
+            raise ValueError("Please provide a valid record URL or ID.")
+        tmp_data = self._update_deposition_payload(
+            deposit.data,
+            upload_type=upload_type,
+            publication_type=publication_type,
+            image_type=image_type,
+            publication_date=publication_date,
+            title=title,
+            creators=creators,
+            description=description,
+            access_right=access_right,
+            license=license,
+            embargo_date=embargo_date,
+            access_conditions=access_conditions,
+        )
+        response = await self._client._request(
+            "PUT", url=tmp_url, content=dumps(tmp_data), params=tmp_params, headers=json_headers
+        )
+        return self._handle_update_deposition(response)
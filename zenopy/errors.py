@@ -4,8 +4,11 @@
 
 """
 
-import requests
 import json
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import requests
 
 status_code_dict = {
     200: {
@@ -112,6 +115,8 @@ def zenodo_error(status_code: int) -> None:
                 f"Description: {description}\n"
             )
         else:
+            import requests
+
             if status_code in requests.codes.__dict__.values():
                 error_name = list(requests.codes.__dict__.keys())[
                     list(requests.codes.__dict__.values()).index(status_code)
@@ -124,7 +129,7 @@ def zenodo_error(status_code: int) -> None:
     else:
         raise ValueError("The status code cannot be None.")
 
-def request_error(response: requests.models.Response = None) -> None:
+def request_error(response: "requests.models.Response" = None) -> None:
     if response is not None:
         status_code = response.status_code
         if status_code not in [200, 201, 202, 204]:
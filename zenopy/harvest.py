@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""Zenodo search partitioning for the harvesting past the result window
+
+"""
+
+from datetime import date, datetime, timezone
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Fields on which a search can be partitioned: the publication date (by
+# days) and the creation timestamp (by seconds)
+harvest_fields = ("publication_date", "created")
+
+
+def _day(value=None) -> int:
+    if isinstance(value, datetime):
+        value = value.date()
+    elif not isinstance(value, date):
+        value = date.fromisoformat(str(value)[:10])
+    return value.toordinal()
+
+
+def _second(value=None) -> int:
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    elif not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+class _Partitions(object):
+    """Half-open [low, high) ranges of the values of a date (or timestamp)
+    field, as integer numbers of days (or seconds), restricting a search
+    query. The open bounds of the whole range are rendered as wildcards."""
+
+    def __init__(self, field: str = "publication_date", start=None, end=None):
+        if field not in harvest_fields:
+            raise ValueError(
+                f"Invalid partitioning field ({field}).\n"
+                f"Possible values are: {list(harvest_fields)}\n"
+            )
+        self._field = field
+        try:
+            if field == "publication_date":
+                low = date.min.toordinal() if start is None else _day(start)
+                high = date.max.toordinal() if end is None else _day(end)
+            else:
+                low = 0 if start is None else _second(start)
+                high = int(time.time()) + 86400 if end is None else _second(end)
+        except (TypeError, ValueError):
+            raise ValueError("The 'start' and 'end' arguments must be ISO 8601 dates or timestamps.")
+        if low >= high:
+            raise ValueError("The 'start' argument must be earlier than the 'end' argument.")
+        self._root = (low, high)
+        self._open_low = start is None
+        self._open_high = end is None
+
+    @property
+    def root(self) -> tuple[int, int]:
+        return self._root
+
+    def _format(self, value: int = None) -> str:
+        if value == self._root[0] and self._open_low or value == self._root[1] and self._open_high:
+            return "*"
+        if self._field == "publication_date":
+            return date.fromordinal(value).isoformat()
+        return datetime.fromtimestamp(value, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+    def query(self, range_: tuple[int, int] = None, query: str = None) -> str:
+        """The search query restricted to the range"""
+        low, high = range_
+        term = f"{self._field}:[{self._format(low)} TO {self._format(high)}}}"
+        return f"({query}) AND {term}" if query else term
+
+    def refine(self, ranges: list = None, totals: list = None, capacity: int = None) -> tuple[list, list]:
+        """Sort the counted ranges into the ones which can be harvested
+        (with their number of hits) and the ones to bisect (with more than
+        ``capacity`` hits). A range which cannot be bisected any further is
+        harvested up to its capacity."""
+        leaves = []
+        splits = []
+        for range_, total in zip(ranges, totals):
+            if isinstance(total, Exception):
+                raise total
+            if total == 0:
+                continue
+            low, high = range_
+            if total <= capacity:
+                leaves.append((range_, total))
+            elif high - low > 1:
+                middle = (low + high) // 2
+                splits.extend([(low, middle), (middle, high)])
+            else:
+                logger.warning(
+                    f"WARNING: The {self._field} range {self.query(range_)} matches {total} "
+                    f"records, only the first {capacity} can be harvested."
+                )
+                leaves.append((range_, capacity))
+        return leaves, splits
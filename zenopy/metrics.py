@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+
+"""Zenodo client request hooks and in-memory metrics
+
+"""
+
+import bisect
+import collections
+import json
+import threading
+import time
+import logging
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Names of the events to which the request hooks can be registered
+hook_events = ("pre_request", "post_request")
+
+# Upper bounds (in seconds) of the request latency histogram buckets
+latency_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Percentiles reported for the most recent request latencies
+latency_percentiles = (50, 90, 95, 99)
+
+
+class _Instrumentation(object):
+    """Pre/post request hooks and the (optional) metrics collector of
+    a zenopy client transport.
+
+    The ``pre_request`` hooks are called with a dictionary holding the
+    ``method``, ``url`` and ``endpoint`` of the request before it is sent
+    (and before waiting for the rate limiter). The ``post_request`` hooks
+    receive the same dictionary once the request has completed, updated with
+    the ``status_code`` (None after a connection error), ``error``,
+    ``elapsed`` and ``wait`` times (in seconds, the latter spent in the rate
+    limiter and the retry backoff), number of ``retries`` and the
+    ``bytes_sent``/``bytes_received``. Exceptions raised by the hooks are
+    logged and never interrupt the request."""
+
+    def __init__(self, metrics: "_Metrics" = None):
+        self._metrics = metrics
+        self._hooks = {event: () for event in hook_events}
+        self._lock = threading.Lock()
+
+    @property
+    def metrics(self) -> ("_Metrics | None"):
+        return self._metrics
+
+    def register_hook(self, event: str = None, hook=None) -> None:
+        self._check_event(event)
+        if not callable(hook):
+            raise TypeError("The request hook must be callable.")
+        with self._lock:
+            self._hooks[event] = self._hooks[event] + (hook,)
+
+    def unregister_hook(self, event: str = None, hook=None) -> None:
+        self._check_event(event)
+        with self._lock:
+            hooks = list(self._hooks[event])
+            if hook not in hooks:
+                raise ValueError(f"The hook is not registered for the '{event}' event.")
+            hooks.remove(hook)
+            self._hooks[event] = tuple(hooks)
+
+    @staticmethod
+    def _check_event(event: str = None) -> None:
+        if event not in hook_events:
+            raise ValueError(
+                f"Invalid hook event ({event}).\n"
+                f"The following events are supported: {', '.join(hook_events)}"
+            )
+
+    def start(self, method: str = None, url: str = None, base_url: str = None) -> dict:
+        """Create the record of a request and run the pre-request hooks."""
+        info = {
+            "method": method,
+            "url": url,
+            "endpoint": _endpoint_template(url, base_url),
+            "start": time.perf_counter(),
+        }
+        self._call_hooks("pre_request", info)
+        return info
+
+    def finish(
+        self,
+        info: dict = None,
+        response=None,
+        error: Exception = None,
+        retries: int = 0,
+        wait: float = 0.0,
+    ) -> None:
+        """Complete the record of a request, collect its metrics and run
+        the post-request hooks."""
+        info["elapsed"] = time.perf_counter() - info.pop("start")
+        info["wait"] = wait
+        info["retries"] = retries
+        info["error"] = error
+        if response is not None:
+            info["status_code"] = response.status_code
+            info["bytes_sent"] = _request_size(response)
+            info["bytes_received"] = _response_size(response)
+        else:
+            info["status_code"] = None
+            info["bytes_sent"] = 0
+            info["bytes_received"] = 0
+        if self._metrics is not None:
+            self._metrics.record(info)
+        self._call_hooks("post_request", info)
+
+    def _call_hooks(self, event: str = None, info: dict = None) -> None:
+        for hook in self._hooks[event]:
+            try:
+                hook(info)
+            except Exception as error:
+                logger.warning(f"WARNING: The {event} hook {hook!r} has failed ({error!r}).")
+
+
+class _EndpointStats(object):
+    """Counters and latency histogram of a single endpoint"""
+
+    __slots__ = (
+        "count",
+        "errors",
+        "retries",
+        "bytes_sent",
+        "bytes_received",
+        "latency_sum",
+        "latency_min",
+        "latency_max",
+        "wait_sum",
+        "buckets",
+        "status_codes",
+        "samples",
+    )
+
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency_sum = 0.0
+        self.latency_min = None
+        self.latency_max = None
+        self.wait_sum = 0.0
+        self.buckets = [0] * (len(latency_buckets) + 1)
+        self.status_codes = collections.Counter()
+        self.samples = collections.deque(maxlen=window)
+
+
+class _Metrics(object):
+    """Thread-safe in-memory collector of the per-endpoint request metrics.
+
+    The endpoints are identified by the HTTP method and the URL path relative
+    to the API base URL with the record/deposition/file IDs replaced by
+    placeholders (e.g., ``GET /records/{id}``). The latency percentiles are
+    computed over the last ``window`` requests of each endpoint while the
+    histogram buckets and the other counters are cumulative."""
+
+    def __init__(self, window: int = 1000):
+        if not isinstance(window, int) or window < 1:
+            raise ValueError("The 'window' argument must be a positive integer.")
+        self._window = window
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, info: dict = None) -> None:
+        key = (info["method"], info["endpoint"])
+        elapsed = info["elapsed"]
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = _EndpointStats(self._window)
+            stats.count += 1
+            stats.retries += info["retries"]
+            stats.bytes_sent += info["bytes_sent"]
+            stats.bytes_received += info["bytes_received"]
+            stats.wait_sum += info["wait"]
+            stats.latency_sum += elapsed
+            stats.latency_min = elapsed if stats.latency_min is None else min(stats.latency_min, elapsed)
+            stats.latency_max = elapsed if stats.latency_max is None else max(stats.latency_max, elapsed)
+            stats.samples.append(elapsed)
+            stats.buckets[bisect.bisect_left(latency_buckets, elapsed)] += 1
+            if info["status_code"] is None:
+                stats.errors += 1
+            else:
+                stats.status_codes[info["status_code"]] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+    def snapshot(self) -> dict:
+        """Return the collected metrics as a (JSON serializable) dictionary."""
+        with self._lock:
+            items = sorted(self._endpoints.items())
+            endpoints = {}
+            totals = {
+                "count": 0,
+                "errors": 0,
+                "retries": 0,
+                "bytes_sent": 0,
+                "bytes_received": 0,
+                "wait": 0.0,
+                "status_codes": collections.Counter(),
+            }
+            for (method, endpoint), stats in items:
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(latency_buckets + ("+Inf",), stats.buckets):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                samples = sorted(stats.samples)
+                latency = {
+                    "sum": stats.latency_sum,
+                    "mean": stats.latency_sum / stats.count,
+                    "min": stats.latency_min,
+                    "max": stats.latency_max,
+                }
+                for percentile in latency_percentiles:
+                    latency[f"p{percentile}"] = _percentile(samples, percentile)
+                latency["buckets"] = buckets
+                endpoints[f"{method} {endpoint}"] = {
+                    "method": method,
+                    "endpoint": endpoint,
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "retries": stats.retries,
+                    "bytes_sent": stats.bytes_sent,
+                    "bytes_received": stats.bytes_received,
+                    "wait": stats.wait_sum,
+                    "status_codes": {str(code): n for code, n in sorted(stats.status_codes.items())},
+                    "latency": latency,
+                }
+                for name in ["count", "errors", "retries", "bytes_sent", "bytes_received"]:
+                    totals[name] += getattr(stats, name)
+                totals["wait"] += stats.wait_sum
+                totals["status_codes"].update(stats.status_codes)
+        totals["status_codes"] = {str(code): n for code, n in sorted(totals["status_codes"].items())}
+        return {"endpoints": endpoints, "totals": totals}
+
+    def to_json(self, indent: int = None) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "zenopy") -> str:
+        """Render the collected metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()["endpoints"].values()
+        lines = []
+
+        def metric(name: str, kind: str, help_: str, samples: list) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape_label(val)}"' for key, val in labels)
+                lines.append(f"{prefix}_{name}{suffix}{{{label_text}}} {value}")
+
+        def labels(stats: dict, *extra) -> list:
+            return [("method", stats["method"]), ("endpoint", stats["endpoint"])] + list(extra)
+
+        metric(
+            "requests_total",
+            "counter",
+            "Number of HTTP requests completed with a response.",
+            [
+                ("", labels(stats, ("status", code)), count)
+                for stats in snapshot
+                for code, count in stats["status_codes"].items()
+            ],
+        )
+        for name, key, help_ in [
+            ("request_errors_total", "errors", "Number of HTTP requests failed without a response."),
+            ("request_retries_total", "retries", "Number of re-sent HTTP requests."),
+            ("request_sent_bytes_total", "bytes_sent", "Number of request body bytes sent."),
+            ("request_received_bytes_total", "bytes_received", "Number of response body bytes received."),
+            ("request_wait_seconds_total", "wait", "Time spent waiting for the rate limiter and retry backoff."),
+        ]:
+            metric(name, "counter", help_, [("", labels(stats), stats[key]) for stats in snapshot])
+        histogram = []
+        for stats in snapshot:
+            for bound, count in stats["latency"]["buckets"].items():
+                histogram.append(("_bucket", labels(stats, ("le", bound)), count))
+            histogram.append(("_sum", labels(stats), stats["latency"]["sum"]))
+            histogram.append(("_count", labels(stats), stats["count"]))
+        metric("request_duration_seconds", "histogram", "HTTP request latency.", histogram)
+        return "\n".join(lines) + "\n"
+
+
+def _percentile(samples: list = None, percentile: float = None) -> (float | None):
+    """Nearest-rank percentile of the sorted samples"""
+    if not samples:
+        return None
+    rank = max(1, -(-len(samples) * percentile // 100))
+    return samples[int(rank) - 1]
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Collections of the vocabulary resources identified by non-numeric IDs
+_resource_collections = frozenset(["licenses", "communities", "grants", "funders"])
+
+
+def _endpoint_template(url: str = None, base_url: str = None) -> str:
+    """Replace the IDs in the URL path by placeholders, e.g.,
+    ``https://zenodo.org/api/records/123`` becomes ``/records/{id}``."""
+    path = url.split("?", 1)[0]
+    if base_url is not None and path.startswith(base_url):
+        path = path[len(base_url):]
+    else:
+        path = urlsplit(path).path
+    segments = [segment for segment in path.split("/") if segment]
+    if len(segments) > 1 and segments[0] == "files":
+        # Bucket URLs: /files/<bucket id>/<file name>
+        return "/".join(["/files", "{bucket}", "{key}"][: min(len(segments), 3)])
+    template = []
+    for i, segment in enumerate(segments):
+        if segment.isdigit():
+            segment = "{id}"
+        elif i == 1 and segments[0] in _resource_collections:
+            segment = "{id}"
+        elif i > 0 and segments[i - 1] == "files":
+            segment = "{file_id}"
+        template.append(segment)
+    return "/" + "/".join(template)
+
+
+def _request_size(response) -> int:
+    try:
+        request = response.request
+    except RuntimeError:  # httpx responses without a request
+        return 0
+    length = request.headers.get("Content-Length") if request is not None else None
+    try:
+        return int(length) if length is not None else 0
+    except ValueError:
+        return 0
+
+
+def _response_size(response) -> int:
+    length = response.headers.get("Content-Length")
+    if length is not None:
+        try:
+            return int(length)
+        except ValueError:
+            pass
+    # Both requests and httpx keep the downloaded body in "_content"
+    content = getattr(response, "_content", None)
+    if isinstance(content, bytes):
+        return len(content)
+    # The bodies of the streamed responses are measured as they are consumed
+    downloaded = getattr(response, "num_bytes_downloaded", None)
+    if isinstance(downloaded, int):
+        return downloaded
+    raw = getattr(response, "raw", None)
+    try:
+        return int(raw.tell())
+    except (AttributeError, TypeError, ValueError, OSError):
+        return 0
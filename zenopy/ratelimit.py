@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+"""Zenodo client-side rate limiter
+
+"""
+
+import asyncio
+import email.utils
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _RateLimiter(object):
+    """Token bucket rate limiter shared by all the requests sent through
+    a single zenopy client transport.
+
+    The bucket holds up to ``burst`` tokens and is refilled at a sustained
+    rate of ``rate`` tokens per ``period`` seconds. Every request consumes
+    one token and waits until the token becomes available. The bucket is
+    also synchronized with the ``X-RateLimit-Remaining``/``X-RateLimit-Reset``
+    headers returned by Zenodo and is paused after a 429 (Too Many Requests)
+    response until the time advertised by the ``Retry-After`` or
+    ``X-RateLimit-Reset`` headers. Re-sending the rejected requests is
+    left to the client retry policy."""
+
+    def __init__(
+        self,
+        rate: int = 100,
+        period: float = 60.0,
+        burst: int = 10,
+    ):
+        if not isinstance(rate, int) or rate < 1:
+            raise ValueError("The 'rate' argument must be a positive integer.")
+        if period is None or period <= 0:
+            raise ValueError("The 'period' argument must be a positive number.")
+        if not isinstance(burst, int) or burst < 1:
+            raise ValueError("The 'burst' argument must be a positive integer.")
+        self._rate = rate
+        self._period = float(period)
+        self._fill_rate = rate / self._period
+        self._capacity = float(burst)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self._capacity, self._tokens + elapsed * self._fill_rate)
+            self._updated = now
+
+    def _reserve(self) -> float:
+        """Consume one token and return the delay (in seconds) the caller
+        has to wait before sending its request."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1.0
+            delay = max(0.0, self._blocked_until - now)
+            if self._tokens < 0:
+                delay = max(delay, -self._tokens / self._fill_rate)
+            return delay
+
+    def available(self) -> float:
+        """Number of tokens currently available in the bucket."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, self._tokens)
+
+    def delay(self) -> float:
+        """Estimated delay (in seconds) before the next request can be sent,
+        without consuming a token."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            delay = max(0.0, self._blocked_until - now)
+            if self._tokens < 1.0:
+                delay = max(delay, (1.0 - self._tokens) / self._fill_rate)
+            return delay
+
+    def acquire(self) -> None:
+        """Block the calling thread until a request can be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Suspend the calling coroutine until a request can be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def update(self, status_code: int = None, headers=None) -> None:
+        """Synchronize the bucket with the rate limit headers of a response."""
+        if headers is None:
+            headers = {}
+        remaining = _parse_number(headers.get("X-RateLimit-Remaining"))
+        reset = _parse_number(headers.get("X-RateLimit-Reset"))
+        reset_delay = max(0.0, reset - time.time()) if reset is not None else None
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if status_code == 429:
+                delay = _parse_retry_after(headers.get("Retry-After"))
+                if delay is None:
+                    delay = reset_delay
+                if delay is None:
+                    delay = 1.0 / self._fill_rate
+                logger.warning(
+                    "WARNING: Zenodo rate limit exceeded. "
+                    f"Pausing the requests for {delay:.2f} seconds..."
+                )
+                self._tokens = min(self._tokens, 0.0)
+                self._blocked_until = max(self._blocked_until, now + delay)
+            elif remaining is not None:
+                if remaining <= 0 and reset_delay is not None:
+                    self._tokens = min(self._tokens, 0.0)
+                    self._blocked_until = max(self._blocked_until, now + reset_delay)
+                else:
+                    self._tokens = min(self._tokens, float(remaining))
+
+
+def _parse_number(value) -> (float | None):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_retry_after(value) -> (float | None):
+    """Parse the Retry-After header given either in seconds or as an HTTP date."""
+    if value is None:
+        return None
+    seconds = _parse_number(value)
+    if seconds is not None:
+        return max(0.0, seconds)
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
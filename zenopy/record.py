@@ -5,46 +5,137 @@
 """
 
 from collections.abc import MutableMapping
-import requests
-import validators
+from concurrent.futures import ThreadPoolExecutor
+import inspect
 import logging
 import pprint
-import inspect
+import sys
+from typing import TYPE_CHECKING
+from zenopy.codec import dumps, json_headers, loads
+from zenopy.errors import request_error
+
+if TYPE_CHECKING:
+    import requests
 
 logger = logging.getLogger(__name__)
 
+
+# URL paths (relative to the API base URL) of the resource kinds which
+# can be retrieved by ID
+record_kinds = {
+    "deposition": "/deposit/depositions/{id}",
+    "deposition-files": "/deposit/depositions/{id}/files",
+    "record": "/records/{id}",
+    "resource": "/{resource}/{id}",
+}
+
+# Vocabulary resources retrieved with the "resource" kind
+resource_types = ["communities", "licenses", "grants", "funders"]
+
+
+def _record_url(
+    base_url: str = None, kind: str = None, id_: (int | str) = None, resource: str = None
+) -> str:
+    """Build the URL of a resource of the given kind from its ID."""
+    if kind not in record_kinds:
+        raise ValueError(
+            f"Invalid record kind ({kind}).\n"
+            f"Possible values are: {list(record_kinds.keys())}\n"
+        )
+    if kind == "resource" and resource not in resource_types:
+        raise ValueError(
+            f"The requested resource ({resource}) is not valid.\n"
+            f"Possible values are: {resource_types}\n"
+        )
+    return base_url + record_kinds[kind].format(id=id_, resource=resource)
+
+
+def prefetch_records(records: list = None, max_workers: int = 8) -> list:
+    """Hydrate lazy records concurrently (each record is fetched only once)."""
+    pending = list({id(record): record for record in records if not record.hydrated}.values())
+    if len(pending) == 1:
+        pending[0].prefetch()
+    elif pending:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+            for _ in executor.map(Record.prefetch, pending):
+                pass
+    return records
+
+
+def _is_deposition(data: dict = None) -> bool:
+    """Check whether the data of a record is the one of a deposition"""
+    links = data.get("links")
+    return isinstance(links, dict) and "/deposit/depositions/" in links.get("self", "")
+
+
+def _is_response(obj) -> bool:
+    """Check for a requests response without importing requests eagerly"""
+    requests = sys.modules.get("requests")
+    return requests is not None and isinstance(obj, requests.models.Response)
+
+
 class Record(MutableMapping):
     """Zenodo Record mixin container class"""
 
     def __init__(
-        self, client, id_: int = None, url: str = None, record: (requests.models.Response | dict) = None
+        self,
+        client,
+        id_: (int | str) = None,
+        url: str = None,
+        record: "(requests.models.Response | dict)" = None,
+        kind: str = "record",
+        resource: str = None,
+        lazy: bool = False,
     ):
+        """Create a Record from its ID, URL or (JSON) data
+
+        Parameters
+        ----------
+        client : zenopy.Zenodo
+            The client used for retrieving the record
+        id_ : int | str, optional
+            ID of the record to retrieve. Only the resources (licenses,
+            communities, grants and funders) have string IDs
+        url : str, optional
+            URL of the record to retrieve
+        record : requests.models.Response | dict | Record, optional
+            Data of the record
+        kind : str, optional
+            Kind of the resource retrieved by ID: ``"deposition"``,
+            ``"deposition-files"``, ``"record"`` or ``"resource"``,
+            by default "record"
+        resource : str, optional
+            Type of the resource (``"licenses"``, ``"communities"``,
+            ``"grants"`` or ``"funders"``) if ``kind == "resource"``
+        lazy : bool, optional
+            If True, a record requested by ID or URL is not fetched until its
+            data is first accessed (or ``prefetch()`` is called), by default
+            False. Lazy records are only supported by synchronous clients
+        """
+        self._client = client
         self._base_url = client._base_url
         self._headers = client._headers
         self._params = client._params
-        if id_ is not None and isinstance(id_, int):
-            caller_class_name = str(inspect.currentframe().f_back.f_locals["self"])
-            if "_Depositions" in caller_class_name:
-                self._record_url = self._base_url + "/deposit/depositions/" + str(id_)
-            elif "_DepositionFiles" in caller_class_name:
-                self._record_url = self._base_url + "/deposit/depositions/" + str(id_) + "/files"
-            # elif "_DepositionActions" in caller_class_name:
-                # self._record_url = self._base_url + "/deposit/" + str(id_)
-            else: # "_Records" (or anything else) in caller_class_name:
-                self._record_url = self._base_url + "/records/" + str(id_)
-            response = requests.get(
-                self._record_url, params=self._params, headers=self._headers
-            )
-            self.data = response.json()
+        self._data = None
+        # Copy of the metadata of a deposition as last fetched from (or saved
+        # to) Zenodo, see changed_fields
+        self._baseline = None
+        self._handle_id = None
+        self._record_url = None
+        if id_ is not None and (isinstance(id_, int) or (kind == "resource" and id_ != "")):
+            self._record_url = _record_url(self._base_url, kind=kind, id_=id_, resource=resource)
+            self._handle_id = id_
+            if not lazy:
+                self.prefetch()
         elif url is not None and url != "":
             url = url.strip().rstrip("/")
+            import validators
+
             is_valid = validators.url(url)
             if is_valid:
                 self._record_url = url
-                response = requests.get(
-                    self._record_url, params=self._params, headers=self._headers
-                )
-                self.data = response.json()
+                if not lazy:
+                    self.prefetch()
             else:
                 raise ValueError(
                     f"The provided URL ({url}) is invalid.\n"
@@ -53,10 +144,10 @@ class Record(MutableMapping):
         elif record is not None and record != {}:
             if isinstance(record, Record):
                 self.data = record.data
-            elif isinstance(record, requests.models.Response):
-                self.data = record.json()
             elif isinstance(record, dict):
                 self.data = record
+            elif _is_response(record):
+                self.data = loads(record.content)
             else:
                 raise TypeError(
                     f"The provided record type ({type(record)}) is invalid.\n"
@@ -78,6 +169,81 @@ class Record(MutableMapping):
         else:
             raise RuntimeError("Please provide a valid record URL, ID or object.")
 
+    @property
+    def data(self) -> dict:
+        """JSON data of the record (fetched upon the first access if lazy)"""
+        if self._data is None:
+            self.prefetch()
+        return self._data
+
+    @data.setter
+    def data(self, data: dict) -> None:
+        self._data = data
+        self._baseline = None
+        if isinstance(data, dict) and _is_deposition(data):
+            self._baseline = loads(dumps(data.get("metadata", {})))
+
+    @property
+    def changed_fields(self) -> list[str]:
+        """Metadata fields of a deposition modified since it was fetched
+        from (or saved to) Zenodo."""
+        if self._data is None or self._baseline is None:
+            return []
+        metadata = self._data.get("metadata", {})
+        return sorted(
+            key
+            for key in metadata.keys() | self._baseline.keys()
+            if key not in metadata or key not in self._baseline or metadata[key] != self._baseline[key]
+        )
+
+    def save(self) -> "Record":
+        """Push the metadata changes of a deposition to Zenodo with a single
+        PUT request. No request is sent if the metadata is unchanged."""
+        if self._data is None or self._baseline is None:
+            raise RuntimeError("Only the (fetched) depositions can be saved.")
+        if not self.changed_fields:
+            return self
+        if inspect.iscoroutinefunction(self._client._request):
+            raise RuntimeError("Records cannot be saved by asynchronous clients.")
+        # Zenodo replaces the whole metadata of the deposition
+        response = self._client._request(
+            "PUT",
+            self._data["links"]["self"],
+            data=dumps({"metadata": self._data["metadata"]}),
+            params=self._params,
+            headers=json_headers,
+        )
+        if response.status_code != 200:
+            request_error(response)
+        self.data = loads(response.content)
+        return self
+
+    @property
+    def hydrated(self) -> bool:
+        """True if the data of the record has been fetched."""
+        return self._data is not None
+
+    def prefetch(self) -> "Record":
+        """Fetch the data of a lazy record (a no-op if it is already fetched)."""
+        if self._data is None:
+            self.data = self._fetch()
+        return self
+
+    def refresh(self) -> "Record":
+        """Re-fetch the data of the record. If the record is not modified,
+        its data is served from the client's cache (see ``cache_size``)."""
+        self.data = self._fetch(revalidate=True)
+        return self
+
+    def _fetch(self, revalidate: bool = False) -> dict:
+        if inspect.iscoroutinefunction(self._client._request):
+            raise RuntimeError(
+                "Records cannot be fetched on access by asynchronous clients."
+            )
+        if self._record_url is None:
+            raise RuntimeError("The deposition/record URL is not accessible or unknown.")
+        return self._client._get_json(self._record_url, revalidate=revalidate)
+
     # Provide dict like access to the Record container (dictionary data)
     def __getitem__(self, key: (int | slice)) -> dict:
         """Allow access to data via indexing/slicing"""
@@ -178,6 +344,8 @@ class Record(MutableMapping):
     @property
     def _id(self) -> int:
         """Deposition identifier."""
+        if self._data is None and self._handle_id is not None:
+            return self._handle_id
         if "id" in self.data and self.data["id"] != "":
             return self.data["id"]
         elif "record_id" in self.data and self.data["record_id"] != "":
@@ -265,6 +433,8 @@ class Record(MutableMapping):
     @property
     def record_id(self) -> int:
         """Record identifier. This field is only present for published depositions."""
+        if self._data is None and self._handle_id is not None:
+            return self._handle_id
         for key in ["record_id", "id"]:
             if key in self.data and self.data[key] != "":
                 return self.data[key]
@@ -283,6 +453,8 @@ class Record(MutableMapping):
     def record_url(self):
         """URL to public version of record for this deposition. This field is
         only present for published depositions."""
+        if self._data is None:
+            return self._record_url
         if "record_url" in self.data and self.data["record_url"] != "":
             return self.data["record_url"]
         elif "links" in self.data and self.data["links"] != "":
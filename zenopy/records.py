@@ -4,12 +4,32 @@
 
 """
 
-import requests
 import json
 from typing import Any
+from zenopy.codec import loads
 from zenopy.record import Record
 from zenopy.metadata import records_search_headers
 from zenopy.errors import zenodo_error
+from zenopy.columnar import RecordList
+from zenopy.views import RecordView, _view_fields
+from zenopy.harvest import _Partitions
+from zenopy.sync import MirrorStore, _SyncRun
+from zenopy.utils import (
+    _batch_ids,
+    _amap_bounded,
+    _aprefetch_pages,
+    _batch_results,
+    _check_page_size,
+    _check_prefetch,
+    _gather_concurrently,
+    _has_next_page,
+    _last_page,
+    _map_bounded,
+    _map_concurrently,
+    _prefetch_pages,
+    _search_page,
+    _total_hits,
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,14 +59,40 @@ class _Records:
         subtype: str = None,
         bounds: str = None,
         custom: str = None,
+        view: (bool | list[str]) = False,
     ) -> list[Record]:
         """List all published open access records matching the
         (elastic) search query statement. For further details
-        see https://help.zenodo.org/guides/search/"""
-        tmp_params = self._params.copy()
+        see https://help.zenodo.org/guides/search/
+
+        With ``view`` set to True (or a list of field names), compact
+        read-only ``RecordView`` objects are returned instead of Records."""
+        tmp_headers = self._list_records_headers(content_type=content_type)
+        tmp_params = self._list_records_params(
+            query=query,
+            status=status,
+            sort=sort,
+            page=page,
+            size=size,
+            all_versions=all_versions,
+            communities=communities,
+            type_=type_,
+            subtype=subtype,
+            bounds=bounds,
+            custom=custom,
+        )
+        tmp_url = self._base_records_url.strip().rstrip("/")
+        if self._client._search_cache is not None:
+            return self._search_records(self._client._get_search(tmp_url, tmp_params, tmp_headers), view=view)
+        response = self._client._request("GET", url=tmp_url, params=tmp_params, headers=tmp_headers)
+        return self._handle_search_result(response, view=view)
+
+    def _list_records_headers(self, content_type: str = None) -> dict:
+        """Build the request headers for the selected search result encoding."""
+        tmp_headers = dict(self._headers)
         if content_type is not None and content_type != "":
             if content_type in records_search_headers.keys():
-                self._headers["Content-Type"] = records_search_headers[content_type]
+                tmp_headers["Content-Type"] = records_search_headers[content_type]
             else:
                 raise ValueError(
                     f"Invalid 'content_type' argument value ({content_type}).\n"
@@ -58,7 +104,25 @@ class _Records:
                 "The value of 'content_type' argument is None.\n"
                 "ZenoPy will adopt JSON encoding.\n"
             )
-            self._headers["Content-Type"] = records_search_headers["json"]
+            tmp_headers["Content-Type"] = records_search_headers["json"]
+        return tmp_headers
+
+    def _list_records_params(
+        self,
+        query: Any = None,
+        status: str = None,
+        sort: str = None,
+        page: int = None,
+        size: int = None,
+        all_versions: (int | bool) = False,
+        communities: str = None,
+        type_: str = None,
+        subtype: str = None,
+        bounds: str = None,
+        custom: str = None,
+    ) -> dict:
+        """Validate the search arguments and build the request parameters."""
+        tmp_params = dict(self._params)
         if status is not None:
             if status in ["draft", "published"]:
                 tmp_params["status"] = status
@@ -102,25 +166,572 @@ class _Records:
         for key, value in zip(keys_list, values_list):
             if value is not None:
                 tmp_params[key] = value
+        return tmp_params
 
-        tmp_url = self._base_records_url.strip().rstrip("/")
-        response = requests.get(url=tmp_url, params=tmp_params, headers=self._headers)
+    def _handle_search_result(self, response, view: (bool | list[str]) = False) -> list[Record]:
         status_code = response.status_code
         if status_code != 200:
             zenodo_error(status_code)
-        search_result = response.json()
+        return self._search_records(response.content, view=view)
+
+    def _search_records(self, content: bytes = None, view: (bool | list[str]) = False) -> list[Record]:
+        fields = _view_fields(view)
+        search_result = loads(content)
         search_result_list = search_result["hits"]["hits"]
         records_list = []
         if isinstance(search_result_list, list) and search_result_list != []:
+            if fields is not None:
+                return RecordList(RecordView(record, fields) for record in search_result_list)
             for record in search_result_list:
                 records_list.append(Record(self._client, record=record))
-            return records_list
+            return RecordList(records_list)
         else:
             return search_result
 
-    def retrieve_record(self, id_: int = None) -> Record:
-        """Retrieve a single record."""
+    def retrieve_record(self, id_: int = None, lazy: bool = False) -> Record:
+        """Retrieve a single record (fetched upon the first access of its
+        data if ``lazy``)."""
+        if id_ is not None and isinstance(id_, int):
+            return Record(self._client, id_=id_, kind="record", lazy=lazy)
+        else:
+            raise ValueError("The record ID cannot be None and must be an integer.")
+
+    def retrieve_records(
+        self,
+        ids: list[int] = None,
+        max_workers: int = 8,
+        use_search: bool = False,
+        search_batch_size: int = 50,
+    ) -> list:
+        """Retrieve several records concurrently (with up to ``max_workers``
+        requests in flight) in the order of ``ids``. A record which cannot
+        be retrieved is replaced by the raised exception in the returned list.
+        With ``use_search``, the records are first looked up
+        ``search_batch_size`` at a time with ``recid:(a OR b OR ...)`` search
+        queries and only the records missing from the search results are
+        retrieved one by one."""
+        ids = _batch_ids(ids)
+        results = {}
+        if use_search:
+            batches = self._search_batches(ids, search_batch_size)
+            for hits in _map_concurrently(self._search_ids, batches, max_workers):
+                if not isinstance(hits, Exception):
+                    results.update(hits)
+        missing = [id_ for id_ in dict.fromkeys(ids) if id_ not in results]
+        results.update(zip(missing, _map_concurrently(self._retrieve_checked, missing, max_workers)))
+        return _batch_results(ids, results)
+
+    def iter_records(
+        self,
+        query: Any = None,
+        status: str = "published",
+        sort: str = "bestmatch",
+        size: int = 100,
+        all_versions: (int | bool) = False,
+        communities: str = None,
+        type_: str = None,
+        subtype: str = None,
+        bounds: str = None,
+        custom: str = None,
+        view: (bool | list[str]) = False,
+        prefetch: int = 0,
+    ):
+        """Iterate over all the published records matching the search query
+        (see ``list_records``). The result pages of ``size`` records are
+        fetched one at a time as the iteration proceeds and the iteration
+        stops after the last page.
+
+        With ``prefetch`` > 0, once the first page has reported the total
+        number of hits, up to ``prefetch`` of the following pages are fetched
+        concurrently while the current one is consumed. The records are still
+        yielded in order and the requests share the rate limiter of the
+        client. The pending requests are cancelled if the iteration stops
+        early."""
+        _check_page_size(size)
+        _check_prefetch(prefetch)
+        fields = _view_fields(view)
+        tmp_headers = self._list_records_headers(content_type="json")
+        tmp_url = self._base_records_url.strip().rstrip("/")
+        search_params = dict(
+            query=query,
+            status=status,
+            sort=sort,
+            size=size,
+            all_versions=all_versions,
+            communities=communities,
+            type_=type_,
+            subtype=subtype,
+            bounds=bounds,
+            custom=custom,
+        )
+
+        def fetch_page(page: int = None) -> tuple:
+            tmp_params = self._list_records_params(page=page, **search_params)
+            response = self._client._request("GET", url=tmp_url, params=tmp_params, headers=tmp_headers)
+            return _search_page(response)
+
+        hits, search_result = fetch_page(1)
+        if prefetch and _has_next_page(search_result, hits, 1, size):
+            pages = _prefetch_pages(fetch_page, (hits, search_result), _last_page(search_result, size), prefetch)
+        else:
+            pages = self._iter_pages(fetch_page, hits, search_result, size)
+        for hits, _ in pages:
+            for record in hits:
+                yield RecordView(record, fields) if fields is not None else Record(self._client, record=record)
+
+    @staticmethod
+    def _iter_pages(fetch_page=None, hits: list = None, search_result: dict = None, size: int = None):
+        """Yield the (hits, search result) pairs of the successive pages"""
+        page = 1
+        while True:
+            yield hits, search_result
+            if not _has_next_page(search_result, hits, page, size):
+                return
+            page += 1
+            hits, search_result = fetch_page(page)
+
+    def harvest_records(
+        self,
+        query: str = None,
+        field: str = "publication_date",
+        start=None,
+        end=None,
+        size: int = 100,
+        max_workers: int = 8,
+        max_result_window: int = 10000,
+        all_versions: (int | bool) = False,
+        communities: str = None,
+        type_: str = None,
+        subtype: str = None,
+        custom: str = None,
+        view: (bool | list[str]) = False,
+    ):
+        """Iterate over all the published records matching the search query,
+        however many they are.
+
+        A search cannot be paged past its ``max_result_window`` hits, hence the
+        query is restricted to ranges of the ``field`` ("publication_date" or
+        "created") between ``start`` (included) and ``end`` (excluded) and any
+        range matching more hits than the window is bisected recursively. The
+        ranges are counted, and then harvested page by page, with up to
+        ``max_workers`` concurrent requests. The records are yielded once each
+        (by ID) as the pages are fetched, grouped by range."""
+        _check_page_size(size)
+        fields = _view_fields(view)
+        partitions = _Partitions(field, start, end)
+        capacity = (max_result_window // size) * size
+        if capacity < 1:
+            raise ValueError("The 'size' argument must not exceed the 'max_result_window' argument.")
+        tmp_headers = self._list_records_headers(content_type="json")
+        tmp_url = self._base_records_url.strip().rstrip("/")
+        search_params = self._harvest_params(all_versions, communities, type_, subtype, custom)
+
+        def fetch_page(range_: tuple = None, page: int = 1, page_size: int = size) -> tuple:
+            tmp_params = self._list_records_params(
+                query=partitions.query(range_, query), page=page, size=page_size, **search_params
+            )
+            response = self._client._request("GET", url=tmp_url, params=tmp_params, headers=tmp_headers)
+            return _search_page(response)
+
+        leaves = []
+        ranges = [partitions.root]
+        while ranges:
+            totals = _map_concurrently(lambda range_: self._count(*fetch_page(range_, 1, 1)), ranges, max_workers)
+            new_leaves, ranges = partitions.refine(ranges, totals, capacity)
+            leaves.extend(new_leaves)
+        seen = set()
+        for hits, _ in _map_bounded(lambda page: fetch_page(*page), self._harvest_pages(leaves, size), max_workers):
+            for record in hits:
+                if record["id"] in seen:
+                    continue
+                seen.add(record["id"])
+                yield RecordView(record, fields) if fields is not None else Record(self._client, record=record)
+
+    def sync_records(
+        self,
+        store: (MirrorStore | str) = None,
+        query: str = None,
+        size: int = 100,
+        all_versions: (int | bool) = False,
+        communities: str = None,
+        type_: str = None,
+        subtype: str = None,
+        custom: str = None,
+        prune: bool = False,
+    ) -> dict:
+        """Synchronize a local mirror of the published records matching the
+        search query (e.g., all the records of a community).
+
+        Only the records updated since the last synchronization (and before
+        the start of this one) are fetched, most recently created first
+        (``sort="-mostrecent"``), and upserted into the ``store`` (a
+        ``MirrorStore`` or the path of its database). Unless
+        ``all_versions``, the previous versions of the upserted records are
+        removed. Each page is applied with a checkpoint so that an interrupted
+        synchronization resumes where it stopped. The records deleted from
+        Zenodo (or no longer matching the query) are only noticed with
+        ``prune``, which compares the IDs of the mirror with a full (ID only)
+        harvest of the query.
+
+        Returns the numbers of ``upserted`` and ``deleted`` records and the
+        ``high_water`` mark of the mirror."""
+        _check_page_size(size)
+        owned = not isinstance(store, MirrorStore)
+        if owned:
+            store = MirrorStore(store)
+        try:
+            search = self._sync_search(query, all_versions, communities, type_, subtype, custom)
+            run = _SyncRun(store, search, size)
+            tmp_headers = self._list_records_headers(content_type="json")
+            tmp_url = self._base_records_url.strip().rstrip("/")
+            upserted = deleted = 0
+            while not run.done:
+                tmp_params = self._list_records_params(
+                    size=size, **run.params(query), **self._sync_params(search)
+                )
+                response = self._client._request("GET", url=tmp_url, params=tmp_params, headers=tmp_headers)
+                hits, search_result = _search_page(response)
+                upserts, state = run.advance(hits, _total_hits(search_result))
+                deleted += store.apply(upserts, state=state, supersede=not all_versions)
+                upserted += len(upserts)
+            if prune:
+                harvested = self.harvest_records(
+                    query=query, field="created", view=["id"], **self._sync_params(search, sort=False)
+                )
+                stale = store.ids() - {view.id for view in harvested}
+                deleted += store.apply(deletions=sorted(stale))
+            return {"upserted": upserted, "deleted": deleted, "high_water": run.high_water}
+        finally:
+            if owned:
+                store.close()
+
+    @staticmethod
+    def _sync_search(
+        query: str = None,
+        all_versions: (int | bool) = False,
+        communities: str = None,
+        type_: str = None,
+        subtype: str = None,
+        custom: str = None,
+    ) -> dict:
+        """The search mirrored by a store"""
+        return {
+            "query": query,
+            "all_versions": int(bool(all_versions)),
+            "communities": communities,
+            "type_": type_,
+            "subtype": subtype,
+            "custom": custom,
+        }
+
+    @staticmethod
+    def _sync_params(search: dict = None, sort: bool = True) -> dict:
+        params = {key: value for key, value in search.items() if key != "query"}
+        if sort:
+            params.update(status="published", sort="-mostrecent")
+        return params
+
+    @staticmethod
+    def _harvest_params(
+        all_versions: (int | bool) = False,
+        communities: str = None,
+        type_: str = None,
+        subtype: str = None,
+        custom: str = None,
+    ) -> dict:
+        # The pages of a range are sorted by creation so that they do not
+        # overlap
+        return dict(
+            status="published",
+            sort="mostrecent",
+            all_versions=all_versions,
+            communities=communities,
+            type_=type_,
+            subtype=subtype,
+            custom=custom,
+        )
+
+    @staticmethod
+    def _harvest_pages(leaves: list = None, size: int = None):
+        """The (range, page) pairs of the pages of the harvested ranges"""
+        for range_, total in leaves:
+            for page in range(1, -(-total // size) + 1):
+                yield range_, page
+
+    @staticmethod
+    def _count(hits: list = None, search_result: dict = None) -> int:
+        total = _total_hits(search_result)
+        if total is None:
+            raise RuntimeError("The search result does not report its total number of hits.")
+        return total
+
+    def _retrieve_checked(self, id_: int = None) -> Record:
+        url = self._base_records_url + str(id_)
+        return Record(self._client, record=self._client._get_json(url, check_status=True))
+
+    def _search_batches(self, ids: list[int] = None, search_batch_size: int = 50) -> list[list[int]]:
+        if not isinstance(search_batch_size, int) or search_batch_size < 1:
+            raise ValueError("The 'search_batch_size' argument must be a positive integer.")
+        unique_ids = list(dict.fromkeys(ids))
+        return [
+            unique_ids[start:start + search_batch_size]
+            for start in range(0, len(unique_ids), search_batch_size)
+        ]
+
+    def _search_batch_params(self, batch: list[int] = None) -> dict:
+        return dict(
+            content_type="json",
+            query=f"recid:({' OR '.join(str(id_) for id_ in batch)})",
+            status="published",
+            sort="bestmatch",
+            size=len(batch),
+            all_versions=True,
+        )
+
+    def _search_hits(self, batch: list[int] = None, hits=None) -> dict:
+        """Map the IDs of a batch to the records found by its search query"""
+        if not isinstance(hits, list):
+            return {}
+        batch = set(batch)
+        return {record["id"]: record for record in hits if record.data.get("id") in batch}
+
+    def _search_ids(self, batch: list[int] = None) -> dict:
+        return self._search_hits(batch, self.list_records(**self._search_batch_params(batch)))
+
+
+class _AsyncRecords(_Records):
+    """Asynchronous counterpart of the ``_Records`` class created by
+    the ``zenopy.AsyncZenodo`` client."""
+
+    async def list_records(
+        self,
+        content_type: str = None,
+        query: Any = None,
+        status: str = None,
+        sort: str = None,
+        page: int = None,
+        size: int = None,
+        all_versions: (int | bool) = False,
+        communities: str = None,
+        type_: str = None,
+        subtype: str = None,
+        bounds: str = None,
+        custom: str = None,
+        view: (bool | list[str]) = False,
+    ) -> list[Record]:
+        """List all published open access records matching the
+        (elastic) search query statement. For further details
+        see https://help.zenodo.org/guides/search/
+
+        With ``view`` set to True (or a list of field names), compact
+        read-only ``RecordView`` objects are returned instead of Records."""
+        tmp_headers = self._list_records_headers(content_type=content_type)
+        tmp_params = self._list_records_params(
+            query=query,
+            status=status,
+            sort=sort,
+            page=page,
+            size=size,
+            all_versions=all_versions,
+            communities=communities,
+            type_=type_,
+            subtype=subtype,
+            bounds=bounds,
+            custom=custom,
+        )
+        tmp_url = self._base_records_url.strip().rstrip("/")
+        if self._client._search_cache is not None:
+            content = await self._client._get_search(tmp_url, tmp_params, tmp_headers)
+            return self._search_records(content, view=view)
+        response = await self._client._request("GET", url=tmp_url, params=tmp_params, headers=tmp_headers)
+        return self._handle_search_result(response, view=view)
+
+    async def retrieve_record(self, id_: int = None, lazy: bool = False) -> Record:
+        """Retrieve a single record. A lazy record is fetched by the
+        client's ``prefetch_records()``."""
         if id_ is not None and isinstance(id_, int):
-            return Record(self._client, id_=id_, url=None, record=None)
+            if lazy:
+                return Record(self._client, id_=id_, kind="record", lazy=True)
+            return await self._client._get_record(self._base_records_url + str(id_))
         else:
             raise ValueError("The record ID cannot be None and must be an integer.")
+
+    async def retrieve_records(
+        self,
+        ids: list[int] = None,
+        max_workers: int = 8,
+        use_search: bool = False,
+        search_batch_size: int = 50,
+    ) -> list:
+        """Retrieve several records concurrently (see ``_Records.retrieve_records``)"""
+        ids = _batch_ids(ids)
+        results = {}
+        if use_search:
+            batches = self._search_batches(ids, search_batch_size)
+            for hits in await _gather_concurrently(self._search_ids, batches, max_workers):
+                if not isinstance(hits, Exception):
+                    results.update(hits)
+        missing = [id_ for id_ in dict.fromkeys(ids) if id_ not in results]
+        results.update(
+            zip(missing, await _gather_concurrently(self.retrieve_record, missing, max_workers))
+        )
+        return _batch_results(ids, results)
+
+    async def iter_records(
+        self,
+        query: Any = None,
+        status: str = "published",
+        sort: str = "bestmatch",
+        size: int = 100,
+        all_versions: (int | bool) = False,
+        communities: str = None,
+        type_: str = None,
+        subtype: str = None,
+        bounds: str = None,
+        custom: str = None,
+        view: (bool | list[str]) = False,
+        prefetch: int = 0,
+    ):
+        """Asynchronously iterate over all the published records matching
+        the search query (see ``_Records.iter_records``)"""
+        _check_page_size(size)
+        _check_prefetch(prefetch)
+        fields = _view_fields(view)
+        tmp_headers = self._list_records_headers(content_type="json")
+        tmp_url = self._base_records_url.strip().rstrip("/")
+        search_params = dict(
+            query=query,
+            status=status,
+            sort=sort,
+            size=size,
+            all_versions=all_versions,
+            communities=communities,
+            type_=type_,
+            subtype=subtype,
+            bounds=bounds,
+            custom=custom,
+        )
+
+        async def fetch_page(page: int = None) -> tuple:
+            tmp_params = self._list_records_params(page=page, **search_params)
+            response = await self._client._request("GET", url=tmp_url, params=tmp_params, headers=tmp_headers)
+            return _search_page(response)
+
+        hits, search_result = await fetch_page(1)
+        if prefetch and _has_next_page(search_result, hits, 1, size):
+            pages = _aprefetch_pages(fetch_page, (hits, search_result), _last_page(search_result, size), prefetch)
+        else:
+            pages = self._aiter_pages(fetch_page, hits, search_result, size)
+        async for hits, _ in pages:
+            for record in hits:
+                yield RecordView(record, fields) if fields is not None else Record(self._client, record=record)
+
+    @staticmethod
+    async def _aiter_pages(fetch_page=None, hits: list = None, search_result: dict = None, size: int = None):
+        page = 1
+        while True:
+            yield hits, search_result
+            if not _has_next_page(search_result, hits, page, size):
+                return
+            page += 1
+            hits, search_result = await fetch_page(page)
+
+    async def harvest_records(
+        self,
+        query: str = None,
+        field: str = "publication_date",
+        start=None,
+        end=None,
+        size: int = 100,
+        max_workers: int = 8,
+        max_result_window: int = 10000,
+        all_versions: (int | bool) = False,
+        communities: str = None,
+        type_: str = None,
+        subtype: str = None,
+        custom: str = None,
+        view: (bool | list[str]) = False,
+    ):
+        """Asynchronously iterate over all the published records matching
+        the search query (see ``_Records.harvest_records``)"""
+        _check_page_size(size)
+        fields = _view_fields(view)
+        partitions = _Partitions(field, start, end)
+        capacity = (max_result_window // size) * size
+        if capacity < 1:
+            raise ValueError("The 'size' argument must not exceed the 'max_result_window' argument.")
+        tmp_headers = self._list_records_headers(content_type="json")
+        tmp_url = self._base_records_url.strip().rstrip("/")
+        search_params = self._harvest_params(all_versions, communities, type_, subtype, custom)
+
+        async def fetch_page(range_: tuple = None, page: int = 1, page_size: int = size) -> tuple:
+            tmp_params = self._list_records_params(
+                query=partitions.query(range_, query), page=page, size=page_size, **search_params
+            )
+            response = await self._client._request("GET", url=tmp_url, params=tmp_params, headers=tmp_headers)
+            return _search_page(response)
+
+        async def count(range_: tuple = None) -> int:
+            return self._count(*await fetch_page(range_, 1, 1))
+
+        leaves = []
+        ranges = [partitions.root]
+        while ranges:
+            totals = await _gather_concurrently(count, ranges, max_workers)
+            new_leaves, ranges = partitions.refine(ranges, totals, capacity)
+            leaves.extend(new_leaves)
+        seen = set()
+        pages = self._harvest_pages(leaves, size)
+        async for hits, _ in _amap_bounded(lambda page: fetch_page(*page), pages, max_workers):
+            for record in hits:
+                if record["id"] in seen:
+                    continue
+                seen.add(record["id"])
+                yield RecordView(record, fields) if fields is not None else Record(self._client, record=record)
+
+    async def sync_records(
+        self,
+        store: (MirrorStore | str) = None,
+        query: str = None,
+        size: int = 100,
+        all_versions: (int | bool) = False,
+        communities: str = None,
+        type_: str = None,
+        subtype: str = None,
+        custom: str = None,
+        prune: bool = False,
+    ) -> dict:
+        """Asynchronously synchronize a local mirror of the published records
+        matching the search query (see ``_Records.sync_records``)"""
+        _check_page_size(size)
+        owned = not isinstance(store, MirrorStore)
+        if owned:
+            store = MirrorStore(store)
+        try:
+            search = self._sync_search(query, all_versions, communities, type_, subtype, custom)
+            run = _SyncRun(store, search, size)
+            tmp_headers = self._list_records_headers(content_type="json")
+            tmp_url = self._base_records_url.strip().rstrip("/")
+            upserted = deleted = 0
+            while not run.done:
+                tmp_params = self._list_records_params(
+                    size=size, **run.params(query), **self._sync_params(search)
+                )
+                response = await self._client._request("GET", url=tmp_url, params=tmp_params, headers=tmp_headers)
+                hits, search_result = _search_page(response)
+                upserts, state = run.advance(hits, _total_hits(search_result))
+                deleted += store.apply(upserts, state=state, supersede=not all_versions)
+                upserted += len(upserts)
+            if prune:
+                harvested = self.harvest_records(
+                    query=query, field="created", view=["id"], **self._sync_params(search, sort=False)
+                )
+                stale = store.ids() - {view.id async for view in harvested}
+                deleted += store.apply(deletions=sorted(stale))
+            return {"upserted": upserted, "deleted": deleted, "high_water": run.high_water}
+        finally:
+            if owned:
+                store.close()
+
+    async def _search_ids(self, batch: list[int] = None) -> dict:
+        return self._search_hits(batch, await self.list_records(**self._search_batch_params(batch)))
@@ -4,10 +4,11 @@
 
 """
 
-import requests
 import logging
-from zenopy.record import Record
+from zenopy.codec import loads
+from zenopy.record import Record, resource_types
 from zenopy.errors import zenodo_error
+from zenopy.utils import _check_page_size, _has_next_page, _search_page
 
 logger = logging.getLogger(__name__)
 
@@ -19,9 +20,10 @@ class _Resources(object):
 
     def __init__(self, client, resource: str = None):
         self._client = client
-        valid_resources = ["communities", "licenses", "grants", "funders"]
+        valid_resources = resource_types
         if resource is not None and resource != "":
             if resource in valid_resources:
+                self._resource = resource
                 self._base_resources_url = self._client._base_url + f"/{resource}/"
             else:
                 raise ValueError(
@@ -44,19 +46,49 @@ class _Resources(object):
         """List all record/deposition resources (licenses, grants, funders
         and communities) matching the (elastic) search query statement.
         For further details see https://help.zenodo.org/guides/search"""
+        tmp_params = self._list_resources_params(query=query, page=page, size=size)
+        tmp_url = self._base_resources_url.strip().rstrip("/")
+        response = self._client._request("GET", url=tmp_url, params=tmp_params)
+        return self._handle_search_result(response)
+
+    def iter_resources(self, query: str = None, size: int = 100):
+        """Iterate over all the resources matching the search query (see
+        ``list_resources``). The result pages of ``size`` resources are
+        fetched one at a time as the iteration proceeds and the iteration
+        stops after the last page."""
+        _check_page_size(size)
+        tmp_url = self._base_resources_url.strip().rstrip("/")
+        page = 1
+        while True:
+            tmp_params = self._list_resources_params(query=query, page=page, size=size)
+            response = self._client._request("GET", url=tmp_url, params=tmp_params)
+            hits, search_result = _search_page(response)
+            for record in hits:
+                yield Record(self._client, record=record)
+            if not _has_next_page(search_result, hits, page, size):
+                return
+            page += 1
+
+    def _list_resources_params(
+        self,
+        query: str = None,
+        page: int = None,
+        size: int = None,
+    ) -> dict:
+        """Build the search request parameters."""
         tmp_params = self._params.copy()
         keys_list = ["q", "page", "size"]
         values_list = [query, page, size]
         for key, value in zip(keys_list, values_list):
             if value is not None:
                 tmp_params[key] = value
+        return tmp_params
 
-        tmp_url = self._base_resources_url.strip().rstrip("/")
-        response = requests.get(url=tmp_url, params=tmp_params)
+    def _handle_search_result(self, response) -> list[Record]:
         status_code = response.status_code
         if status_code != 200:
             zenodo_error(status_code)
-        search_result = response.json()
+        search_result = loads(response.content)
         search_result_list = search_result["hits"]["hits"]
         records_list = []
         if isinstance(search_result_list, list) and search_result_list != []:
@@ -66,12 +98,64 @@ class _Resources(object):
         else:
             return search_result
 
-    def retrieve_resource(self, id_: str = None) -> Record:
-        """Retrieve a single resource"""
+    def retrieve_resource(self, id_: str = None, lazy: bool = False) -> Record:
+        """Retrieve a single resource (fetched upon the first access of its
+        data if ``lazy``)"""
+        # Validate the resource ID
+        self._resource_url(id_=id_)
+        return Record(
+            self._client, id_=id_, kind="resource", resource=self._resource, lazy=lazy
+        )
+
+    def _resource_url(self, id_: str = None) -> str:
         if id_ is not None and id_ != "":
-            tmp_url = self._base_resources_url + str(id_)
-            return Record(self._client, id_=None, url=tmp_url, record=None)
+            return self._base_resources_url + str(id_)
         else:
             raise ValueError(
                 "The license ID is None or empty.\n" "Please use a valid license ID.\n"
             )
+
+
+class _AsyncResources(_Resources):
+    """Asynchronous counterpart of the ``_Resources`` class created by
+    the ``zenopy.AsyncZenodo`` client."""
+
+    async def list_resources(
+        self,
+        query: str = None,
+        page: int = None,
+        size: int = None,
+    ) -> list[Record]:
+        """List all record/deposition resources (licenses, grants, funders
+        and communities) matching the (elastic) search query statement.
+        For further details see https://help.zenodo.org/guides/search"""
+        tmp_params = self._list_resources_params(query=query, page=page, size=size)
+        tmp_url = self._base_resources_url.strip().rstrip("/")
+        response = await self._client._request("GET", url=tmp_url, params=tmp_params)
+        return self._handle_search_result(response)
+
+    async def iter_resources(self, query: str = None, size: int = 100):
+        """Asynchronously iterate over all the resources matching the search
+        query (see ``_Resources.iter_resources``)"""
+        _check_page_size(size)
+        tmp_url = self._base_resources_url.strip().rstrip("/")
+        page = 1
+        while True:
+            tmp_params = self._list_resources_params(query=query, page=page, size=size)
+            response = await self._client._request("GET", url=tmp_url, params=tmp_params)
+            hits, search_result = _search_page(response)
+            for record in hits:
+                yield Record(self._client, record=record)
+            if not _has_next_page(search_result, hits, page, size):
+                return
+            page += 1
+
+    async def retrieve_resource(self, id_: str = None, lazy: bool = False) -> Record:
+        """Retrieve a single resource. A lazy resource is fetched by the
+        client's ``prefetch_records()``"""
+        tmp_url = self._resource_url(id_=id_)
+        if lazy:
+            return Record(
+                self._client, id_=id_, kind="resource", resource=self._resource, lazy=True
+            )
+        return await self._client._get_record(tmp_url)
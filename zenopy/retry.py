@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""Zenodo client retry policy
+
+"""
+
+import random
+import logging
+from zenopy.ratelimit import _parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+
+class _RetryPolicy(object):
+    """Retry policy with exponential backoff and jitter used by the
+    zenopy client transports.
+
+    Transient failures (429 and 5xx responses, connection errors) are
+    retried up to ``max_retries`` times. Requests rejected with 429 or
+    failing before a connection is established have never reached the
+    server and are always retried. All the other failures are retried only
+    for idempotent HTTP methods, so that e.g., the POST request sent by
+    ``create_deposition()`` does not create duplicate depositions."""
+
+    idempotent_methods = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_max: float = 30.0,
+        jitter: bool = True,
+        status_codes: tuple[int] = (429, 500, 502, 503, 504),
+    ):
+        if not isinstance(max_retries, int) or max_retries < 0:
+            raise ValueError("The 'max_retries' argument must be a non-negative integer.")
+        if backoff_factor is None or backoff_factor < 0:
+            raise ValueError("The 'backoff_factor' argument must be a non-negative number.")
+        if backoff_max is None or backoff_max < 0:
+            raise ValueError("The 'backoff_max' argument must be a non-negative number.")
+        self._max_retries = max_retries
+        self._backoff_factor = float(backoff_factor)
+        self._backoff_max = float(backoff_max)
+        self._jitter = jitter
+        self._status_codes = frozenset(status_codes)
+
+    @property
+    def max_retries(self) -> int:
+        """Maximum number of times a failed request is re-sent."""
+        return self._max_retries
+
+    def is_idempotent(self, method: str = None) -> bool:
+        return method.upper() in self.idempotent_methods
+
+    def should_retry(
+        self,
+        attempt: int = 0,
+        method: str = None,
+        status_code: int = None,
+        maybe_processed: bool = True,
+    ) -> bool:
+        """Decide whether a failed request can be re-sent.
+
+        Parameters
+        ----------
+        attempt : int
+            Number of retries already performed for the request
+        method : str
+            HTTP method of the request
+        status_code : int, optional
+            Status code of the response, or None if the request has raised
+            a connection error
+        maybe_processed : bool, optional
+            False if the request is known not to have reached the server
+            (e.g., the connection could not be established), by default True
+        """
+        if attempt >= self._max_retries:
+            return False
+        if status_code is not None:
+            if status_code not in self._status_codes:
+                return False
+            if status_code == 429:
+                return True
+        elif not maybe_processed:
+            return True
+        return self.is_idempotent(method)
+
+    def delay(self, attempt: int = 0, headers=None) -> float:
+        """Number of seconds to wait before the next attempt. The delay
+        requested by a ``Retry-After`` header is capped by ``backoff_max``."""
+        if headers is not None:
+            retry_after = _parse_retry_after(headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(self._backoff_max, retry_after)
+        delay = min(self._backoff_max, self._backoff_factor * (2 ** attempt))
+        if self._jitter:
+            delay = random.uniform(0.0, delay)
+        return delay
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+
+"""Zenodo incremental synchronization of the records into a local mirror
+
+"""
+
+import os
+import sqlite3
+import threading
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from zenopy.codec import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+_schema = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    conceptrecid INTEGER,
+    updated TEXT,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_conceptrecid ON records (conceptrecid);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _utcnow() -> str:
+    """Current UTC time formatted like the ``_updated`` timestamps"""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat(timespec="microseconds")
+
+
+def _updated(data: dict = None) -> (str | None):
+    """Last modification timestamp of a record as a UTC ISO 8601 string
+    without time zone (so that the timestamps compare as strings)"""
+    value = data.get("updated", data.get("modified"))
+    if not value:
+        return None
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp.isoformat(timespec="microseconds")
+
+
+class MirrorStore(object):
+    """Local (SQLite) mirror of the published records matching a search,
+    kept up to date by ``sync_records``.
+
+    Besides the JSON data of the records, the store keeps the synchronization
+    state: the high-water mark of the ``updated`` timestamps of the synced
+    records and the checkpoint of an interrupted synchronization. The
+    changes of each page of results are applied along with their checkpoint
+    in a single transaction."""
+
+    def __init__(self, path: (str | Path) = None):
+        self._path = Path(path).expanduser().absolute()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        with self._lock:
+            self._connect()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def _connect(self) -> "sqlite3.Connection":
+        """The connection of the current process (re-opened after a fork)"""
+        if self._connection is None or self._pid != os.getpid():
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self._path, timeout=30.0, check_same_thread=False, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_schema)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def __contains__(self, id_: int = None) -> bool:
+        with self._lock:
+            row = self._connect().execute("SELECT 1 FROM records WHERE id = ?", (id_,)).fetchone()
+        return row is not None
+
+    def get(self, id_: int = None) -> (dict | None):
+        """JSON data of a mirrored record (None if missing)"""
+        with self._lock:
+            row = self._connect().execute("SELECT data FROM records WHERE id = ?", (id_,)).fetchone()
+        return None if row is None else loads(row[0])
+
+    def ids(self) -> set[int]:
+        with self._lock:
+            return {id_ for (id_,) in self._connect().execute("SELECT id FROM records")}
+
+    def state(self) -> dict:
+        """The synchronization state (see ``_SyncRun``)"""
+        with self._lock:
+            rows = self._connect().execute("SELECT key, value FROM state").fetchall()
+        return {key: loads(value) for key, value in rows}
+
+    def apply(
+        self,
+        upserts: list[dict] = None,
+        deletions: list[int] = None,
+        state: dict = None,
+        supersede: bool = False,
+    ) -> int:
+        """Insert (or replace) the records, delete the records of the IDs and
+        update the state in a single transaction. With ``supersede``, the
+        other versions of the upserted records are deleted as well. Returns
+        the number of deleted records."""
+        deleted = 0
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                for data in upserts or []:
+                    id_ = int(data["id"])
+                    conceptrecid = data.get("conceptrecid")
+                    conceptrecid = int(conceptrecid) if conceptrecid else None
+                    if supersede and conceptrecid is not None:
+                        deleted += connection.execute(
+                            "DELETE FROM records WHERE conceptrecid = ? AND id != ?", (conceptrecid, id_)
+                        ).rowcount
+                    connection.execute(
+                        "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)",
+                        (id_, conceptrecid, _updated(data), dumps(data)),
+                    )
+                for id_ in deletions or []:
+                    deleted += connection.execute("DELETE FROM records WHERE id = ?", (id_,)).rowcount
+                for key, value in (state or {}).items():
+                    if value is None:
+                        connection.execute("DELETE FROM state WHERE key = ?", (key,))
+                    else:
+                        connection.execute(
+                            "INSERT OR REPLACE INTO state VALUES (?, ?)", (key, dumps(value).decode())
+                        )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return deleted
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class _SyncRun(object):
+    """Page numbered pagination of the records updated since the high-water
+    mark, resumed from the checkpoint of the store if any.
+
+    The window of a run is frozen as ``updated:[high_water TO run_start]``
+    where ``run_start`` is the (UTC) time at which the run started: the
+    records updated in the meantime fall outside of it and are synced by the
+    next run. The high-water mark then advances to the latest ``updated``
+    timestamp seen in the window (not to ``run_start``) so that the records
+    indexed late, or missed because of a clock skew, are synced by the next
+    run; the records already synced at the high-water mark are skipped.
+
+    The records which leave the window during the run (updated again or
+    deleted) shift the following ones to earlier pages, hence the pagination
+    steps back when the total number of hits decreases."""
+
+    def __init__(self, store: MirrorStore = None, search: dict = None, size: int = 100):
+        state = store.state()
+        if state.get("search", search) != search:
+            raise ValueError(
+                f"The mirror ({store.path}) holds the records of another search "
+                f"({state['search']})."
+            )
+        self._search = search
+        self._size = size
+        self.high_water = state.get("high_water")
+        self._high_water_ids = set(state.get("high_water_ids") or [])
+        checkpoint = state.get("checkpoint")
+        if checkpoint is not None:
+            logger.info(f"Resuming the synchronization of {store.path} at page {checkpoint['page']}")
+            self._run_start = checkpoint["run_start"]
+            self._page = checkpoint["page"]
+            self._total = checkpoint["total"]
+            self._latest = checkpoint["latest"]
+            self._latest_ids = set(checkpoint["latest_ids"])
+        else:
+            self._run_start = _utcnow()
+            self._page = 1
+            self._total = None
+            self._latest = None
+            self._latest_ids = set()
+        self.done = False
+
+    def params(self, query: str = None) -> dict:
+        """The query and page of the next request"""
+        low = "*" if self.high_water is None else self.high_water
+        term = f"updated:[{low} TO {self._run_start}]"
+        return {"query": f"({query}) AND {term}" if query else term, "page": self._page}
+
+    def _see(self, hits: list[dict] = None) -> list[dict]:
+        """Track the latest timestamp of the window and return the records
+        which are not already synced at the high-water mark"""
+        upserts = []
+        for data in hits:
+            updated = _updated(data)
+            if updated is not None:
+                if self._latest is None or updated > self._latest:
+                    self._latest = updated
+                    self._latest_ids = set()
+                if updated == self._latest:
+                    self._latest_ids.add(data["id"])
+            if updated != self.high_water or data["id"] not in self._high_water_ids:
+                upserts.append(data)
+        return upserts
+
+    def advance(self, hits: list[dict] = None, total: int = None) -> tuple[list[dict], dict]:
+        """Return the records of the page to upsert and the state to store"""
+        upserts = self._see(hits)
+        if total is not None and self._total is not None and total != self._total:
+            # Step back by the number of records which left the window (back
+            # to the first page if some entered it)
+            removed = self._total - total
+            back = -(-removed // self._size) if removed > 0 else self._page
+            logger.info(f"The window of the synchronization has changed ({self._total} to {total} records)")
+            self._page = max(1, self._page - back)
+            self._total = total
+        elif len(hits) < self._size:
+            self.done = True
+            if self._latest is not None and self._latest == self.high_water:
+                self._high_water_ids |= self._latest_ids
+            elif self._latest is not None:
+                self.high_water = self._latest
+                self._high_water_ids = self._latest_ids
+            state = {
+                "search": self._search,
+                "high_water": self.high_water,
+                "high_water_ids": sorted(self._high_water_ids),
+                "checkpoint": None,
+            }
+            return upserts, state
+        else:
+            self._total = total
+            self._page += 1
+        checkpoint = {
+            "run_start": self._run_start,
+            "page": self._page,
+            "total": self._total,
+            "latest": self._latest,
+            "latest_ids": sorted(self._latest_ids),
+        }
+        return upserts, {"search": self._search, "checkpoint": checkpoint}
@@ -0,0 +1,1153 @@
+# -*- coding: utf-8 -*-
+
+"""In-process fake Zenodo server for offline testing and benchmarking
+
+"""
+
+import collections
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit, quote, unquote
+import logging
+
+from zenopy.metrics import _endpoint_template
+
+logger = logging.getLogger(__name__)
+
+# Metadata fields required by Zenodo for publishing a deposition
+required_metadata = ["upload_type", "title", "creators", "description"]
+
+# Vocabulary records served by the resources endpoints
+default_resources = {
+    "licenses": [
+        {"id": "cc-by-4.0", "title": "Creative Commons Attribution 4.0 International"},
+        {"id": "cc0-1.0", "title": "Creative Commons Zero v1.0 Universal"},
+        {"id": "mit", "title": "MIT License"},
+        {"id": "apache-2.0", "title": "Apache License 2.0"},
+    ],
+    "communities": [
+        {"id": "zenodo", "title": "Zenodo"},
+        {"id": "molssi", "title": "The Molecular Sciences Software Institute"},
+    ],
+    "grants": [{"id": "10.13039/100000001::2136142", "title": "Molecular Sciences Software Institute"}],
+    "funders": [{"id": "10.13039/100000001", "title": "National Science Foundation"}],
+}
+
+
+class _HTTPError(Exception):
+    """Error response raised by the fake server route handlers"""
+
+    def __init__(self, status_code: int = None, message: str = None, errors: list = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.errors = errors
+
+
+class FakeZenodo(object):
+    """A local stand-in for the Zenodo REST API running in a background thread.
+
+    The server implements the deposition, deposition files, bucket, actions,
+    records and resources (licenses, communities, grants and funders)
+    endpoints used by zenopy and serves JSON documents shaped like the ones
+    returned by Zenodo. All the data are kept in memory. Network conditions
+    can be emulated with a per-request latency, a per-connection bandwidth
+    cap, injected 429/5xx faults and a server-side rate limit. The JSON
+    responses of GET requests carry an ``ETag`` (and a ``Last-Modified``
+    header for the depositions and records) and conditional requests are
+    answered with 304 (Not Modified) responses.
+
+    Parameters
+    ----------
+    host : str, optional
+        Interface the server listens on, by default "127.0.0.1"
+    port : int, optional
+        Port the server listens on, by default 0 (any free port)
+    latency : float | tuple[float, float], optional
+        Delay (in seconds) added to every response, or the bounds of a
+        uniformly distributed delay, by default 0.0
+    bandwidth : float, optional
+        Maximum transfer rate (in bytes per second) of the request and
+        response bodies of each connection, by default None (unlimited)
+    fault_rate : float, optional
+        Probability of rejecting a request with one of the
+        ``fault_status_codes`` before processing it, by default 0.0
+    fault_status_codes : tuple[int], optional
+        Status codes of the randomly injected faults,
+        by default (429, 500, 502, 503, 504)
+    retry_after : float, optional
+        Value of the ``Retry-After`` header of the 429 responses,
+        by default 0
+    rate_limit : int, optional
+        Maximum number of requests accepted per ``rate_limit_period`` seconds.
+        If set, the ``X-RateLimit-*`` headers are sent with every response,
+        by default None (unlimited)
+    rate_limit_period : float, optional
+        Length of the rate limiting window in seconds, by default 60.0
+    max_result_window : int, optional
+        Maximum value of ``page * size`` accepted by the search endpoints,
+        by default 10000
+    seed : int, optional
+        Seed of the random number generator used for the latency and the
+        faults, by default None
+
+    Examples
+    --------
+    >>> from zenopy.testing import FakeZenodo
+    >>> with FakeZenodo(latency=0.01) as server:
+    ...     server.add_records(100)
+    ...     cli = server.client()
+    ...     records = cli.init_records().list_records(status="published", sort="bestmatch", size=50)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: (float | tuple[float, float]) = 0.0,
+        bandwidth: float = None,
+        fault_rate: float = 0.0,
+        fault_status_codes: tuple[int] = (429, 500, 502, 503, 504),
+        retry_after: float = 0,
+        rate_limit: int = None,
+        rate_limit_period: float = 60.0,
+        max_result_window: int = 10000,
+        seed: int = None,
+    ):
+        if bandwidth is not None and bandwidth <= 0:
+            raise ValueError("The 'bandwidth' argument must be a positive number.")
+        if fault_rate < 0 or fault_rate > 1:
+            raise ValueError("The 'fault_rate' argument must be between 0 and 1.")
+        self._host = host
+        self._port = port
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.fault_rate = fault_rate
+        self.fault_status_codes = tuple(fault_status_codes)
+        self.retry_after = retry_after
+        self.rate_limit = rate_limit
+        self.rate_limit_period = rate_limit_period
+        self.max_result_window = max_result_window
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._server = None
+        self._thread = None
+        self._next_id = 1
+        self._depositions = {}
+        self._records = {}
+        self._latest_versions = {}
+        self._buckets = {}
+        self._resources = {
+            name: {item["id"]: dict(item) for item in items}
+            for name, items in default_resources.items()
+        }
+        self._faults = []
+        self._window_start = time.time()
+        self._window_count = 0
+        self._counts = collections.Counter()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+
+    # Server life cycle
+
+    def start(self) -> "FakeZenodo":
+        """Start serving the requests in a background thread."""
+        if self._server is not None:
+            raise RuntimeError("The fake Zenodo server is already running.")
+        handler = type("_Handler", (_FakeZenodoHandler,), {"fake": self})
+        self._server = ThreadingHTTPServer((self._host, self._port), handler)
+        self._server.daemon_threads = True
+        self._server.block_on_close = False
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="FakeZenodo",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server and close its listening socket."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """Root URL of the running server"""
+        if self._server is None:
+            raise RuntimeError("The fake Zenodo server is not running.")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        """URL of the REST API of the running server"""
+        return self.url + "/api"
+
+    def client(self, token: str = "fake-token", **kwargs):
+        """Create a ``zenopy.Zenodo`` client connected to the server."""
+        from zenopy.client import Zenodo
+
+        return Zenodo(token=token, base_url=self.base_url, **kwargs)
+
+    def async_client(self, token: str = "fake-token", **kwargs):
+        """Create a ``zenopy.AsyncZenodo`` client connected to the server."""
+        from zenopy.client import AsyncZenodo
+
+        return AsyncZenodo(token=token, base_url=self.base_url, **kwargs)
+
+    # Test fixtures and instrumentation
+
+    def add_record(
+        self,
+        metadata: dict = None,
+        files: dict = None,
+        communities: list[str] = None,
+    ) -> dict:
+        """Add a published record (and its deposition) to the server.
+
+        Parameters
+        ----------
+        metadata : dict, optional
+            Deposition metadata, completed with generated values for the
+            required fields
+        files : dict, optional
+            Mapping of the file names to their (bytes) contents
+        communities : list[str], optional
+            IDs of the communities the record belongs to
+
+        Returns
+        -------
+        dict
+            The JSON document of the published record
+        """
+        with self._lock:
+            deposition = self._new_deposition()
+            id_ = deposition["id"]
+            tmp_metadata = {
+                "upload_type": "dataset",
+                "title": f"Fake record {id_}",
+                "creators": [{"name": "Doe, John", "affiliation": "Zenopy"}],
+                "description": f"Description of the fake record {id_}.",
+                "access_right": "open",
+                "license": "cc-by-4.0",
+            }
+            if communities:
+                tmp_metadata["communities"] = [{"identifier": c} for c in communities]
+            tmp_metadata.update(metadata or {})
+            deposition["metadata"].update(tmp_metadata)
+            bucket = self._buckets[deposition["bucket"]]
+            for key, content in (files or {}).items():
+                bucket["objects"][key] = _file_object(content)
+            self._publish(deposition)
+            return self._record_json(self._records[id_])
+
+    def add_records(self, count: int = None, **kwargs) -> list[dict]:
+        """Add ``count`` published records to the server."""
+        return [self.add_record(**kwargs) for _ in range(count)]
+
+    def delete_record(self, id_: int = None) -> None:
+        """Remove a published record; it is then reported as gone (410)."""
+        with self._lock:
+            record = self._records[id_]
+            record["deleted"] = True
+            record["updated"] = _now()
+            versions = [
+                r["id"]
+                for r in self._records.values()
+                if r["conceptrecid"] == record["conceptrecid"] and not r["deleted"]
+            ]
+            if versions:
+                self._latest_versions[record["conceptrecid"]] = max(versions)
+            else:
+                del self._latest_versions[record["conceptrecid"]]
+
+    def inject_fault(
+        self, status_code: int = 503, count: int = 1, method: str = None, path: str = None
+    ) -> None:
+        """Reject the next ``count`` requests matching the optional method and
+        path prefix (relative to the API URL) with ``status_code``."""
+        with self._lock:
+            self._faults.append(
+                {"status_code": status_code, "count": count, "method": method, "path": path}
+            )
+
+    def request_count(self, method: str = None, endpoint: str = None) -> int:
+        """Number of requests received, optionally for a single method and/or
+        endpoint template (e.g., ``"/records/{id}"``)."""
+        with self._lock:
+            return sum(
+                count
+                for (m, e), count in self._counts.items()
+                if (method is None or m == method) and (endpoint is None or e == endpoint)
+            )
+
+    def peak_in_flight(self) -> int:
+        """Largest number of requests processed concurrently."""
+        with self._lock:
+            return self._peak_in_flight
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._peak_in_flight = self._in_flight
+
+    def _enter(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+    def _exit(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    # Request processing
+
+    def _handle(self, method: str = None, path: str = None, query: dict = None, headers=None, body: bytes = None):
+        """Route a request and return the (status code, body, headers) tuple."""
+        extra_headers = {}
+        with self._lock:
+            self._counts[(method, _endpoint_template(path, "/api"))] += 1
+            if self.rate_limit is not None:
+                extra_headers.update(self._rate_limit_headers())
+                if int(extra_headers["X-RateLimit-Remaining"]) < 0:
+                    extra_headers["X-RateLimit-Remaining"] = "0"
+                    extra_headers["Retry-After"] = str(
+                        max(0, int(extra_headers["X-RateLimit-Reset"]) - int(time.time()))
+                    )
+                    return 429, _error_body(429, "Too many requests."), extra_headers
+            fault = self._next_fault(method, path)
+        if fault is not None:
+            if fault == 429:
+                extra_headers["Retry-After"] = str(self.retry_after)
+            return fault, _error_body(fault, "Injected fault."), extra_headers
+        if not path.startswith("/api/"):
+            return 404, _error_body(404, "Not found."), extra_headers
+        route_path = path[len("/api"):]
+        for route_method, pattern, name in _routes:
+            if route_method != method:
+                continue
+            match = pattern.fullmatch(route_path)
+            if match is not None:
+                break
+        else:
+            if any(pattern.fullmatch(route_path) for _, pattern, _ in _routes):
+                return 405, _error_body(405, "Method not allowed."), extra_headers
+            return 404, _error_body(404, "Not found."), extra_headers
+        if name.startswith(("deposit", "bucket")) and not _token(query, headers):
+            return 401, _error_body(401, "The server could not verify that you are authorized."), extra_headers
+        try:
+            with self._lock:
+                status_code, result, headers_ = getattr(self, f"_{name}")(
+                    *[unquote(group) for group in match.groups()], query=query, body=body
+                )
+        except _HTTPError as error:
+            return error.status_code, _error_body(error.status_code, error.message, error.errors), extra_headers
+        extra_headers.update(headers_ or {})
+        return status_code, result, extra_headers
+
+    def _rate_limit_headers(self) -> dict:
+        now = time.time()
+        if now - self._window_start >= self.rate_limit_period:
+            self._window_start = now
+            self._window_count = 0
+        self._window_count += 1
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(self.rate_limit - self._window_count),
+            "X-RateLimit-Reset": str(int(self._window_start + self.rate_limit_period)),
+        }
+
+    def _next_fault(self, method: str = None, path: str = None) -> (int | None):
+        for fault in self._faults:
+            if fault["method"] is not None and fault["method"].upper() != method:
+                continue
+            if fault["path"] is not None and not path.startswith("/api" + fault["path"]):
+                continue
+            fault["count"] -= 1
+            if fault["count"] <= 0:
+                self._faults.remove(fault)
+            return fault["status_code"]
+        if self.fault_rate > 0 and self._random.random() < self.fault_rate:
+            return self._random.choice(self.fault_status_codes)
+        return None
+
+    def _delay(self) -> float:
+        if isinstance(self.latency, (tuple, list)):
+            with self._lock:
+                return self._random.uniform(*self.latency)
+        return self.latency
+
+    # Data model
+
+    def _new_id(self) -> int:
+        id_ = self._next_id
+        self._next_id += 1
+        return id_
+
+    def _new_deposition(self, conceptrecid: int = None) -> dict:
+        id_ = self._new_id()
+        if conceptrecid is None:
+            conceptrecid = self._new_id()
+        bucket_id = str(uuid.uuid4())
+        self._buckets[bucket_id] = {"objects": {}, "locked": False}
+        now = _now()
+        deposition = {
+            "id": id_,
+            "conceptrecid": conceptrecid,
+            "created": now,
+            "modified": now,
+            "owner": 1,
+            "state": "unsubmitted",
+            "submitted": False,
+            "metadata": {
+                "access_right": "open",
+                "prereserve_doi": {"doi": f"10.5281/zenodo.{id_}", "recid": id_},
+            },
+            "bucket": bucket_id,
+            "latest_draft": id_,
+        }
+        self._depositions[id_] = deposition
+        return deposition
+
+    def _deposition(self, id_: str = None) -> dict:
+        deposition = self._depositions.get(int(id_))
+        if deposition is None:
+            raise _HTTPError(404, "PID does not exist.")
+        return deposition
+
+    def _deposition_json(self, deposition: dict = None) -> dict:
+        api = self.base_url
+        id_ = deposition["id"]
+        deposit_url = f"{api}/deposit/depositions/{id_}"
+        bucket = self._buckets[deposition["bucket"]]
+        published = id_ in self._records
+        data = {
+            "created": deposition["created"],
+            "modified": deposition["modified"],
+            "id": id_,
+            "conceptrecid": str(deposition["conceptrecid"]),
+            "doi": f"10.5281/zenodo.{id_}" if published else "",
+            "doi_url": f"https://doi.org/10.5281/zenodo.{id_}" if published else "",
+            "files": [
+                self._deposition_file_json(deposition, key, obj)
+                for key, obj in bucket["objects"].items()
+            ],
+            "links": {
+                "self": deposit_url,
+                "html": f"{self.url}/deposit/{id_}",
+                "badge": f"{self.url}/badge/doi/.svg",
+                "files": deposit_url + "/files",
+                "bucket": f"{api}/files/{deposition['bucket']}",
+                "latest_draft": f"{api}/deposit/depositions/{deposition['latest_draft']}",
+                "latest_draft_html": f"{self.url}/deposit/{deposition['latest_draft']}",
+                "publish": deposit_url + "/actions/publish",
+                "edit": deposit_url + "/actions/edit",
+                "discard": deposit_url + "/actions/discard",
+                "newversion": deposit_url + "/actions/newversion",
+                "registerconceptdoi": deposit_url + "/actions/registerconceptdoi",
+            },
+            "metadata": json.loads(json.dumps(deposition["metadata"])),
+            "owner": deposition["owner"],
+            "record_id": id_,
+            "state": deposition["state"],
+            "submitted": deposition["submitted"],
+            "title": deposition["metadata"].get("title", ""),
+        }
+        if published:
+            data["links"]["record"] = f"{api}/records/{id_}"
+            data["links"]["latest"] = f"{api}/records/{self._latest_record_id(deposition['conceptrecid'])}"
+            data["links"]["doi"] = data["doi_url"]
+        return data
+
+    def _deposition_file_json(self, deposition: dict = None, key: str = None, obj: dict = None) -> dict:
+        api = self.base_url
+        return {
+            "id": obj["id"],
+            "filename": key,
+            "filesize": len(obj["content"]),
+            "checksum": obj["checksum"],
+            "links": {
+                "self": f"{api}/deposit/depositions/{deposition['id']}/files/{obj['id']}",
+                "download": f"{api}/files/{deposition['bucket']}/{quote(key)}",
+            },
+        }
+
+    def _bucket_object_json(self, bucket_id: str = None, key: str = None, obj: dict = None) -> dict:
+        object_url = f"{self.base_url}/files/{bucket_id}/{quote(key)}"
+        return {
+            "key": key,
+            "mimetype": "application/octet-stream",
+            "checksum": f"md5:{obj['checksum']}",
+            "version_id": obj["version_id"],
+            "size": len(obj["content"]),
+            "created": obj["created"],
+            "updated": obj["created"],
+            "links": {
+                "self": object_url,
+                "version": f"{object_url}?versionId={obj['version_id']}",
+                "uploads": f"{object_url}?uploads",
+            },
+            "is_head": True,
+            "delete_marker": False,
+        }
+
+    def _latest_record_id(self, conceptrecid: int = None) -> int:
+        return self._latest_versions.get(conceptrecid)
+
+    def _record_json(self, record: dict = None) -> dict:
+        api = self.base_url
+        id_ = record["id"]
+        latest = self._latest_record_id(record["conceptrecid"]) or id_
+        # The record metadata is replaced (never modified in place) when the
+        # record is published, hence it can be shared with the response.
+        metadata = record["metadata"]
+        return {
+            "created": record["created"],
+            "updated": record["updated"],
+            "modified": record["updated"],
+            "id": id_,
+            "recid": str(id_),
+            "conceptrecid": str(record["conceptrecid"]),
+            "doi": f"10.5281/zenodo.{id_}",
+            "conceptdoi": f"10.5281/zenodo.{record['conceptrecid']}",
+            "doi_url": f"https://doi.org/10.5281/zenodo.{id_}",
+            "metadata": metadata,
+            "title": metadata.get("title", ""),
+            "links": {
+                "self": f"{api}/records/{id_}",
+                "html": f"{self.url}/records/{id_}",
+                "doi": f"https://doi.org/10.5281/zenodo.{id_}",
+                "files": f"{api}/records/{id_}/files",
+                "latest": f"{api}/records/{latest}",
+                "latest_html": f"{self.url}/records/{latest}",
+            },
+            "files": [
+                {
+                    "id": obj["id"],
+                    "key": key,
+                    "size": len(obj["content"]),
+                    "checksum": f"md5:{obj['checksum']}",
+                    "links": {"self": f"{api}/records/{id_}/files/{quote(key)}/content"},
+                }
+                for key, obj in record["files"].items()
+            ],
+            "owners": [1],
+            "revision": record["revision"],
+            "state": "done",
+            "submitted": True,
+            "status": "published",
+            "stats": {"downloads": record["downloads"], "views": record["views"]},
+        }
+
+    def _publish(self, deposition: dict = None) -> None:
+        missing = [
+            {"field": f"metadata.{field}", "message": "Missing data for required field."}
+            for field in required_metadata
+            if not deposition["metadata"].get(field)
+        ]
+        if missing:
+            raise _HTTPError(400, "Validation error.", missing)
+        now = _now()
+        deposition["metadata"].setdefault("publication_date", now[:10])
+        deposition["metadata"]["doi"] = f"10.5281/zenodo.{deposition['id']}"
+        deposition["state"] = "done"
+        deposition["submitted"] = True
+        deposition["modified"] = now
+        bucket = self._buckets[deposition["bucket"]]
+        bucket["locked"] = True
+        record = self._records.get(deposition["id"])
+        if record is None:
+            record = self._records[deposition["id"]] = {
+                "id": deposition["id"],
+                "conceptrecid": deposition["conceptrecid"],
+                "created": now,
+                "revision": 0,
+                "downloads": 0,
+                "views": 0,
+                "deleted": False,
+            }
+        record["metadata"] = json.loads(json.dumps(deposition["metadata"]))
+        record["files"] = dict(bucket["objects"])
+        record["updated"] = now
+        record["revision"] += 1
+        conceptrecid = deposition["conceptrecid"]
+        self._latest_versions[conceptrecid] = max(
+            deposition["id"], self._latest_versions.get(conceptrecid, 0)
+        )
+
+    # Deposition endpoints
+
+    def _create_deposition(self, query: dict = None, body: bytes = None):
+        payload = _json_body(body) or {}
+        deposition = self._new_deposition()
+        deposition["metadata"].update(payload.get("metadata", {}))
+        return 201, self._deposition_json(deposition), None
+
+    def _list_depositions(self, query: dict = None, body: bytes = None):
+        depositions = list(self._depositions.values())
+        status = query.get("status")
+        if status == "draft":
+            depositions = [d for d in depositions if d["state"] != "done"]
+        elif status == "published":
+            depositions = [d for d in depositions if d["id"] in self._records]
+        q = query.get("q")
+        if q:
+            depositions = [d for d in depositions if _match_query(self._deposition_json(d), q)]
+        depositions = _sort(depositions, query.get("sort"), key="created")
+        page, size = self._page(query, default_size=10)
+        return 200, [self._deposition_json(d) for d in depositions[(page - 1) * size:page * size]], None
+
+    def _retrieve_deposition(self, id_: str = None, query: dict = None, body: bytes = None):
+        return 200, self._deposition_json(self._deposition(id_)), None
+
+    def _update_deposition(self, id_: str = None, query: dict = None, body: bytes = None):
+        deposition = self._deposition(id_)
+        if deposition["state"] == "done":
+            raise _HTTPError(400, "The deposition is published. Please use the 'edit' action first.")
+        payload = _json_body(body)
+        if not isinstance(payload, dict) or not isinstance(payload.get("metadata"), dict):
+            raise _HTTPError(400, "Validation error.", [{"field": "metadata", "message": "Missing data."}])
+        prereserve_doi = deposition["metadata"]["prereserve_doi"]
+        deposition["metadata"] = dict(payload["metadata"])
+        deposition["metadata"]["prereserve_doi"] = prereserve_doi
+        deposition["modified"] = _now()
+        return 200, self._deposition_json(deposition), None
+
+    def _delete_deposition(self, id_: str = None, query: dict = None, body: bytes = None):
+        deposition = self._deposition(id_)
+        if deposition["id"] in self._records:
+            raise _HTTPError(403, "Published depositions cannot be deleted.")
+        del self._depositions[deposition["id"]]
+        del self._buckets[deposition["bucket"]]
+        return 204, b"", None
+
+    # Deposition files endpoints
+
+    def _deposition_file(self, deposition: dict = None, file_id: str = None) -> tuple[str, dict]:
+        for key, obj in self._buckets[deposition["bucket"]]["objects"].items():
+            if obj["id"] == file_id:
+                return key, obj
+        raise _HTTPError(404, "File does not exist.")
+
+    def _list_deposition_files(self, id_: str = None, query: dict = None, body: bytes = None):
+        deposition = self._deposition(id_)
+        objects = self._buckets[deposition["bucket"]]["objects"]
+        return 200, [self._deposition_file_json(deposition, key, obj) for key, obj in objects.items()], None
+
+    def _sort_deposition_files(self, id_: str = None, query: dict = None, body: bytes = None):
+        deposition = self._deposition(id_)
+        bucket = self._buckets[deposition["bucket"]]
+        payload = _json_body(body)
+        if not isinstance(payload, list):
+            raise _HTTPError(400, "The request body must be a list of file IDs.")
+        order = [item.get("id") for item in payload]
+        keys = {obj["id"]: key for key, obj in bucket["objects"].items()}
+        if sorted(order) != sorted(keys):
+            raise _HTTPError(400, "The list of file IDs does not match the deposition files.")
+        bucket["objects"] = {keys[fid]: bucket["objects"][keys[fid]] for fid in order}
+        return self._list_deposition_files(id_, query=query)
+
+    def _retrieve_deposition_file(self, id_: str = None, file_id: str = None, query: dict = None, body: bytes = None):
+        deposition = self._deposition(id_)
+        key, obj = self._deposition_file(deposition, file_id)
+        return 200, self._deposition_file_json(deposition, key, obj), None
+
+    def _update_deposition_file(self, id_: str = None, file_id: str = None, query: dict = None, body: bytes = None):
+        deposition = self._deposition(id_)
+        bucket = self._check_unlocked(deposition["bucket"])
+        key, obj = self._deposition_file(deposition, file_id)
+        payload = _json_body(body) or {}
+        new_key = payload.get("filename") or payload.get("name")
+        if not new_key:
+            raise _HTTPError(400, "The new 'filename' is missing.")
+        bucket["objects"] = {
+            (new_key if k == key else k): o for k, o in bucket["objects"].items()
+        }
+        return 200, self._deposition_file_json(deposition, new_key, obj), None
+
+    def _delete_deposition_file(self, id_: str = None, file_id: str = None, query: dict = None, body: bytes = None):
+        deposition = self._deposition(id_)
+        bucket = self._check_unlocked(deposition["bucket"])
+        key, _ = self._deposition_file(deposition, file_id)
+        del bucket["objects"][key]
+        return 204, b"", None
+
+    # Bucket endpoints
+
+    def _bucket(self, bucket_id: str = None) -> dict:
+        bucket = self._buckets.get(bucket_id)
+        if bucket is None:
+            raise _HTTPError(404, "Bucket does not exist.")
+        return bucket
+
+    def _check_unlocked(self, bucket_id: str = None) -> dict:
+        bucket = self._bucket(bucket_id)
+        if bucket["locked"]:
+            raise _HTTPError(403, "The bucket is locked.")
+        return bucket
+
+    def _list_bucket(self, bucket_id: str = None, query: dict = None, body: bytes = None):
+        bucket = self._bucket(bucket_id)
+        contents = [self._bucket_object_json(bucket_id, key, obj) for key, obj in bucket["objects"].items()]
+        return 200, {"id": bucket_id, "locked": bucket["locked"], "contents": contents}, None
+
+    def _upload_bucket_file(self, bucket_id: str = None, key: str = None, query: dict = None, body: bytes = None):
+        bucket = self._check_unlocked(bucket_id)
+        obj = _file_object(body)
+        bucket["objects"][key] = obj
+        return 201, self._bucket_object_json(bucket_id, key, obj), None
+
+    def _download_bucket_file(self, bucket_id: str = None, key: str = None, query: dict = None, body: bytes = None):
+        obj = self._bucket(bucket_id)["objects"].get(key)
+        if obj is None:
+            raise _HTTPError(404, "Object does not exist.")
+        return 200, obj["content"], {"Content-Type": "application/octet-stream"}
+
+    def _delete_bucket_file(self, bucket_id: str = None, key: str = None, query: dict = None, body: bytes = None):
+        bucket = self._check_unlocked(bucket_id)
+        if bucket["objects"].pop(key, None) is None:
+            raise _HTTPError(404, "Object does not exist.")
+        return 204, b"", None
+
+    # Deposition actions endpoints
+
+    def _deposition_action(self, id_: str = None, action: str = None, query: dict = None, body: bytes = None):
+        deposition = self._deposition(id_)
+        published = deposition["id"] in self._records
+        if action == "publish":
+            if deposition["state"] == "done":
+                raise _HTTPError(400, "The deposition is already published.")
+            self._publish(deposition)
+            return 202, self._deposition_json(deposition), None
+        if not published:
+            raise _HTTPError(400, f"The '{action}' action requires a published deposition.")
+        if action == "edit":
+            deposition["state"] = "inprogress"
+            deposition["submitted"] = True
+        elif action == "discard":
+            if deposition["state"] != "inprogress":
+                raise _HTTPError(400, "The deposition is not being edited.")
+            deposition["metadata"] = json.loads(json.dumps(self._records[deposition["id"]]["metadata"]))
+            deposition["state"] = "done"
+        elif action == "newversion":
+            draft = self._new_deposition(conceptrecid=deposition["conceptrecid"])
+            metadata = json.loads(json.dumps(deposition["metadata"]))
+            for field in ["doi", "publication_date", "prereserve_doi"]:
+                metadata.pop(field, None)
+            draft["metadata"].update(metadata)
+            source = self._buckets[deposition["bucket"]]["objects"]
+            self._buckets[draft["bucket"]]["objects"] = dict(source)
+            deposition["latest_draft"] = draft["id"]
+            return 201, self._deposition_json(deposition), None
+        deposition["modified"] = _now()
+        return 201, self._deposition_json(deposition), None
+
+    # Records endpoints
+
+    def _record(self, id_: str = None) -> dict:
+        record = self._records.get(int(id_))
+        if record is None:
+            raise _HTTPError(404, "PID does not exist.")
+        if record["deleted"]:
+            raise _HTTPError(410, "PID has been deleted.")
+        return record
+
+    def _list_records(self, query: dict = None, body: bytes = None):
+        # Filter and sort the stored records; only the requested page is
+        # rendered into JSON documents.
+        records = [r for r in self._records.values() if not r["deleted"]]
+        if query.get("all_versions") not in ["1", "true", "True"]:
+            latest = set(self._latest_versions.values())
+            records = [r for r in records if r["id"] in latest]
+        communities = query.get("communities")
+        if communities:
+            records = [
+                r
+                for r in records
+                if communities in [c.get("identifier") for c in r["metadata"].get("communities", [])]
+            ]
+        for param, field in [("type", "upload_type"), ("subtype", "publication_type")]:
+            if query.get(param):
+                records = [r for r in records if r["metadata"].get(field) == query[param]]
+        q = query.get("q")
+        if q:
+            records = [r for r in records if _match_query(_record_view(r), q)]
+        return self._search_result(records, query, path="/records", render=self._record_json)
+
+    def _retrieve_record(self, id_: str = None, query: dict = None, body: bytes = None):
+        record = self._record(id_)
+        record["views"] += 1
+        return 200, self._record_json(record), None
+
+    def _download_record_file(self, id_: str = None, key: str = None, query: dict = None, body: bytes = None):
+        record = self._record(id_)
+        obj = record["files"].get(key)
+        if obj is None:
+            raise _HTTPError(404, "Object does not exist.")
+        record["downloads"] += 1
+        return 200, obj["content"], {"Content-Type": "application/octet-stream"}
+
+    # Resources endpoints
+
+    def _resource_json(self, resource: str = None, item: dict = None) -> dict:
+        return {
+            "id": item["id"],
+            "created": "2020-01-01T00:00:00+00:00",
+            "updated": "2020-01-01T00:00:00+00:00",
+            "metadata": dict(item),
+            "title": item.get("title", ""),
+            "links": {"self": f"{self.base_url}/{resource}/{quote(item['id'], safe='')}"},
+        }
+
+    def _list_resources(self, resource: str = None, query: dict = None, body: bytes = None):
+        results = [self._resource_json(resource, item) for item in self._resources[resource].values()]
+        q = query.get("q")
+        if q:
+            results = [data for data in results if _match_query(data, q)]
+        return self._search_result(results, query, path=f"/{resource}", render=lambda data: data)
+
+    def _retrieve_resource(self, resource: str = None, id_: str = None, query: dict = None, body: bytes = None):
+        item = self._resources[resource].get(id_)
+        if item is None:
+            raise _HTTPError(404, "PID does not exist.")
+        return 200, self._resource_json(resource, item), None
+
+    # Search helpers
+
+    def _page(self, query: dict = None, default_size: int = 10) -> tuple[int, int]:
+        try:
+            page = int(query.get("page", 1))
+            size = int(query.get("size", default_size))
+        except ValueError:
+            raise _HTTPError(400, "The 'page' and 'size' arguments must be integers.")
+        if page < 1 or size < 1:
+            raise _HTTPError(400, "The 'page' and 'size' arguments must be positive.")
+        if page * size > self.max_result_window:
+            raise _HTTPError(400, "Maximum number of results have been reached.")
+        return page, size
+
+    def _search_result(self, results: list = None, query: dict = None, path: str = None, render=None):
+        results = _sort(results, query.get("sort"), key="created")
+        page, size = self._page(query)
+        total = len(results)
+        params = {k: v for k, v in query.items() if k != "access_token"}
+        links = {"self": self._search_url(path, params, page, size)}
+        if page > 1:
+            links["prev"] = self._search_url(path, params, page - 1, size)
+        if page * size < total and (page + 1) * size <= self.max_result_window:
+            links["next"] = self._search_url(path, params, page + 1, size)
+        hits = [render(data) for data in results[(page - 1) * size:page * size]]
+        return 200, {"aggregations": {}, "hits": {"hits": hits, "total": total}, "links": links}, None
+
+    def _search_url(self, path: str = None, params: dict = None, page: int = None, size: int = None) -> str:
+        params = dict(params, page=str(page), size=str(size))
+        return self.base_url + path + "?" + "&".join(f"{k}={quote(str(v))}" for k, v in params.items())
+
+
+class _FakeZenodoHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 (keep-alive) request handler of the fake Zenodo server"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeZenodo"
+    # Avoid the delayed ACK stalls of small (keep-alive) responses
+    disable_nagle_algorithm = True
+    fake = None
+    _chunk_size = 64 * 1024
+
+    def log_message(self, format, *args) -> None:
+        logger.debug(format % args)
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                chunks.append(self._read(size))
+                self.rfile.readline()
+            return b"".join(chunks)
+        return self._read(int(self.headers.get("Content-Length") or 0))
+
+    def _read(self, size: int = None) -> bytes:
+        chunks = []
+        while size > 0:
+            chunk = self.rfile.read(min(size, self._chunk_size))
+            if not chunk:
+                break
+            self._throttle(len(chunk))
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def _throttle(self, size: int = None) -> None:
+        if self.fake.bandwidth is not None:
+            time.sleep(size / self.fake.bandwidth)
+
+    def _dispatch(self) -> None:
+        self.fake._enter()
+        try:
+            self._respond()
+        finally:
+            self.fake._exit()
+
+    def _respond(self) -> None:
+        body = self._read_body()
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        delay = self.fake._delay()
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            status_code, result, headers = self.fake._handle(
+                self.command, url.path, query=query, headers=self.headers, body=body
+            )
+        except Exception as error:
+            logger.exception("The fake Zenodo server has failed.")
+            status_code, result, headers = 500, _error_body(500, repr(error)), {}
+        if isinstance(result, bytes):
+            payload = result
+            headers.setdefault("Content-Type", "application/octet-stream")
+        else:
+            payload = json.dumps(result).encode()
+            headers.setdefault("Content-Type", "application/json")
+            if self.command == "GET" and status_code == 200:
+                headers.update(_validators(payload, result))
+                if _not_modified(self.headers, headers):
+                    status_code, payload = 304, b""
+        self.send_response(status_code)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        for start in range(0, len(payload), self._chunk_size):
+            chunk = payload[start:start + self._chunk_size]
+            self.wfile.write(chunk)
+            self._throttle(len(chunk))
+
+    do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+
+_routes = [
+    (method, re.compile(pattern), name)
+    for method, pattern, name in [
+        ("POST", r"/deposit/depositions", "create_deposition"),
+        ("GET", r"/deposit/depositions", "list_depositions"),
+        ("GET", r"/deposit/depositions/(\d+)", "retrieve_deposition"),
+        ("PUT", r"/deposit/depositions/(\d+)", "update_deposition"),
+        ("DELETE", r"/deposit/depositions/(\d+)", "delete_deposition"),
+        ("GET", r"/deposit/depositions/(\d+)/files", "list_deposition_files"),
+        ("PUT", r"/deposit/depositions/(\d+)/files", "sort_deposition_files"),
+        ("GET", r"/deposit/depositions/(\d+)/files/([^/]+)", "retrieve_deposition_file"),
+        ("PUT", r"/deposit/depositions/(\d+)/files/([^/]+)", "update_deposition_file"),
+        ("DELETE", r"/deposit/depositions/(\d+)/files/([^/]+)", "delete_deposition_file"),
+        ("POST", r"/deposit/depositions/(\d+)/actions/(publish|edit|discard|newversion)", "deposition_action"),
+        ("GET", r"/files/([^/]+)", "list_bucket"),
+        ("PUT", r"/files/([^/]+)/(.+)", "upload_bucket_file"),
+        ("GET", r"/files/([^/]+)/(.+)", "download_bucket_file"),
+        ("DELETE", r"/files/([^/]+)/(.+)", "delete_bucket_file"),
+        ("GET", r"/records/?", "list_records"),
+        ("GET", r"/records/(\d+)", "retrieve_record"),
+        ("GET", r"/records/(\d+)/files/(.+)/content", "download_record_file"),
+        ("GET", r"/(licenses|communities|grants|funders)/?", "list_resources"),
+        ("GET", r"/(licenses|communities|grants|funders)/([^/]+)", "retrieve_resource"),
+    ]
+]
+
+
+def _record_view(record: dict = None) -> dict:
+    """The searchable fields of a stored record"""
+    return {
+        "id": record["id"],
+        "recid": str(record["id"]),
+        "conceptrecid": str(record["conceptrecid"]),
+        "doi": f"10.5281/zenodo.{record['id']}",
+        "created": record["created"],
+        "updated": record["updated"],
+        "title": record["metadata"].get("title", ""),
+        "metadata": record["metadata"],
+    }
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _file_object(content: bytes = None) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "version_id": str(uuid.uuid4()),
+        "content": content,
+        "checksum": hashlib.md5(content).hexdigest(),
+        "created": _now(),
+    }
+
+
+def _token(query: dict = None, headers=None) -> (str | None):
+    token = query.get("access_token")
+    if not token:
+        authorization = headers.get("Authorization", "")
+        if authorization.startswith("Bearer "):
+            token = authorization[len("Bearer "):].strip()
+    return token or None
+
+
+def _validators(payload: bytes = None, result=None) -> dict:
+    """ETag and Last-Modified headers of a JSON response"""
+    if isinstance(result, dict) and "stats" in result:
+        # As on Zenodo, the usage statistics do not change the revision of a record
+        payload = json.dumps({key: value for key, value in result.items() if key != "stats"}).encode()
+    headers = {"ETag": '"' + hashlib.md5(payload).hexdigest() + '"'}
+    if isinstance(result, dict):
+        modified = result.get("updated") or result.get("modified")
+        if modified:
+            headers["Last-Modified"] = format_datetime(
+                datetime.fromisoformat(modified).astimezone(timezone.utc), usegmt=True
+            )
+    return headers
+
+
+def _not_modified(request_headers=None, headers: dict = None) -> bool:
+    """Evaluate the conditional request headers (If-None-Match takes precedence)"""
+    if_none_match = request_headers.get("If-None-Match")
+    if if_none_match is not None:
+        return headers["ETag"] in [tag.strip() for tag in if_none_match.split(",")]
+    if_modified_since = request_headers.get("If-Modified-Since")
+    if if_modified_since is not None and "Last-Modified" in headers:
+        try:
+            return parsedate_to_datetime(headers["Last-Modified"]) <= parsedate_to_datetime(
+                if_modified_since
+            )
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _error_body(status_code: int = None, message: str = None, errors: list = None) -> dict:
+    body = {"status": status_code, "message": message}
+    if errors:
+        body["errors"] = errors
+    return body
+
+
+def _json_body(body: bytes = None):
+    if not body:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise _HTTPError(400, "The request body is not valid JSON.")
+
+
+def _sort(results: list = None, sort: str = None, key: str = None) -> list:
+    """Sort the search results: "mostrecent" (ascending) or "-mostrecent"
+    (descending) by ``key``, "bestmatch" (default) by ID"""
+    if sort == "mostrecent":
+        return sorted(results, key=lambda data: (data[key], data["id"]))
+    elif sort == "-mostrecent":
+        return sorted(results, key=lambda data: (data[key], data["id"]), reverse=True)
+    return sorted(results, key=lambda data: str(data["id"]) if isinstance(data["id"], str) else data["id"])
+
+
+# A search term: either field:value (value being a word, a quoted phrase,
+# a parenthesized OR-list or a range) or free text, possibly wrapped in
+# grouping parentheses.
+_term_regex = re.compile(
+    r'\(*(?:(?P<field>[\w.]+):(?P<value>\([^)]*\)|[\[{][^\]}]*[\]}]|"[^"]*"|[^\s)]+)'
+    r'|(?P<text>"[^"]*"|[^\s()]+))\)*'
+)
+
+
+def _match_query(data: dict = None, query: str = None) -> bool:
+    """Minimal subset of the Elasticsearch query string syntax used by Zenodo.
+
+    All the terms must match (implicit AND). Field terms compare the value of
+    a (dotted) field looked up in the document or its metadata; free text is
+    searched in the title and description. Boolean operators other than the
+    ``OR`` inside parentheses are ignored."""
+    for match in _term_regex.finditer(query):
+        if match.group("field"):
+            values = _field_values(data, match.group("field"))
+            if not _match_value(values, match.group("value")):
+                return False
+        else:
+            text = match.group("text").strip('"').lower()
+            if text in ["and", "or", "not", "*", ""]:
+                continue
+            haystack = " ".join(
+                str(value) for value in [data.get("title"), data.get("metadata", {}).get("description")]
+            ).lower()
+            if text not in haystack:
+                return False
+    return True
+
+
+def _field_values(data: dict = None, field: str = None) -> list:
+    values = []
+    for root in [data, data.get("metadata", {})]:
+        value = root
+        for part in field.split("."):
+            if isinstance(value, dict) and part in value:
+                value = value[part]
+            else:
+                value = None
+                break
+        if value is not None:
+            values.extend(value if isinstance(value, list) else [value])
+    flattened = []
+    for value in values:
+        if isinstance(value, dict):
+            flattened.extend(str(v) for k, v in value.items() if k in ["id", "identifier", "name", "type"])
+        else:
+            flattened.append(str(value))
+    return flattened
+
+
+def _match_value(values: list = None, value: str = None) -> bool:
+    if value.startswith("("):
+        options = [option.strip().strip('"') for option in value[1:-1].split(" OR ")]
+        return any(v == option for v in values for option in options)
+    if value[0] in "[{":
+        low, _, high = value[1:-1].partition(" TO ")
+        low, high = low.strip(), high.strip()
+        for v in values:
+            # Dates are compared truncated to the length of the bounds so that
+            # e.g., [2020-01-01 TO 2020-12-31] includes the whole last day
+            u = v[: len(low)] if _key(low)[0] else v
+            w = v[: len(high)] if _key(high)[0] and high != "*" else v
+            above = low == "*" or (_key(u) >= _key(low) if value[0] == "[" else _key(u) > _key(low))
+            below = high == "*" or (_key(w) <= _key(high) if value[-1] == "]" else _key(w) < _key(high))
+            if above and below:
+                return True
+        return False
+    value = value.strip('"')
+    return any(v == value or v.lower() == value.lower() for v in values)
+
+
+def _key(value: str = None):
+    """Compare the numbers numerically and everything else as strings"""
+    try:
+        return (0, float(value), "")
+    except ValueError:
+        return (1, 0.0, value)
@@ -0,0 +1,21 @@
+"""
+Shared fixtures for the zenopy test suite.
+"""
+
+import pytest
+import zenopy
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """A throwaway config file so that the tests never touch ~/.zenodorc"""
+    path = tmp_path / "zenodorc"
+    path.write_text("[ZENODO]\ntoken = zenodo-token\n\n[SANDBOX]\ntoken = sandbox-token\n")
+    return path
+
+
+@pytest.fixture
+def client(config_file):
+    cli = zenopy.Zenodo(config_file_path=str(config_file), rate_limit=None)
+    yield cli
+    cli.close()
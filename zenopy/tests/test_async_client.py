@@ -0,0 +1,97 @@
+"""
+Unit tests for the asynchronous zenopy client.
+"""
+
+import asyncio
+import pytest
+import zenopy
+
+httpx = pytest.importorskip("httpx")
+
+BASE_URL = "https://zenodo.org/api"
+
+
+def _record(idx):
+    return {
+        "id": idx,
+        "metadata": {"title": f"record {idx}"},
+        "links": {"self": f"{BASE_URL}/records/{idx}"},
+    }
+
+
+def _handler(request):
+    path = request.url.path
+    if request.method == "GET" and path.startswith("/api/records/"):
+        return httpx.Response(200, json=_record(int(path.rsplit("/", 1)[1])))
+    if request.method == "GET" and path == "/api/records":
+        hits = [_record(idx) for idx in range(int(request.url.params["size"]))]
+        return httpx.Response(200, json={"hits": {"hits": hits, "total": len(hits)}})
+    if request.method == "POST" and path == "/api/deposit/depositions":
+        return httpx.Response(201, json=_record(42))
+    if request.method == "PUT" and path.startswith("/api/files/"):
+        body = request.read()
+        return httpx.Response(
+            201, json={"key": path.rsplit("/", 1)[1], "size": len(body), "links": {"self": str(request.url)}}
+        )
+    return httpx.Response(404, json={"status": 404})
+
+
+@pytest.fixture
+def async_client(config_file):
+    cli = zenopy.AsyncZenodo(config_file_path=str(config_file), rate_limit=None)
+    mock = httpx.MockTransport(_handler)
+    cli._transport._api_client = httpx.AsyncClient(transport=mock)
+    cli._transport._files_client = httpx.AsyncClient(transport=mock)
+    return cli
+
+
+def test_async_client_shares_config(async_client):
+    assert async_client.token == "zenodo-token"
+    assert async_client._params["access_token"] == "zenodo-token"
+
+
+def test_async_retrieve_records_concurrently(async_client):
+    async def main():
+        async with async_client as cli:
+            rec_obj = cli.init_records()
+            return await asyncio.gather(*[rec_obj.retrieve_record(id_=idx) for idx in range(50)])
+
+    records = asyncio.run(main())
+    assert [rec._id for rec in records] == list(range(50))
+    assert all(isinstance(rec, zenopy.record.Record) for rec in records)
+
+
+def test_async_list_records_and_create_deposition(async_client):
+    async def main():
+        async with async_client as cli:
+            records = await cli.init_records().list_records(content_type="json", size=3)
+            depo = await cli.init_deposition().create_deposition()
+            return records, depo
+
+    records, depo = asyncio.run(main())
+    assert len(records) == 3
+    assert depo._id == 42
+
+
+def test_async_create_deposition_file(async_client, tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_bytes(b"x" * 2048)
+
+    async def main():
+        async with async_client as cli:
+            return await cli.init_deposition_file().create_deposition_file(
+                file_path=path, bucket_url=f"{BASE_URL}/files/bucket-id"
+            )
+
+    record = asyncio.run(main())
+    assert record["key"] == "data.txt"
+    assert record["size"] == 2048
+
+
+def test_async_errors_are_raised(async_client):
+    async def main():
+        async with async_client as cli:
+            await cli.init_resources(resource="licenses").retrieve_resource(id_="missing")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(main())
@@ -0,0 +1,125 @@
+"""
+Unit tests for the persistent (on-disk) record cache and the search result
+cache of the zenopy client.
+"""
+
+import multiprocessing
+import sqlite3
+import time
+import pytest
+from zenopy.cache import _PersistentCache, _search_key
+from zenopy.testing import FakeZenodo
+
+
+def _lookup(path, url, scope, queue):
+    cache = _PersistentCache(path, scope=scope)
+    entry = cache.lookup(url, "record")
+    queue.put(None if entry is None else bytes(entry[0]))
+
+
+def test_persistent_cache_shared_by_clients(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    with FakeZenodo() as server:
+        ids = [record["id"] for record in server.add_records(2)]
+        url = f"{server.base_url}/records/{ids[0]}"
+        worker = server.client(rate_limit=None, persistent_cache=path)
+        scope = worker.persistent_cache.scope
+        assert worker.init_records().retrieve_record(ids[0])["id"] == ids[0]
+        assert worker.init_resources("licenses").retrieve_resource("mit")["id"] == "mit"
+        worker.close()
+
+        other = server.client(rate_limit=None, cache_size=0, persistent_cache=path)
+        server.reset_counts()
+        assert other.init_records().retrieve_record(ids[0])["id"] == ids[0]
+        assert other.init_resources("licenses").retrieve_resource("mit")["id"] == "mit"
+        assert server.request_count() == 0
+        assert other.persistent_cache.info()["hits"] == 2
+
+        # Stale entries are revalidated with a conditional request
+        stale = server.client(
+            rate_limit=None, cache_size=0, persistent_cache=path, persistent_cache_ttl={"record": 0.0}
+        )
+        assert stale.init_records().retrieve_record(ids[0])["id"] == ids[0]
+        assert server.request_count("GET", "/records/{id}") == 1
+        # The depositions are not persisted by default
+        deposition = other.init_deposition().create_deposition()
+        other.init_deposition().retrieve_deposition(deposition["id"])
+        assert other.persistent_cache.info()["entries"] == 2
+        # The entries fetched with a token are not served to another one
+        stranger = server.client(token="other-token", rate_limit=None, cache_size=0, persistent_cache=path)
+        server.reset_counts()
+        assert stranger.init_records().retrieve_record(ids[0])["id"] == ids[0]
+        assert server.request_count("GET", "/records/{id}") == 1
+        other.close()
+        stale.close()
+        stranger.close()
+
+    queue = multiprocessing.get_context("spawn").Queue()
+    process = multiprocessing.get_context("spawn").Process(
+        target=_lookup, args=(path, url, scope, queue)
+    )
+    process.start()
+    assert b'"id"' in queue.get(timeout=60)
+    process.join()
+
+
+def test_persistent_cache_eviction_and_snapshot(tmp_path):
+    cache = _PersistentCache(tmp_path / "cache.sqlite", max_size=250)
+    for index in range(5):
+        cache.store(f"https://zenodo.org/api/records/{index}", "record", b"x" * 100, etag=f'"{index}"')
+    assert cache.info()["entries"] == 2
+    cache.store("https://zenodo.org/api/records/3", "record", b"x" * 50)
+    assert cache.info()["size"] == 150
+    assert cache.lookup("https://zenodo.org/api/records/0", "record") is None
+    assert cache.lookup("https://zenodo.org/api/records/4", "record")[3]
+
+    snapshot = tmp_path / "snapshot.sqlite"
+    cache.save_snapshot(snapshot)
+    warm = _PersistentCache(tmp_path / "warm.sqlite")
+    assert warm.load_snapshot(snapshot) == 2
+    assert warm.load_snapshot(snapshot) == 0
+    assert warm.lookup("https://zenodo.org/api/records/4", "record")[1] == '"4"'
+    with pytest.raises(ValueError):
+        _PersistentCache(tmp_path / "other.sqlite", ttl={"draft": 10})
+    # A snapshot with another schema is rejected
+    connection = sqlite3.connect(snapshot)
+    connection.execute("PRAGMA user_version = 1")
+    connection.close()
+    with pytest.raises(ValueError):
+        warm.load_snapshot(snapshot)
+    assert warm.info()["entries"] == 2
+
+
+def test_search_key_is_canonical():
+    url = "https://zenodo.org/api/records"
+    key = _search_key(url, {"q": "zenopy  ", "size": 10, "access_token": "a"}, {"Content-Type": "json"})
+    assert key == _search_key(url + "/", {"page": 1, "q": " zenopy", "sort": "bestmatch"}, {"Content-Type": "json"})
+    assert _search_key(url, {"all_versions": True}) == _search_key(url, {"all_versions": 1})
+    assert key != _search_key(url, {"q": "zenopy", "size": 20}, {"Content-Type": "json"})
+
+
+def test_search_cache_stale_while_revalidate():
+    with FakeZenodo() as server:
+        server.add_records(3)
+        cli = server.client(rate_limit=None, search_cache_size=2, search_cache_ttl=0.2, search_cache_stale_ttl=5)
+        records = cli.init_records()
+        search = dict(content_type="json", status="published", size=10)
+        assert len(records.list_records(**search)) == 3
+        server.reset_counts()
+        assert len(records.list_records(query="", sort="bestmatch", page=1, **search)) == 3
+        assert server.request_count("GET", "/records") == 0
+        server.add_records(1)
+        time.sleep(0.25)
+        assert len(records.list_records(**search)) == 3
+        deadline = time.monotonic() + 5
+        while cli._search_cache._refreshing and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(records.list_records(**search)) == 4
+        assert server.request_count("GET", "/records") == 1
+        info = cli.search_cache_info()
+        assert (info["hits"], info["stale_hits"], info["misses"]) == (2, 1, 1)
+        cli.clear_cache()
+        assert cli.search_cache_info()["entries"] == 0
+        cli.close()
+        with pytest.raises(RuntimeError):
+            server.client(rate_limit=None).search_cache_info()
@@ -0,0 +1,32 @@
+"""
+Unit tests for the JSON backends of zenopy.
+"""
+
+import pytest
+import zenopy
+from zenopy import codec
+
+
+@pytest.fixture
+def restore_backend():
+    name = codec.get_json_backend()
+    yield
+    codec.set_json_backend(name)
+
+
+@pytest.mark.parametrize("name", codec.json_backends)
+def test_json_backend(restore_backend, name):
+    try:
+        assert zenopy.set_json_backend(name) == name
+    except ImportError:
+        pytest.skip(f"{name} is not installed")
+    document = {"id": 1, "metadata": {"title": "Café", "creators": [{"name": "Doe, Jane"}]}}
+    assert codec.loads(codec.dumps(document)) == document
+    assert codec.loads('{"hits": []}') == {"hits": []}
+    assert zenopy.get_json_backend() == name
+
+
+def test_invalid_json_backend(restore_backend):
+    with pytest.raises(ValueError):
+        codec.set_json_backend("simplejson")
+    assert codec.set_json_backend("auto") in codec.json_backends
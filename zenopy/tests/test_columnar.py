@@ -0,0 +1,64 @@
+"""
+Unit tests for the columnar export of the zenopy record listings.
+"""
+
+from datetime import date, datetime, timezone
+import pytest
+from zenopy.columnar import RecordList, to_columns
+from zenopy.views import RecordView
+
+_records = [
+    {
+        "id": 3,
+        "conceptrecid": "2",
+        "doi": "10.5281/zenodo.3",
+        "created": "2023-05-01T10:00:00.000000+02:00",
+        "metadata": {
+            "title": "Dataset",
+            "upload_type": "dataset",
+            "publication_date": "2023-05-01",
+            "creators": [{"name": "Doe, Jane"}, {"name": "Roe, Richard"}],
+            "keywords": ["zenodo"],
+        },
+        "files": [{"key": "a.csv", "size": 10}, {"key": "b.csv", "size": 32}],
+        "stats": {"downloads": 7, "views": 12},
+    },
+    {"id": 5, "metadata": {}},
+]
+
+
+def test_to_columns():
+    columns = to_columns(_records)
+    assert columns["id"] == [3, 5]
+    assert columns["conceptrecid"] == [2, None]
+    assert columns["creators"] == ["Doe, Jane; Roe, Richard", ""]
+    assert columns["n_files"] == [2, 0] and columns["total_size"] == [42, 0]
+    assert columns["publication_date"] == [date(2023, 5, 1), None]
+    assert columns["created"][0] == datetime(2023, 5, 1, 8, tzinfo=timezone.utc)
+    assert columns["downloads"] == [7, None]
+
+    views = RecordList(RecordView(record, ["id", "creators", "files", "metadata.keywords"]) for record in _records)
+    columns = views.to_columns(["id", "n_creators", "total_size", "metadata.keywords"])
+    assert columns == {
+        "id": [3, 5],
+        "n_creators": [2, 0],
+        "total_size": [42, 0],
+        "metadata.keywords": [["zenodo"], None],
+    }
+
+
+def test_to_numpy():
+    np = pytest.importorskip("numpy")
+    table = RecordList(_records).to_numpy(["id", "total_size", "publication_date", "title"])
+    assert table["id"].tolist() == [3, 5]
+    assert table["total_size"].sum() == 42
+    assert np.isnat(table["publication_date"][1])
+
+
+def test_to_pandas_and_arrow(tmp_path):
+    pytest.importorskip("pandas")
+    frame = RecordList(_records).to_pandas()
+    assert frame["downloads"].isna().tolist() == [False, True]
+    pytest.importorskip("pyarrow")
+    RecordList(_records).to_parquet(tmp_path / "records.parquet")
+    assert RecordList(_records).to_arrow().num_rows == 2
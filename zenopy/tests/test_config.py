@@ -0,0 +1,57 @@
+"""
+Tests for the process-wide config file cache and the atomic config writes.
+"""
+
+import os
+import threading
+import zenopy
+
+
+def test_config_file_is_read_once(config_file):
+    cli1 = zenopy.Zenodo(config_file_path=str(config_file), rate_limit=None)
+    cli2 = zenopy.Zenodo(config_file_path=str(config_file), rate_limit=None)
+    assert cli1.config_obj is cli2.config_obj
+    assert cli1.token == "zenodo-token"
+
+
+def test_config_cache_invalidated_on_change(config_file):
+    cli = zenopy.Zenodo(config_file_path=str(config_file), rate_limit=None)
+    config_file.write_text("[ZENODO]\ntoken = new-token\n\n[SANDBOX]\n")
+    stat = config_file.stat()
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    fresh = zenopy.Zenodo(config_file_path=str(config_file), rate_limit=None)
+    assert fresh.token == "new-token"
+    assert cli.token == "zenodo-token"
+
+
+def test_write_token_does_not_leak_into_other_clients(config_file):
+    cli1 = zenopy.Zenodo(config_file_path=str(config_file), rate_limit=None)
+    cli2 = zenopy.Zenodo(config_file_path=str(config_file), rate_limit=None)
+    cli1.write_token(section="zenodo", key="extra", token="extra-token")
+    assert cli1.read_token("zenodo", "extra") == "extra-token"
+    assert not cli2.config_obj.has_option("ZENODO", "extra")
+
+
+def test_update_config_file_is_atomic(config_file):
+    config_file.chmod(0o600)
+    clients = [
+        zenopy.Zenodo(config_file_path=str(config_file), rate_limit=None)
+        for _ in range(8)
+    ]
+
+    def update(i, cli):
+        for j in range(10):
+            cli.write_token(section="sandbox", key=f"token{i}", token=f"t{i}-{j}", force_rewrite=True)
+            cli.update_config_file()
+
+    threads = [threading.Thread(target=update, args=(i, cli)) for i, cli in enumerate(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reader = zenopy.Zenodo(config_file_path=str(config_file), rate_limit=None)
+    assert reader.read_token("zenodo", "token") == "zenodo-token"
+    assert reader.read_token("sandbox", "token") == "sandbox-token"
+    assert config_file.stat().st_mode & 0o777 == 0o600
+    assert not list(config_file.parent.glob("*.tmp"))
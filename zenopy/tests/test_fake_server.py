@@ -0,0 +1,383 @@
+"""
+Tests exercising the zenopy HTTP paths against the bundled fake Zenodo server.
+"""
+
+import asyncio
+import time
+import pytest
+from zenopy.testing import FakeZenodo
+from zenopy.utils import _last_page
+
+
+@pytest.fixture
+def server():
+    with FakeZenodo(seed=0) as fake:
+        yield fake
+
+
+@pytest.fixture
+def fake_client(server):
+    cli = server.client(rate_limit=None, retry_backoff_factor=0.0)
+    yield cli
+    cli.close()
+
+
+def test_records_and_resources(server, fake_client):
+    server.add_records(15, communities=["molssi"])
+    records = fake_client.init_records()
+    page = records.list_records(status="published", sort="bestmatch", size=10, page=2)
+    assert len(page) == 5
+    ids = [record["id"] for record in page]
+    assert records.retrieve_record(ids[0])["title"] == f"Fake record {ids[0]}"
+    hits = records.list_records(
+        status="published", sort="bestmatch", query=f"recid:({ids[0]} OR {ids[1]})"
+    )
+    assert sorted(record["id"] for record in hits) == ids[:2]
+    licenses = fake_client.init_resources("licenses")
+    assert licenses.retrieve_resource("mit")["id"] == "mit"
+    assert server.request_count("GET", "/records") == 2
+
+
+def test_deposition_workflow(server, fake_client, tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"x" * 200_000)
+    deposition = fake_client.init_deposition().create_deposition()
+    files = fake_client.init_deposition_file()
+    upload = files.create_deposition_file(file_path=path, record=deposition)
+    assert upload["size"] == 200_000
+    file_id = files.list_deposition_files(id_=deposition["id"])[0]["id"]
+    outfile = tmp_path / "download.bin"
+    files.retrieve_deposition_file(id_=deposition["id"], file_id=file_id, outfile_path=outfile)
+    assert outfile.read_bytes() == path.read_bytes()
+    fake_client.init_deposition().update_deposition(
+        id_=deposition["id"],
+        upload_type="dataset",
+        title="Fake dataset",
+        creators=[{"name": "Doe, Jane", "affiliation": "Zenopy"}],
+        description="A dataset.",
+        access_right="open",
+        license="cc-by-4.0",
+    )
+    actions = fake_client.init_deposition_actions()
+    published = actions.deposition_action(id_=deposition["id"], action="publish")
+    assert published["state"] == "done"
+    draft = actions.deposition_action(id_=deposition["id"], action="newversion")
+    assert draft["state"] == "unsubmitted"
+    assert draft["conceptrecid"] == published["conceptrecid"]
+    record = fake_client.init_records().retrieve_record(deposition["id"])
+    assert record["files"][0]["size"] == 200_000
+
+
+def test_injected_faults_are_retried(server, fake_client):
+    server.add_records(1)
+    server.inject_fault(503, count=2, method="GET", path="/records")
+    records = fake_client.init_records().list_records(status="published", sort="bestmatch")
+    assert len(records) == 1
+    assert server.request_count("GET", "/records") == 3
+    assert fake_client.stats()["endpoints"]["GET /records"]["retries"] == 2
+
+
+def test_latency_and_rate_limit_headers():
+    with FakeZenodo(latency=0.05, rate_limit=2, retry_after=0) as server:
+        server.add_records(1)
+        cli = server.client(rate_limit=None, max_retries=0)
+        start = time.perf_counter()
+        cli.init_records().retrieve_record(1)
+        assert time.perf_counter() - start >= 0.05
+        response = cli._request("GET", server.base_url + "/records/1")
+        assert response.headers["X-RateLimit-Remaining"] == "0"
+        response = cli._request("GET", server.base_url + "/records/1")
+        assert response.status_code == 429
+        cli.close()
+
+
+def test_async_client(server):
+    pytest.importorskip("httpx")
+    server.add_records(5)
+
+    async def main():
+        async with server.async_client(rate_limit=None) as cli:
+            records = cli.init_records()
+            return await asyncio.gather(*[records.retrieve_record(id_) for id_ in [1, 3, 5]])
+
+    assert [record["id"] for record in asyncio.run(main())] == [1, 3, 5]
+
+
+def test_async_file_download(server, tmp_path):
+    pytest.importorskip("httpx")
+    server.add_record(files={"data.bin": b"x" * 3_000_000})
+    outfile = tmp_path / "data.bin"
+
+    async def main():
+        async with server.async_client(rate_limit=None) as cli:
+            files = cli.init_deposition_file()
+            file_id = (await files.list_deposition_files(1))[0]["id"]
+            await files.retrieve_deposition_file(id_=1, file_id=file_id, outfile_path=outfile)
+
+    asyncio.run(main())
+    assert outfile.read_bytes() == b"x" * 3_000_000
+
+
+@pytest.mark.parametrize("use_search", [False, True])
+def test_retrieve_records(server, fake_client, use_search):
+    ids = [record["id"] for record in server.add_records(6)]
+    server.delete_record(ids[2])
+    wanted = [ids[5], ids[0], 999, ids[2], ids[0], ids[1]]
+    results = fake_client.init_records().retrieve_records(wanted, max_workers=4, use_search=use_search)
+    assert [r["id"] for r in results if not isinstance(r, Exception)] == [ids[5], ids[0], ids[0], ids[1]]
+    assert isinstance(results[2], RuntimeError) and isinstance(results[3], RuntimeError)
+    if use_search:
+        assert server.request_count("GET", "/records") == 1
+        assert server.request_count("GET", "/records/{id}") == 2
+    with pytest.raises(ValueError):
+        fake_client.init_records().retrieve_records([1, "2"])
+
+
+def test_retrieve_records_async(server):
+    pytest.importorskip("httpx")
+    ids = [record["id"] for record in server.add_records(4)]
+    deposition_ids = [deposition["id"] for deposition in server.add_records(2)]
+
+    async def main():
+        async with server.async_client(rate_limit=None) as cli:
+            records = await cli.init_records().retrieve_records(ids[::-1] + [999], use_search=True)
+            depositions = await cli.init_deposition().retrieve_depositions(deposition_ids)
+            return records, depositions
+
+    records, depositions = asyncio.run(main())
+    assert [record["id"] for record in records[:-1]] == ids[::-1]
+    assert isinstance(records[-1], RuntimeError)
+    assert [deposition["id"] for deposition in depositions] == deposition_ids
+
+
+def test_iter_records_and_resources(server, fake_client):
+    server.add_records(25)
+    records = fake_client.init_records().iter_records(size=10)
+    assert next(records)["id"] == 1
+    assert server.request_count("GET", "/records") == 1
+    ids = [1] + [record["id"] for record in records]
+    assert len(ids) == len(set(ids)) == 25
+    assert server.request_count("GET", "/records") == 3
+    views = fake_client.init_records().iter_records(query="recid:(1 OR 3)", view=["id"])
+    assert [view.id for view in views] == [1, 3]
+    licenses = list(fake_client.init_resources("licenses").iter_resources(size=3))
+    assert len(licenses) == 4
+    with pytest.raises(ValueError):
+        list(fake_client.init_records().iter_records(size=0))
+
+
+def test_iter_depositions(server, fake_client):
+    server.add_records(7)
+    depositions = fake_client.init_deposition()
+    assert len(list(depositions.iter_depositions(size=3))) == 7
+    assert server.request_count("GET", "/deposit/depositions") == 3
+    assert len(depositions.list_depositions(page=None, size=5)) == 5
+
+
+def test_iter_records_async(server):
+    pytest.importorskip("httpx")
+    server.add_records(12)
+
+    async def main():
+        async with server.async_client(rate_limit=None) as cli:
+            records = [record["id"] async for record in cli.init_records().iter_records(size=5)]
+            depositions = [d["id"] async for d in cli.init_deposition().iter_depositions(size=5)]
+            return records, depositions
+
+    records, depositions = asyncio.run(main())
+    assert sorted(records) == sorted(depositions) and len(records) == 12
+
+
+def test_iter_records_prefetch():
+    with FakeZenodo(seed=0, latency=0.02) as server:
+        server.add_records(60)
+        cli = server.client(rate_limit=None, retry_backoff_factor=0.0)
+        records_api = cli.init_records()
+        serial = [record["id"] for record in records_api.iter_records(size=5)]
+        assert server.peak_in_flight() == 1
+        server.reset_counts()
+        prefetched = [record["id"] for record in records_api.iter_records(size=5, prefetch=6)]
+        assert 1 < server.peak_in_flight() <= 6
+        assert prefetched == serial and len(serial) == 60
+        server.reset_counts()
+        records = records_api.iter_records(size=5, prefetch=2)
+        next(records)
+        records.close()
+        assert server.request_count("GET", "/records") <= 3
+        with pytest.raises(ValueError):
+            next(records_api.iter_records(prefetch=-1))
+        cli.close()
+
+
+def test_last_page_within_result_window(caplog):
+    assert _last_page({"hits": {"total": 20}}, 10, max_result_window=20) == 2
+    assert not caplog.records
+    assert _last_page({"hits": {"total": {"value": 45}}}, 10, max_result_window=20) == 2
+    assert "harvest_records" in caplog.records[0].getMessage()
+
+
+def test_iter_records_prefetch_async(server):
+    pytest.importorskip("httpx")
+    server.add_records(23)
+
+    async def main():
+        async with server.async_client(rate_limit=None) as cli:
+            records = cli.init_records()
+            serial = [record["id"] async for record in records.iter_records(size=4)]
+            prefetched = [record["id"] async for record in records.iter_records(size=4, prefetch=3)]
+            return serial, prefetched
+
+    serial, prefetched = asyncio.run(main())
+    assert prefetched == serial and len(serial) == 23
+
+
+def test_harvest_records(caplog):
+    with FakeZenodo(seed=0, max_result_window=20) as server:
+        for day in range(70):
+            server.add_record(metadata={"publication_date": f"2020-{1 + day // 28:02d}-{1 + day % 28:02d}"})
+        server.add_records(5, communities=["zenopy"])
+        cli = server.client(rate_limit=None, retry_backoff_factor=0.0)
+        records_api = cli.init_records()
+        assert len(list(records_api.iter_records(size=10))) == 20
+        ids = [view.id for view in records_api.harvest_records(size=10, max_result_window=20, view=["id"])]
+        assert len(ids) == len(set(ids)) == 75
+        harvested = records_api.harvest_records(start="2020-02-01", end="2020-03-01", size=10, max_result_window=20)
+        assert len(list(harvested)) == 28
+        harvested = records_api.harvest_records(
+            query="fake", communities="zenopy", field="created", max_result_window=20, size=10
+        )
+        assert len(list(harvested)) == 5
+        assert not caplog.records
+        # The pages of the ranges are fetched on up to max_workers threads
+        server.reset_counts()
+        harvested = records_api.harvest_records(size=5, max_result_window=20, max_workers=2)
+        assert len(list(harvested)) == 75
+        assert server.peak_in_flight() <= 2
+        server.reset_counts()
+        harvested = records_api.harvest_records(size=5, max_result_window=20, max_workers=2)
+        next(harvested)
+        counts = server.request_count("GET", "/records")
+        harvested.close()
+        assert server.request_count("GET", "/records") <= counts + 2
+        with pytest.raises(ValueError):
+            next(records_api.harvest_records(field="updated"))
+        cli.close()
+
+
+def test_harvest_records_async(server):
+    pytest.importorskip("httpx")
+    for day in range(1, 13):
+        server.add_record(metadata={"publication_date": f"2021-03-{day:02d}"})
+    server.max_result_window = 4
+
+    async def main():
+        async with server.async_client(rate_limit=None) as cli:
+            records = cli.init_records().harvest_records(size=2, max_result_window=4, max_workers=3)
+            return [record["id"] async for record in records]
+
+    ids = asyncio.run(main())
+    assert sorted(ids) == list(range(1, 25, 2))
+
+
+def test_sync_records(server, fake_client, tmp_path, monkeypatch):
+    from zenopy.sync import MirrorStore
+
+    server.add_records(7, communities=["zenopy"])
+    server.add_records(2)
+    records = fake_client.init_records()
+    path = tmp_path / "mirror.sqlite"
+    assert records.sync_records(path, communities="zenopy", size=3)["upserted"] == 7
+    server.reset_counts()
+    assert records.sync_records(path, communities="zenopy", size=3)["upserted"] == 0
+    assert server.request_count("GET", "/records") == 1
+
+    actions = fake_client.init_deposition_actions()
+    draft = actions.deposition_action(id_=1, action="newversion")
+    actions.deposition_action(id_=draft["id"], action="publish")
+    server.delete_record(3)
+    added = [record["id"] for record in server.add_records(4, communities=["zenopy"])]
+
+    # Interrupt the synchronization after two pages
+    request = fake_client._request
+    calls = []
+
+    def interrupted(*args, **kwargs):
+        calls.append(None)
+        if len(calls) > 2:
+            raise ConnectionError("interrupted")
+        return request(*args, **kwargs)
+
+    monkeypatch.setattr(fake_client, "_request", interrupted)
+    with pytest.raises(ConnectionError):
+        records.sync_records(path, communities="zenopy", size=2)
+    monkeypatch.setattr(fake_client, "_request", request)
+    with MirrorStore(path) as store:
+        assert store.state()["checkpoint"]["page"] == 3
+        assert len(store) == 11
+
+    stats = records.sync_records(path, communities="zenopy", size=2, prune=True)
+    assert (stats["upserted"], stats["deleted"]) == (1, 2)
+    with MirrorStore(path) as store:
+        assert store.ids() == {5, 7, 9, 11, 13, draft["id"], *added}
+        assert store.state()["high_water"] == stats["high_water"]
+    with pytest.raises(ValueError):
+        records.sync_records(path, query="zenopy")
+
+
+def test_sync_records_window_shift(server, fake_client, tmp_path, monkeypatch):
+    from zenopy.sync import MirrorStore
+
+    ids = [record["id"] for record in server.add_records(6)]
+    # Delete the newest record once the first page is fetched: the following
+    # records move to earlier pages
+    request = fake_client._request
+    calls = []
+
+    def deleting(*args, **kwargs):
+        calls.append(None)
+        if len(calls) == 2:
+            server.delete_record(ids[-1])
+        return request(*args, **kwargs)
+
+    monkeypatch.setattr(fake_client, "_request", deleting)
+    fake_client.init_records().sync_records(tmp_path / "mirror.sqlite", size=2)
+    with MirrorStore(tmp_path / "mirror.sqlite") as store:
+        assert store.ids() == set(ids)
+
+
+def test_sync_records_clock_skew(server, fake_client, tmp_path, monkeypatch):
+    import zenopy.sync
+
+    # The client clock is ahead of the server: the records updated after the
+    # last hit of a run but before its (client) start are synced by the next
+    # run
+    server.add_records(3)
+    utcnow = zenopy.sync._utcnow
+    monkeypatch.setattr(zenopy.sync, "_utcnow", lambda: utcnow().replace(utcnow()[:4], "2999", 1))
+    records = fake_client.init_records()
+    path = tmp_path / "mirror.sqlite"
+    first = records.sync_records(path, size=2)
+    assert first["upserted"] == 3 and first["high_water"] < utcnow()
+    late = server.add_record()
+    second = records.sync_records(path, size=2)
+    assert second["upserted"] == 1 and second["high_water"] > first["high_water"]
+    with zenopy.sync.MirrorStore(path) as store:
+        assert late["id"] in store
+    assert records.sync_records(path, size=2)["upserted"] == 0
+
+
+def test_sync_records_async(server, tmp_path):
+    pytest.importorskip("httpx")
+    server.add_records(5)
+    path = tmp_path / "mirror.sqlite"
+
+    async def main():
+        async with server.async_client(rate_limit=None) as cli:
+            first = await cli.init_records().sync_records(path, size=2)
+            server.add_records(1)
+            server.delete_record(1)
+            second = await cli.init_records().sync_records(path, size=2, prune=True)
+            return first, second
+
+    first, second = asyncio.run(main())
+    assert (first["upserted"], second["upserted"], second["deleted"]) == (5, 1, 1)
@@ -0,0 +1,142 @@
+"""
+Unit tests for the request hooks and the metrics collector of the zenopy client.
+"""
+
+import io
+import json
+import pytest
+import requests
+import urllib3
+from requests.adapters import BaseAdapter
+from zenopy.metrics import _endpoint_template
+
+BASE_URL = "https://zenodo.org/api"
+
+
+class _RecordAdapter(BaseAdapter):
+    """Serves a fixed record body, failing the first ``failures`` requests with 503"""
+
+    def __init__(self, failures=0):
+        super().__init__()
+        self.failures = failures
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        if self.failures > 0:
+            self.failures -= 1
+            response.status_code = 503
+            response.headers["Retry-After"] = "0"
+            response._content = b""
+        else:
+            response.status_code = 200
+            response._content = json.dumps({"id": 1, "links": {"self": request.url}}).encode()
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+class _StreamAdapter(BaseAdapter):
+    """Serves a streamed body without Content-Length or fails with ``error``"""
+
+    def __init__(self, error=None):
+        super().__init__()
+        self.error = error
+
+    def send(self, request, **kwargs):
+        if self.error is not None:
+            raise self.error
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = urllib3.response.HTTPResponse(body=io.BytesIO(b"x" * 1000), preload_content=False)
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        (BASE_URL + "/records/123?access_token=x", "/records/{id}"),
+        (BASE_URL + "/deposit/depositions/7/files/abc-def", "/deposit/depositions/{id}/files/{file_id}"),
+        (BASE_URL + "/deposit/depositions/7/actions/publish", "/deposit/depositions/{id}/actions/publish"),
+        (BASE_URL + "/files/bucket-id/data.csv", "/files/{bucket}/{key}"),
+        ("https://zenodo.org/records/5/files/data.csv/content", "/records/{id}/files/{file_id}/content"),
+        (BASE_URL + "/licenses/cc-by-4.0", "/licenses/{id}"),
+    ],
+)
+def test_endpoint_template(url, expected):
+    assert _endpoint_template(url, BASE_URL) == expected
+
+
+def test_client_stats(client):
+    client._transport.session.mount(BASE_URL, _RecordAdapter(failures=1))
+    client._transport._retry_policy._backoff_factor = 0.0
+    events = []
+    client.register_hook("pre_request", lambda info: events.append(("pre", info["endpoint"])))
+    client.register_hook("post_request", lambda info: events.append(("post", info["status_code"])))
+    for id_ in [1, 2, 3]:
+        client.init_records().retrieve_record(id_)
+
+    assert events == [("pre", "/records/{id}"), ("post", 200)] * 3
+    stats = client.stats()
+    endpoint = stats["endpoints"]["GET /records/{id}"]
+    assert endpoint["count"] == 3
+    assert endpoint["retries"] == 1
+    assert endpoint["status_codes"] == {"200": 3}
+    assert endpoint["bytes_received"] > 0
+    assert endpoint["latency"]["buckets"]["+Inf"] == 3
+    assert 0 <= endpoint["latency"]["p50"] <= endpoint["latency"]["p99"] <= endpoint["latency"]["max"]
+    assert stats["totals"]["count"] == 3
+
+    assert json.loads(client.stats(format="json")) == stats
+    text = client.stats(format="prometheus")
+    assert 'zenopy_requests_total{method="GET",endpoint="/records/{id}",status="200"} 3' in text
+    assert 'zenopy_request_duration_seconds_count{method="GET",endpoint="/records/{id}"} 3' in text
+
+    client.reset_stats()
+    assert client.stats()["endpoints"] == {}
+
+
+def test_failing_hook_does_not_break_requests(client):
+    client._transport.session.mount(BASE_URL, _RecordAdapter())
+
+    def hook(info):
+        raise RuntimeError("boom")
+
+    client.register_hook("post_request", hook)
+    assert client.init_records().retrieve_record(1).data["id"] == 1
+    client.unregister_hook("post_request", hook)
+    with pytest.raises(ValueError):
+        client.register_hook("on_response", print)
+
+
+def test_export_stats(client, tmp_path):
+    client._transport.session.mount(BASE_URL, _RecordAdapter())
+    client.init_records().retrieve_record(1)
+    path = tmp_path / "zenopy.prom"
+    client.export_stats(path)
+    assert path.read_text() == client.stats(format="prometheus")
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_streamed_and_failed_requests_are_measured(client):
+    url = BASE_URL + "/files/bucket/data.bin"
+    events = []
+    client.register_hook("post_request", events.append)
+    client._transport.session.mount(client._transport._files_url, _StreamAdapter())
+    with client._stream("GET", url) as response:
+        assert sum(len(chunk) for chunk in response.iter_content(chunk_size=100)) == 1000
+    assert events[-1]["bytes_received"] == 1000
+
+    error = requests.exceptions.ChunkedEncodingError()
+    client._transport.session.mount(client._transport._files_url, _StreamAdapter(error))
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        client._request("GET", url)
+    assert isinstance(events[-1]["error"], requests.exceptions.ChunkedEncodingError)
+    assert client.stats()["endpoints"]["GET /files/{bucket}/{key}"]["count"] == 2
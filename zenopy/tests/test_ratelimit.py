@@ -0,0 +1,54 @@
+"""
+Unit tests for the client-side rate limiter.
+"""
+
+import time
+import pytest
+from zenopy.ratelimit import _RateLimiter
+
+
+def test_rate_limiter_allows_burst_then_paces():
+    limiter = _RateLimiter(rate=10, period=1.0, burst=3)
+    delays = [limiter._reserve() for _ in range(5)]
+    assert delays[:3] == [0.0, 0.0, 0.0]
+    assert delays[3] == pytest.approx(0.1, abs=0.02)
+    assert delays[4] == pytest.approx(0.2, abs=0.02)
+
+
+def test_rate_limiter_honors_retry_after():
+    limiter = _RateLimiter(rate=100, period=1.0, burst=10)
+    limiter.update(429, {"Retry-After": "2"})
+    assert limiter._reserve() == pytest.approx(2.0, abs=0.05)
+
+
+def test_rate_limiter_honors_exhausted_remaining_budget():
+    limiter = _RateLimiter(rate=100, period=1.0, burst=10)
+    reset = time.time() + 3
+    limiter.update(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)})
+    assert limiter._reserve() == pytest.approx(3.0, abs=0.1)
+
+
+def test_rate_limiter_follows_remaining_header():
+    limiter = _RateLimiter(rate=10, period=1.0, burst=10)
+    limiter.update(200, {"X-RateLimit-Remaining": "1"})
+    assert limiter._reserve() == 0.0
+    assert limiter._reserve() > 0.0
+
+
+def test_client_shares_rate_limiter(config_file):
+    import zenopy
+
+    with zenopy.Zenodo(config_file_path=str(config_file), rate_limit=50) as cli:
+        limiter = cli._transport.rate_limiter
+        assert limiter is not None
+        assert cli.init_records()._client._transport.rate_limiter is limiter
+    with zenopy.Zenodo(config_file_path=str(config_file), rate_limit=None) as cli:
+        assert cli._transport.rate_limiter is None
+
+
+def test_client_rate_limiting_is_opt_in():
+    from zenopy.testing import FakeZenodo
+
+    with FakeZenodo() as server:
+        assert server.client()._transport.rate_limiter is None
+        assert server.client(rate_limit=100)._transport.rate_limiter is not None
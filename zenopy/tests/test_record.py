@@ -0,0 +1,161 @@
+"""
+Unit tests for the zenopy Record class.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from zenopy.record import Record, _record_url
+from zenopy.testing import FakeZenodo
+
+BASE_URL = "https://zenodo.org/api"
+
+
+@pytest.mark.parametrize(
+    "kind, id_, resource, expected",
+    [
+        ("deposition", 1, None, "/deposit/depositions/1"),
+        ("deposition-files", 1, None, "/deposit/depositions/1/files"),
+        ("record", 2, None, "/records/2"),
+        ("resource", "cc-by-4.0", "licenses", "/licenses/cc-by-4.0"),
+    ],
+)
+def test_record_url(kind, id_, resource, expected):
+    assert _record_url(BASE_URL, kind=kind, id_=id_, resource=resource) == BASE_URL + expected
+
+
+@pytest.mark.parametrize("kind, resource", [("draft", None), ("resource", "users")])
+def test_record_url_invalid(kind, resource):
+    with pytest.raises(ValueError):
+        _record_url(BASE_URL, kind=kind, id_=1, resource=resource)
+
+
+def test_record_retrieval_by_kind():
+    with FakeZenodo() as server:
+        ids = [record["id"] for record in server.add_records(4)]
+        cli = server.client(rate_limit=None)
+        deposition = Record(cli, id_=ids[0], kind="deposition")
+        assert deposition.record_url == f"{server.base_url}/deposit/depositions/{ids[0]}"
+        license_ = Record(cli, id_="mit", kind="resource", resource="licenses")
+        assert license_["id"] == "mit"
+        # No caller frame is needed, e.g., when fetching from a thread pool
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            records = list(executor.map(lambda id_: Record(cli, id_=id_), ids))
+        assert [record["id"] for record in records] == ids
+        cli.close()
+
+
+def test_lazy_records():
+    with FakeZenodo() as server:
+        ids = [record["id"] for record in server.add_records(5)]
+        cli = server.client(rate_limit=None)
+        records = [cli.init_records().retrieve_record(id_, lazy=True) for id_ in ids]
+        assert [record.record_id for record in records] == ids
+        assert records[0].record_url == f"{server.base_url}/records/{ids[0]}"
+        assert server.request_count("GET", "/records/{id}") == 0
+
+        assert records[0]["title"] == f"Fake record {ids[0]}"
+        assert records[0].hydrated and not records[1].hydrated
+        assert cli.prefetch_records(records + records[:2]) == records + records[:2]
+        assert all(record.hydrated for record in records)
+        assert server.request_count("GET", "/records/{id}") == len(ids)
+        cli.close()
+
+
+def test_lazy_records_async():
+    pytest.importorskip("httpx")
+    import asyncio
+
+    with FakeZenodo() as server:
+        ids = [record["id"] for record in server.add_records(3)]
+
+        async def main():
+            async with server.async_client(rate_limit=None) as cli:
+                records = [await cli.init_records().retrieve_record(id_, lazy=True) for id_ in ids]
+                with pytest.raises(RuntimeError):
+                    records[0].prefetch()
+                draft = await cli.init_deposition_actions().deposition_action(
+                    id_=ids[0], action="newversion", lazy=True
+                )
+                assert not draft.hydrated
+                return await cli.prefetch_records(records + [draft])
+
+        records = asyncio.run(main())
+        assert [record["id"] for record in records[:-1]] == ids
+        assert records[-1]["id"] not in ids
+
+
+def test_conditional_requests_cache():
+    with FakeZenodo() as server:
+        ids = [record["id"] for record in server.add_records(3)]
+        cli = server.client(rate_limit=None, cache_size=2)
+        depositions = cli.init_deposition()
+        deposition = depositions.create_deposition()
+        record = depositions.retrieve_deposition(deposition["id"])
+        assert record.refresh()["id"] == deposition["id"]
+        assert cli.cache_info()["hits"] == 1
+
+        depositions.update_deposition(
+            id_=deposition["id"],
+            upload_type="dataset",
+            title="Updated title",
+            creators=[{"name": "Doe, Jane", "affiliation": "Zenopy"}],
+            description="A dataset.",
+        )
+        assert cli.cache_info()["hits"] == 2
+        assert record.refresh().title == "Updated title"
+        assert cli.cache_info()["misses"] == 2
+
+        for id_ in ids:
+            cli.init_records().retrieve_record(id_)
+        info = cli.cache_info()
+        assert (info["entries"], info["evictions"]) == (2, 2)
+        cli.init_records().retrieve_record(ids[-1])
+        assert cli.cache_info()["hits"] == 3
+        cli.clear_cache()
+        assert cli.cache_info()["entries"] == 0
+        cli.close()
+
+
+def test_save_changed_fields():
+    with FakeZenodo() as server:
+        cli = server.client(rate_limit=None)
+        deposition = cli.init_deposition().create_deposition()
+        assert deposition.changed_fields == []
+        server.reset_counts()
+        deposition.save()
+        assert server.request_count() == 0
+
+        deposition.title = "Draft dataset"
+        deposition.metadata["description"] = "A dataset."
+        assert deposition.changed_fields == ["description", "title"]
+        deposition.save()
+        assert server.request_count("PUT") == 1 and server.request_count("GET") == 0
+        assert deposition.changed_fields == []
+        assert cli.init_deposition().retrieve_deposition(deposition["id"]).title == "Draft dataset"
+
+        with pytest.raises(RuntimeError):
+            cli.init_resources("licenses").retrieve_resource("mit").save()
+        cli.close()
+
+
+def test_record_views():
+    with FakeZenodo() as server:
+        server.add_records(3, files={"data.csv": b"a,b\n1,2\n"})
+        cli = server.client(rate_limit=None)
+        views = cli.init_records().list_records(status="published", sort="bestmatch", view=True)
+        assert [view.title for view in views] == [f"Fake record {view.id}" for view in views]
+        assert views[0].files == (("data.csv", 8),)
+        assert views[0]["doi"] == f"10.5281/zenodo.{views[0].id}"
+        with pytest.raises(AttributeError):
+            views[0].title = "Renamed"
+
+        views = cli.init_records().list_records(
+            status="published", sort="bestmatch", view=["id", "metadata.upload_type"]
+        )
+        assert views[0].to_dict() == {"id": views[0].id, "metadata.upload_type": "dataset"}
+        assert views[0].title is None
+
+        deposition_id = cli.init_deposition().list_depositions(view=True)[0].id
+        files = cli.init_deposition_file().list_deposition_files(deposition_id, view=True)
+        assert (files[0].filename, files[0].filesize) == ("data.csv", 8)
+        cli.close()
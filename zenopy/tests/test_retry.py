@@ -0,0 +1,108 @@
+"""
+Unit tests for the retry policy of the zenopy client transport.
+"""
+
+import io
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from zenopy.retry import _RetryPolicy
+from zenopy.transport import _Transport
+
+BASE_URL = "https://zenodo.org/api"
+
+
+class _ScriptedAdapter(BaseAdapter):
+    """Replays a list of status codes (or exceptions) and records the requests"""
+
+    def __init__(self, outcomes):
+        super().__init__()
+        self.outcomes = list(outcomes)
+        self.bodies = []
+
+    def send(self, request, **kwargs):
+        body = request.body
+        self.bodies.append(body.read() if hasattr(body, "read") else body)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = requests.Response()
+        response.status_code = outcome
+        response.headers["Retry-After"] = "0"
+        response._content = b"{}"
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def _transport(outcomes, max_retries=3):
+    transport = _Transport(
+        base_url=BASE_URL,
+        retry_policy=_RetryPolicy(max_retries=max_retries, backoff_factor=0.0),
+    )
+    adapter = _ScriptedAdapter(outcomes)
+    transport.session.mount(BASE_URL, adapter)
+    transport.session.mount(BASE_URL + "/files", adapter)
+    return transport, adapter
+
+
+@pytest.mark.parametrize(
+    "method, status_code, expected",
+    [
+        ("GET", 503, True),
+        ("PUT", 500, True),
+        ("POST", 503, False),
+        ("POST", 429, True),
+        ("GET", 404, False),
+    ],
+)
+def test_retry_policy_respects_idempotency(method, status_code, expected):
+    policy = _RetryPolicy(max_retries=3)
+    assert policy.should_retry(0, method, status_code=status_code) is expected
+
+
+def test_retry_policy_connection_errors():
+    policy = _RetryPolicy(max_retries=1)
+    assert policy.should_retry(0, "POST", maybe_processed=False)
+    assert not policy.should_retry(0, "POST", maybe_processed=True)
+    assert not policy.should_retry(1, "GET", maybe_processed=False)
+
+
+def test_retry_policy_backoff_and_retry_after():
+    policy = _RetryPolicy(backoff_factor=1.0, backoff_max=5.0, jitter=False)
+    assert [policy.delay(n) for n in range(4)] == [1.0, 2.0, 4.0, 5.0]
+    assert policy.delay(0, {"Retry-After": "3"}) == 3.0
+    assert policy.delay(0, {"Retry-After": "7200"}) == 5.0
+    jittered = _RetryPolicy(backoff_factor=1.0, jitter=True)
+    assert all(0.0 <= jittered.delay(2) <= 4.0 for _ in range(20))
+
+
+def test_transport_retries_transient_get_failures():
+    transport, adapter = _transport([503, requests.exceptions.ConnectionError("reset"), 200])
+    response = transport.request("GET", BASE_URL + "/records/1")
+    assert response.status_code == 200
+    assert len(adapter.bodies) == 3
+
+
+def test_transport_does_not_retry_post_server_errors():
+    transport, adapter = _transport([503, 201])
+    response = transport.request("POST", BASE_URL + "/deposit/depositions", json={})
+    assert response.status_code == 503
+    assert len(adapter.bodies) == 1
+
+
+def test_transport_gives_up_after_max_retries():
+    transport, adapter = _transport([502, 502, 502], max_retries=2)
+    assert transport.request("GET", BASE_URL + "/records/1").status_code == 502
+    assert len(adapter.bodies) == 3
+
+
+def test_transport_rewinds_uploaded_files():
+    transport, adapter = _transport([500, 201])
+    fp = io.BytesIO(b"payload")
+    response = transport.request("PUT", BASE_URL + "/files/bucket/data.txt", data=fp)
+    assert response.status_code == 201
+    assert adapter.bodies == [b"payload", b"payload"]
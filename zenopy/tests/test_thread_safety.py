@@ -0,0 +1,52 @@
+"""
+Tests for sharing a single zenopy client between multiple threads.
+"""
+
+import json
+import pytest
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import BaseAdapter
+from zenopy.metadata import records_search_headers
+
+
+class _EchoAdapter(BaseAdapter):
+    """Returns the Content-Type header of the request as a search hit"""
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        hit = {
+            "id": 1,
+            "links": {"self": request.url},
+            "content_type": request.headers["Content-Type"],
+        }
+        response._content = json.dumps({"hits": {"hits": [hit]}}).encode()
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def test_client_defaults_are_read_only(client):
+    with pytest.raises(TypeError):
+        client._headers["Content-Type"] = "application/x-bibtex"
+    with pytest.raises(TypeError):
+        client._params["access_token"] = "other-token"
+
+
+def test_concurrent_list_records(client):
+    client._transport.session.mount(client._base_url, _EchoAdapter())
+    records = client.init_records()
+    content_types = ["json", "bibtex", "datacitexml", "dublincore"] * 25
+
+    def search(content_type):
+        hits = records.list_records(content_type=content_type, status="published", sort="bestmatch")
+        return hits[0].data["content_type"]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(search, content_types))
+    assert results == [records_search_headers[name] for name in content_types]
+    assert client._headers["Content-Type"] == "application/json"
@@ -0,0 +1,79 @@
+"""
+Unit tests for spreading the read requests over a pool of tokens.
+"""
+
+import urllib.parse
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+import zenopy
+from zenopy.ratelimit import _RateLimiter
+from zenopy.token_pool import _TokenPool
+
+
+class _RecordingAdapter(BaseAdapter):
+    def __init__(self):
+        super().__init__()
+        self.tokens = []
+
+    def send(self, request, **kwargs):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(request.url).query)
+        self.tokens.append(query["access_token"][0])
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"{}"
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def multi_token_config(tmp_path):
+    path = tmp_path / "zenodorc"
+    path.write_text("[ZENODO]\ntoken = t1\ntoken2 = t2\ntoken3 = t3\n\n[SANDBOX]\n")
+    return path
+
+
+def test_token_pool_round_robin():
+    pool = _TokenPool(tokens=["a", "b", "c"])
+    assert [pool.select()[0] for _ in range(6)] == ["a", "b", "c", "a", "b", "c"]
+
+
+def test_token_pool_least_loaded():
+    limiters = [_RateLimiter(rate=1, period=60.0, burst=2) for _ in range(2)]
+    pool = _TokenPool(tokens=["a", "b"], rate_limiters=limiters, strategy="least_loaded")
+    limiters[0]._reserve()
+    assert pool.select()[0] == "b"
+    limiters[1]._reserve()
+    limiters[1]._reserve()
+    assert pool.select()[0] == "a"
+
+
+def test_token_pool_invalid_strategy():
+    with pytest.raises(ValueError):
+        _TokenPool(tokens=["a"], strategy="random")
+
+
+def test_client_spreads_read_requests(multi_token_config):
+    cli = zenopy.Zenodo(config_file_path=str(multi_token_config), token_pool="round_robin")
+    adapter = _RecordingAdapter()
+    cli._transport.session.mount(cli._base_url, adapter)
+    pool = cli._transport.token_pool
+    assert pool.tokens == ["t1", "t2", "t3"]
+    assert pool._rate_limiters[0] is cli._transport.rate_limiter
+    for _ in range(3):
+        cli._request("GET", cli._base_url + "/records", params=cli._params)
+    cli._request("GET", cli._base_url + "/deposit/depositions", params=cli._params)
+    assert adapter.tokens == ["t1", "t2", "t3", "t1"]
+    # The shared parameters of the client are never modified
+    assert cli._params["access_token"] == "t1"
+
+
+def test_client_skips_placeholder_tokens(tmp_path):
+    # A config file created by create_config_file() and partially filled in
+    path = tmp_path / "zenodorc"
+    path.write_text("[ZENODO]\ntoken = <FIXME>\ntoken2 = t2\ntoken3 =\n\n[SANDBOX]\n")
+    cli = zenopy.Zenodo(token="t1", config_file_path=str(path), token_pool="least_loaded")
+    assert cli._transport.token_pool.tokens == ["t1", "t2"]
@@ -0,0 +1,41 @@
+"""
+Unit tests for the pooled HTTP transport of the zenopy client.
+"""
+
+import pytest
+import zenopy
+from zenopy.transport import _Transport
+
+
+def test_transport_mounts_separate_pools():
+    transport = _Transport(base_url="https://zenodo.org/api", pool_maxsize=4, files_pool_maxsize=16)
+    session = transport.session
+    api_adapter = session.get_adapter("https://zenodo.org/api/records/1")
+    files_adapter = session.get_adapter("https://zenodo.org/api/files/bucket-id/data.txt")
+    assert api_adapter is not files_adapter
+    assert api_adapter._pool_maxsize == 4
+    assert files_adapter._pool_maxsize == 16
+    transport.close()
+
+
+def test_transport_keep_alive_disabled():
+    transport = _Transport(base_url="https://zenodo.org/api", keep_alive=False)
+    assert transport.session.headers["Connection"] == "close"
+
+
+@pytest.mark.parametrize("kwargs", [{"base_url": None}, {"base_url": "https://zenodo.org/api", "pool_maxsize": 0}])
+def test_transport_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        _Transport(**kwargs)
+
+
+def test_client_subsystems_share_transport(client):
+    depo = client.init_deposition()
+    records = client.init_records()
+    assert depo._client._transport is records._client._transport is client._transport
+
+
+def test_client_context_manager_closes_transport(config_file):
+    with zenopy.Zenodo(config_file_path=str(config_file), pool_maxsize=2) as cli:
+        adapter = cli._transport.session.get_adapter(cli._base_url + "/records")
+        assert adapter._pool_maxsize == 2
@@ -5,8 +5,41 @@ Unit and regression test for the zenopy package.
 # Import package, test suite, and other packages as needed
 import zenopy
 import pytest
+import subprocess
 import sys
 
 def test_zenopy_imported():
     """Sample test, will always pass so long as import statement worked"""
     assert "zenopy" in sys.modules
+
+
+def test_zenopy_import_is_lazy():
+    """Importing zenopy must not import the HTTP stack or the vocabularies"""
+    code = (
+        "import sys, zenopy\n"
+        "heavy = ['requests', 'validators', 'zenopy.client', 'zenopy.metadata']\n"
+        "print(','.join(name for name in heavy if name in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+
+def test_zenopy_lazy_attributes():
+    assert zenopy.Zenodo is zenopy.client.Zenodo
+    assert "open" in zenopy.metadata.access_rights
+    assert isinstance(zenopy.__version__, str)
+
+
+@pytest.mark.parametrize("from_env", [False, True])
+def test_client_construction_without_file_io(tmp_path, monkeypatch, from_env):
+    """A client constructed from a token never touches ~/.zenodorc"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    if from_env:
+        monkeypatch.setenv("ZENODO_TOKEN", "env-token")
+        cli = zenopy.Zenodo()
+    else:
+        cli = zenopy.Zenodo(token="env-token")
+    assert cli.token == "env-token"
+    assert cli._params["access_token"] == "env-token"
+    assert cli._transport._session is None
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+"""Zenodo client token pool
+
+"""
+
+import itertools
+import threading
+import logging
+from zenopy.ratelimit import _RateLimiter
+
+logger = logging.getLogger(__name__)
+
+token_pool_strategies = {
+    "round_robin": "Cycle through the tokens in the order they are listed.",
+    "least_loaded": (
+        "Pick the token whose rate limit budget allows sending the next "
+        "request the soonest."
+    ),
+}
+
+
+class _TokenPool(object):
+    """Pool of access tokens (each with its own rate limiter) used by the
+    zenopy client transports to spread the read requests over several
+    accounts' tokens."""
+
+    def __init__(
+        self,
+        tokens: list[str] = None,
+        rate_limiters: list[_RateLimiter] = None,
+        strategy: str = "round_robin",
+    ):
+        if tokens is None or tokens == []:
+            raise ValueError("The 'tokens' argument cannot be None or empty.")
+        if rate_limiters is None:
+            rate_limiters = [None] * len(tokens)
+        if len(rate_limiters) != len(tokens):
+            raise ValueError("Each token in the pool needs its own rate limiter (or None).")
+        if strategy not in token_pool_strategies.keys():
+            raise ValueError(
+                f"Invalid 'strategy' argument value ({strategy}).\n"
+                f"Possible values are: {list(token_pool_strategies.keys())}\n"
+            )
+        self._tokens = list(tokens)
+        self._rate_limiters = list(rate_limiters)
+        self._strategy = strategy
+        self._cycle = itertools.cycle(range(len(self._tokens)))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tokens)
+
+    @property
+    def tokens(self) -> list[str]:
+        """The tokens available in the pool."""
+        return list(self._tokens)
+
+    def select(self) -> tuple[str, (_RateLimiter | None)]:
+        """Pick the token (and its rate limiter) for the next request."""
+        with self._lock:
+            if self._strategy == "least_loaded" and None not in self._rate_limiters:
+                idx = min(
+                    range(len(self._tokens)),
+                    key=lambda i: (
+                        self._rate_limiters[i].delay(),
+                        -self._rate_limiters[i].available(),
+                    ),
+                )
+            else:
+                idx = next(self._cycle)
+        return self._tokens[idx], self._rate_limiters[idx]
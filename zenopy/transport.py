@@ -0,0 +1,454 @@
+# -*- coding: utf-8 -*-
+
+"""Zenodo HTTP transport layer
+
+"""
+
+import asyncio
+import contextlib
+import importlib.util
+import threading
+import time
+import logging
+from typing import TYPE_CHECKING
+from zenopy.metrics import _Instrumentation
+from zenopy.ratelimit import _RateLimiter
+from zenopy.retry import _RetryPolicy
+from zenopy.token_pool import _TokenPool
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+
+class _BaseTransport(object):
+    """Functionality shared by the synchronous and asynchronous transports"""
+
+    _base_url = None
+    _files_url = None
+    _rate_limiter = None
+    _token_pool = None
+    _instrumentation = None
+
+    @property
+    def token_pool(self) -> (_TokenPool | None):
+        """The pool of tokens used for spreading the read requests."""
+        return self._token_pool
+
+    @property
+    def instrumentation(self) -> (_Instrumentation | None):
+        """The request hooks and metrics collector of the transport."""
+        return self._instrumentation
+
+    def _start(self, method: str = None, url: str = None) -> (dict | None):
+        if self._instrumentation is None:
+            return None
+        return self._instrumentation.start(method, url, self._base_url)
+
+    def _finish(self, info: dict = None, **kwargs) -> None:
+        if info is not None:
+            self._instrumentation.finish(info, **kwargs)
+
+    @property
+    def rate_limiter(self) -> (_RateLimiter | None):
+        """The rate limiter shared by all requests sent through the transport."""
+        return self._rate_limiter
+
+    def _select_credentials(self, url: str = None, kwargs: dict = None) -> tuple[(_RateLimiter | None), dict]:
+        """Pick the access token and rate limiter used for sending a request.
+
+        Read requests are spread over the tokens of the pool (if any) while
+        the deposition and bucket requests always use the client's own token
+        because they refer to resources owned by that account.
+        """
+        if (
+            self._token_pool is None
+            or url.startswith(self._base_url + "/deposit")
+            or url.startswith(self._files_url)
+        ):
+            return self._rate_limiter, kwargs
+        token, rate_limiter = self._token_pool.select()
+        kwargs = dict(kwargs)
+        params = dict(kwargs.get("params") or {})
+        params["access_token"] = token
+        kwargs["params"] = params
+        headers = kwargs.get("headers")
+        if headers is not None and "Authorization" in headers:
+            headers = dict(headers)
+            headers["Authorization"] = f"Bearer {token}"
+            kwargs["headers"] = headers
+        return rate_limiter, kwargs
+
+
+class _Transport(_BaseTransport):
+    """HTTP transport shared by all subsystems created from a single
+    zenopy client. It owns a ``requests.Session`` with separate connection
+    pools for the REST API host and the ``/files`` bucket endpoints so that
+    the TCP/TLS connections are reused across requests."""
+
+    def __init__(
+        self,
+        base_url: str = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        files_pool_maxsize: int = None,
+        keep_alive: bool = True,
+        rate_limiter: _RateLimiter = None,
+        retry_policy: _RetryPolicy = None,
+        token_pool: _TokenPool = None,
+        instrumentation: _Instrumentation = None,
+    ):
+        if base_url is None or base_url == "":
+            raise ValueError("The 'base_url' argument cannot be None or empty.")
+        for name, value in [
+            ("pool_connections", pool_connections),
+            ("pool_maxsize", pool_maxsize),
+        ]:
+            if not isinstance(value, int) or value < 1:
+                raise ValueError(f"The '{name}' argument must be a positive integer.")
+        if files_pool_maxsize is None:
+            files_pool_maxsize = pool_maxsize
+        elif not isinstance(files_pool_maxsize, int) or files_pool_maxsize < 1:
+            raise ValueError("The 'files_pool_maxsize' argument must be a positive integer.")
+        self._base_url = base_url.strip().rstrip("/")
+        self._files_url = self._base_url + "/files"
+        self._keep_alive = keep_alive
+        self._rate_limiter = rate_limiter
+        if retry_policy is None:
+            retry_policy = _RetryPolicy(max_retries=0)
+        self._retry_policy = retry_policy
+        self._token_pool = token_pool
+        self._instrumentation = instrumentation
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._files_pool_maxsize = files_pool_maxsize
+        # The session is created upon the first request so that constructing
+        # a client stays cheap and does not import requests.
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> "requests.Session":
+        """The underlying ``requests.Session`` object."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> "requests.Session":
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        api_adapter = HTTPAdapter(
+            pool_connections=self._pool_connections, pool_maxsize=self._pool_maxsize
+        )
+        files_adapter = HTTPAdapter(
+            pool_connections=self._pool_connections, pool_maxsize=self._files_pool_maxsize
+        )
+        # requests picks the adapter with the longest matching prefix, so the
+        # bucket uploads/downloads never compete with the metadata calls for
+        # pooled connections.
+        session.mount(self._files_url, files_adapter)
+        session.mount(self._base_url, api_adapter)
+        if not self._keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def request(self, method: str = None, url: str = None, **kwargs) -> "requests.models.Response":
+        """Send an HTTP request through the pooled session.
+
+        The keyword arguments are passed verbatim to
+        ``requests.Session.request()``.
+        """
+        _check_request(method, url)
+        method = method.upper()
+        info = self._start(method, url)
+        attempts = {"retries": 0, "wait": 0.0}
+        response = None
+        error = None
+        try:
+            response = self._send(method, url, kwargs, attempts)
+            return response
+        except BaseException as send_error:
+            error = send_error
+            raise
+        finally:
+            self._finish(info, response=response, error=error, **attempts)
+
+    @contextlib.contextmanager
+    def stream(self, method: str = None, url: str = None, **kwargs):
+        """Stream the response body of an HTTP request.
+
+        Returns a context manager yielding the ``requests.Response`` object,
+        which is closed (and measured) once the body has been consumed.
+        """
+        _check_request(method, url)
+        method = method.upper()
+        info = self._start(method, url)
+        attempts = {"retries": 0, "wait": 0.0}
+        response = None
+        error = None
+        try:
+            response = self._send(method, url, dict(kwargs, stream=True), attempts)
+            with response:
+                yield response
+        except BaseException as send_error:
+            error = send_error
+            raise
+        finally:
+            self._finish(info, response=response, error=error, **attempts)
+
+    def _send(self, method: str = None, url: str = None, kwargs: dict = None, attempts: dict = None):
+        """Send the request, retrying it according to the retry policy, and
+        count the retries and the time spent waiting in ``attempts``"""
+        import requests
+
+        session = self.session
+        body = kwargs.get("data")
+        # File-like bodies (uploads) are rewound before being re-sent
+        offset = body.tell() if hasattr(body, "seek") and hasattr(body, "tell") else None
+        resendable = body is None or isinstance(body, (bytes, str, dict)) or offset is not None
+        while True:
+            rate_limiter, attempt_kwargs = self._select_credentials(url, kwargs)
+            if rate_limiter is not None:
+                start = time.perf_counter()
+                rate_limiter.acquire()
+                attempts["wait"] += time.perf_counter() - start
+            try:
+                response = session.request(method, url, **attempt_kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+                if not resendable or not self._retry_policy.should_retry(
+                    attempts["retries"], method, maybe_processed=not _is_connect_error(error)
+                ):
+                    raise
+                delay = self._retry_policy.delay(attempts["retries"])
+                reason = type(error).__name__
+            else:
+                if rate_limiter is not None:
+                    rate_limiter.update(response.status_code, response.headers)
+                if not resendable or not self._retry_policy.should_retry(
+                    attempts["retries"], method, status_code=response.status_code
+                ):
+                    return response
+                delay = self._retry_policy.delay(attempts["retries"], response.headers)
+                reason = f"status code {response.status_code}"
+                response.close()
+            logger.warning(
+                f"WARNING: The {method} request to {url} has failed ({reason}). "
+                f"Retrying in {delay:.2f} seconds..."
+            )
+            time.sleep(delay)
+            attempts["wait"] += delay
+            if offset is not None:
+                body.seek(offset)
+            attempts["retries"] += 1
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        if self._session is not None:
+            self._session.close()
+
+
+class _AsyncTransport(_BaseTransport):
+    """Asynchronous HTTP transport used by the ``zenopy.AsyncZenodo`` client.
+    It owns two ``httpx.AsyncClient`` connection pools, one for the REST API
+    and one for the ``/files`` bucket endpoints, which allows hundreds of
+    in-flight requests to be multiplexed on a single event loop."""
+
+    def __init__(
+        self,
+        base_url: str = None,
+        pool_maxsize: int = 100,
+        files_pool_maxsize: int = None,
+        keep_alive: bool = True,
+        rate_limiter: _RateLimiter = None,
+        retry_policy: _RetryPolicy = None,
+        token_pool: _TokenPool = None,
+        instrumentation: _Instrumentation = None,
+    ):
+        if importlib.util.find_spec("httpx") is None:
+            raise ImportError(
+                "The asynchronous zenopy client requires the 'httpx' package.\n"
+                "Please install it via 'pip install zenopy[async]'."
+            )
+        if base_url is None or base_url == "":
+            raise ValueError("The 'base_url' argument cannot be None or empty.")
+        if not isinstance(pool_maxsize, int) or pool_maxsize < 1:
+            raise ValueError("The 'pool_maxsize' argument must be a positive integer.")
+        if files_pool_maxsize is None:
+            files_pool_maxsize = pool_maxsize
+        elif not isinstance(files_pool_maxsize, int) or files_pool_maxsize < 1:
+            raise ValueError("The 'files_pool_maxsize' argument must be a positive integer.")
+        self._base_url = base_url.strip().rstrip("/")
+        self._files_url = self._base_url + "/files"
+        self._keep_alive = keep_alive
+        self._rate_limiter = rate_limiter
+        if retry_policy is None:
+            retry_policy = _RetryPolicy(max_retries=0)
+        self._retry_policy = retry_policy
+        self._token_pool = token_pool
+        self._instrumentation = instrumentation
+        self._pool_maxsize = pool_maxsize
+        self._files_pool_maxsize = files_pool_maxsize
+        # The httpx clients are created upon the first request so that
+        # constructing a client stays cheap.
+        self._api_client = None
+        self._files_client = None
+
+    def _create_client(self, pool_maxsize: int = None):
+        import httpx
+
+        # Mirror the requests defaults: no timeouts, so that large file
+        # transfers are not interrupted.
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=pool_maxsize,
+                max_keepalive_connections=pool_maxsize if self._keep_alive else 0,
+            ),
+            timeout=None,
+        )
+
+    def _client_for(self, url: str = None):
+        if url.lower().startswith(self._files_url.lower()):
+            if self._files_client is None:
+                self._files_client = self._create_client(self._files_pool_maxsize)
+            return self._files_client
+        if self._api_client is None:
+            self._api_client = self._create_client(self._pool_maxsize)
+        return self._api_client
+
+    @staticmethod
+    def _encode_params(params: dict = None) -> (dict | None):
+        # httpx encodes booleans as "true"/"false" while requests sends
+        # "True"/"False"; keep the query strings of both clients identical.
+        if params is None:
+            return None
+        return {
+            key: str(value) if isinstance(value, bool) else value
+            for key, value in params.items()
+        }
+
+    async def request(self, method: str = None, url: str = None, **kwargs):
+        """Send an HTTP request through the pooled asynchronous clients.
+
+        The keyword arguments are passed verbatim to
+        ``httpx.AsyncClient.request()``.
+        """
+        _check_request(method, url)
+        method = method.upper()
+        kwargs["params"] = self._encode_params(kwargs.get("params"))
+        info = self._start(method, url)
+        attempts = {"retries": 0, "wait": 0.0}
+        response = None
+        error = None
+        try:
+            response = await self._send(self._client_for(url), method, url, kwargs, attempts)
+            return response
+        except BaseException as send_error:
+            error = send_error
+            raise
+        finally:
+            self._finish(info, response=response, error=error, **attempts)
+
+    async def _send(self, client, method: str = None, url: str = None, kwargs: dict = None, attempts: dict = None):
+        """Asynchronous counterpart of ``_Transport._send``"""
+        import httpx
+
+        # Streamed (async iterator) bodies are consumed and cannot be re-sent
+        content = kwargs.get("content")
+        resendable = content is None or isinstance(content, (bytes, str))
+        while True:
+            rate_limiter, attempt_kwargs = self._select_credentials(url, kwargs)
+            if rate_limiter is not None:
+                start = time.perf_counter()
+                await rate_limiter.acquire_async()
+                attempts["wait"] += time.perf_counter() - start
+            try:
+                response = await client.request(method, url, **attempt_kwargs)
+            except httpx.TransportError as error:
+                maybe_processed = not isinstance(
+                    error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+                )
+                if not resendable or not self._retry_policy.should_retry(
+                    attempts["retries"], method, maybe_processed=maybe_processed
+                ):
+                    raise
+                delay = self._retry_policy.delay(attempts["retries"])
+                reason = type(error).__name__
+            else:
+                if rate_limiter is not None:
+                    rate_limiter.update(response.status_code, response.headers)
+                if not resendable or not self._retry_policy.should_retry(
+                    attempts["retries"], method, status_code=response.status_code
+                ):
+                    return response
+                delay = self._retry_policy.delay(attempts["retries"], response.headers)
+                reason = f"status code {response.status_code}"
+                await response.aclose()
+            logger.warning(
+                f"WARNING: The {method} request to {url} has failed ({reason}). "
+                f"Retrying in {delay:.2f} seconds..."
+            )
+            await asyncio.sleep(delay)
+            attempts["wait"] += delay
+            attempts["retries"] += 1
+
+    def stream(self, method: str = None, url: str = None, **kwargs):
+        """Stream the response body of an HTTP request.
+
+        Returns an asynchronous context manager yielding the
+        ``httpx.Response`` object.
+        """
+        _check_request(method, url)
+        kwargs["params"] = self._encode_params(kwargs.get("params"))
+        return self._stream(self._client_for(url), method.upper(), url, **kwargs)
+
+    @contextlib.asynccontextmanager
+    async def _stream(self, client, method: str, url: str, **kwargs):
+        info = self._start(method, url)
+        wait = 0.0
+        rate_limiter, kwargs = self._select_credentials(url, kwargs)
+        if rate_limiter is not None:
+            start = time.perf_counter()
+            await rate_limiter.acquire_async()
+            wait += time.perf_counter() - start
+        response = None
+        error = None
+        # The streamed requests are measured until the body has been consumed
+        try:
+            async with client.stream(method, url, **kwargs) as response:
+                if rate_limiter is not None:
+                    rate_limiter.update(response.status_code, response.headers)
+                yield response
+        except Exception as stream_error:
+            error = stream_error
+            raise
+        finally:
+            self._finish(info, response=response, error=error, wait=wait)
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        for client in [self._api_client, self._files_client]:
+            if client is not None:
+                await client.aclose()
+
+
+def _is_connect_error(error: Exception = None) -> bool:
+    """True if the request has failed before reaching the server."""
+    import requests
+    import urllib3
+
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, (urllib3.exceptions.NewConnectionError, urllib3.exceptions.ConnectTimeoutError))
+
+
+def _check_request(method: str = None, url: str = None) -> None:
+    if method is None or method == "":
+        raise ValueError("The HTTP method cannot be None or empty.")
+    if url is None or url == "":
+        raise ValueError("The request URL cannot be None or empty.")
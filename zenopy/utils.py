@@ -4,6 +4,15 @@
 
 """
 
+import asyncio
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import logging
+from zenopy.codec import loads
+from zenopy.errors import zenodo_error
+
+logger = logging.getLogger(__name__)
+
 
 @staticmethod
 def disable_method(msg: str = None):
@@ -16,3 +25,162 @@ def disable_method(msg: str = None):
         raise RuntimeError(
             "The error message in the 'disable_method()' cannot be empty or None."
         )
+
+
+def _batch_ids(ids=None, name: str = "record") -> list[int]:
+    """Validate an iterable of IDs and return them as a list"""
+    if ids is None or isinstance(ids, (str, bytes)):
+        raise ValueError(f"The {name} IDs must be an iterable of integers.")
+    ids = list(ids)
+    for id_ in ids:
+        if not isinstance(id_, int) or isinstance(id_, bool):
+            raise ValueError(f"The {name} ID ({id_!r}) must be an integer.")
+    return ids
+
+
+def _map_concurrently(function=None, items: list = None, max_workers: int = 8) -> list:
+    """Call ``function`` on each item on up to ``max_workers`` threads.
+    Returns the results in order with the raised exceptions in place of
+    the results of the failed calls."""
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError("The 'max_workers' argument must be a positive integer.")
+
+    def call(item):
+        try:
+            return function(item)
+        except Exception as error:
+            return error
+
+    if len(items) <= 1 or max_workers == 1:
+        return [call(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(call, items))
+
+
+async def _gather_concurrently(function=None, items: list = None, max_workers: int = 8) -> list:
+    """Asynchronous counterpart of ``_map_concurrently`` awaiting up to
+    ``max_workers`` coroutines ``function(item)`` at a time."""
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError("The 'max_workers' argument must be a positive integer.")
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def call(item):
+        async with semaphore:
+            return await function(item)
+
+    return await asyncio.gather(*[call(item) for item in items], return_exceptions=True)
+
+
+def _batch_results(ids: list = None, results: dict = None, name: str = "record") -> list:
+    """Arrange the results (or exceptions) per ID in the order of ``ids``"""
+    failures = [id_ for id_ in dict.fromkeys(ids) if isinstance(results[id_], Exception)]
+    if failures:
+        logger.warning(
+            f"WARNING: {len(failures)} {name}(s) out of {len(results)} could not be "
+            f"retrieved: {failures[:10]}{' ...' if len(failures) > 10 else ''}"
+        )
+    return [results[id_] for id_ in ids]
+
+
+def _search_page(response=None) -> tuple[list, dict]:
+    """Hits and (JSON) search result of a search page response"""
+    if response.status_code != 200:
+        zenodo_error(response.status_code)
+    search_result = loads(response.content)
+    hits = search_result["hits"]["hits"]
+    return (hits if isinstance(hits, list) else []), search_result
+
+
+def _has_next_page(search_result: dict = None, hits: list = None, page: int = None, size: int = None) -> bool:
+    """Check whether a search result page is followed by another one"""
+    if not hits:
+        return False
+    links = search_result.get("links")
+    if isinstance(links, dict) and links:
+        return "next" in links
+    total = _total_hits(search_result)
+    if total is not None:
+        return page * size < total
+    return len(hits) >= size
+
+
+def _total_hits(search_result: dict = None) -> (int | None):
+    """Total number of hits reported by a search result (if any)"""
+    total = search_result["hits"].get("total")
+    if isinstance(total, dict):
+        total = total.get("value")
+    return total if isinstance(total, int) else None
+
+
+def _last_page(search_result: dict = None, size: int = None, max_result_window: int = 10000) -> int:
+    """Number of the last page of a search within the result window"""
+    total = _total_hits(search_result) or 0
+    if total > max_result_window:
+        logger.warning(
+            f"WARNING: The search matches {total} records, only the first {max_result_window} "
+            "can be listed. Use harvest_records to list all of them."
+        )
+    return max(1, min(-(-total // size), max_result_window // size))
+
+
+def _map_bounded(function=None, items=None, max_workers: int = 4):
+    """Yield the results of ``function(item)`` for the items in order while
+    up to ``max_workers`` calls run concurrently. The pending calls are
+    cancelled if the iteration stops early."""
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = collections.deque()
+    try:
+        for item in items:
+            if len(pending) >= max_workers:
+                yield pending.popleft().result()
+            pending.append(executor.submit(function, item))
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _amap_bounded(function=None, items=None, max_workers: int = 4):
+    """Asynchronous counterpart of ``_map_bounded`` running the coroutines
+    ``function(item)`` as tasks."""
+    pending = collections.deque()
+    try:
+        for item in items:
+            if len(pending) >= max_workers:
+                yield await pending.popleft()
+            pending.append(asyncio.ensure_future(function(item)))
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _prefetch_pages(fetch_page=None, first_page=None, last_page: int = None, prefetch: int = 4):
+    """Yield the results of ``fetch_page(page)`` for the pages 1 to
+    ``last_page`` in order while up to ``prefetch`` following pages are
+    fetched concurrently. The pending requests are cancelled if the
+    iteration stops early."""
+    yield first_page
+    if last_page < 2:
+        return
+    yield from _map_bounded(fetch_page, range(2, last_page + 1), prefetch)
+
+
+async def _aprefetch_pages(fetch_page=None, first_page=None, last_page: int = None, prefetch: int = 4):
+    """Asynchronous counterpart of ``_prefetch_pages`` running the
+    coroutines ``fetch_page(page)`` as tasks."""
+    yield first_page
+    async for result in _amap_bounded(fetch_page, range(2, last_page + 1), prefetch):
+        yield result
+
+
+def _check_prefetch(prefetch: int = None) -> None:
+    if not isinstance(prefetch, int) or isinstance(prefetch, bool) or prefetch < 0:
+        raise ValueError("The 'prefetch' argument must be a non-negative integer.")
+
+
+def _check_page_size(size: int = None) -> None:
+    if not isinstance(size, int) or isinstance(size, bool) or size < 1:
+        raise ValueError("The page 'size' argument must be a positive integer.")
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+"""Zenodo compact (read-only) record views
+
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _metadata(data: dict = None) -> dict:
+    metadata = data.get("metadata")
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def _files(data: dict = None) -> tuple:
+    return tuple(
+        (file_.get("key", file_.get("filename")), file_.get("size", file_.get("filesize")))
+        for file_ in data.get("files") or []
+    )
+
+
+# Extraction of the fields of a record view from the record JSON data
+_field_getters = {
+    "id": lambda data: data.get("id", data.get("record_id")),
+    "conceptrecid": lambda data: data.get("conceptrecid"),
+    "doi": lambda data: data.get("doi") or _metadata(data).get("doi") or None,
+    "title": lambda data: data.get("title") or _metadata(data).get("title"),
+    "creators": lambda data: tuple(
+        creator.get("name") for creator in _metadata(data).get("creators") or []
+    ),
+    "publication_date": lambda data: _metadata(data).get("publication_date"),
+    "created": lambda data: data.get("created"),
+    "modified": lambda data: data.get("modified", data.get("updated")),
+    "files": _files,
+    "filename": lambda data: data.get("filename", data.get("key")),
+    "filesize": lambda data: data.get("filesize", data.get("size")),
+    "checksum": lambda data: data.get("checksum"),
+}
+
+# Fields kept by default in the views of the records and depositions
+record_view_fields = (
+    "id",
+    "conceptrecid",
+    "doi",
+    "title",
+    "creators",
+    "publication_date",
+    "created",
+    "modified",
+    "files",
+)
+
+# Fields kept by default in the views of the deposition files
+file_view_fields = ("id", "filename", "filesize", "checksum")
+
+
+class RecordView(object):
+    """Compact read-only view of a record, deposition or deposition file.
+
+    A view keeps a projection of the JSON data of a record: the ``id``,
+    ``conceptrecid``, ``doi``, ``title``, the ``creators`` names, the
+    ``publication_date``, ``created`` and ``modified`` dates and the
+    ``files`` as (name, size) pairs for the records and depositions, or the
+    ``id``, ``filename``, ``filesize`` and ``checksum`` of the deposition
+    files. The fields which are not projected are None. Any other field can
+    be kept through its (dot-separated) path in the record data, e.g.,
+    ``"metadata.keywords"``, and is then available in ``extra``."""
+
+    __slots__ = tuple(_field_getters) + ("extra",)
+
+    def __init__(self, data: dict = None, fields: (list[str] | tuple[str]) = record_view_fields):
+        setattr_ = object.__setattr__
+        extra = None
+        for field in fields:
+            getter = _field_getters.get(field)
+            if getter is not None:
+                setattr_(self, field, getter(data))
+            else:
+                if extra is None:
+                    extra = {}
+                extra[field] = _lookup(data, field)
+        for field in _field_getters:
+            if field not in fields:
+                setattr_(self, field, None)
+        setattr_(self, "extra", extra)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("Record views are read-only.")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Record views are read-only.")
+
+    def __getitem__(self, key: str):
+        """Access the fields (and the extra fields) by name"""
+        if key in _field_getters:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RecordView):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{field}={getattr(self, field)!r}"
+            for field in _field_getters
+            if getattr(self, field) is not None
+        )
+        return f"RecordView({fields})"
+
+    def to_dict(self) -> dict:
+        """The projected (non-None) fields and the extra fields"""
+        result = {
+            field: getattr(self, field)
+            for field in _field_getters
+            if getattr(self, field) is not None
+        }
+        result.update(self.extra or {})
+        return result
+
+
+def _lookup(data: dict = None, path: str = None):
+    """Value at the dot-separated path of the record data (None if missing)"""
+    value = data
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _view_fields(view: (bool | list[str]) = None, default: tuple = record_view_fields) -> (tuple | None):
+    """Fields of the views requested through the ``view`` listing argument
+    (None if the listing returns Record objects)"""
+    if view is None or view is False:
+        return None
+    if view is True:
+        return default
+    if isinstance(view, str) or not all(isinstance(field, str) for field in view):
+        raise ValueError("The 'view' argument must be a boolean or a list of field names.")
+    return tuple(view)